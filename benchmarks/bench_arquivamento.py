@@ -0,0 +1,104 @@
+"""Banco principal antes e depois de arquivar as movimentações antigas em arquivos SQLite mensais.
+
+Gera um banco sintético com dois anos de histórico (``sintetico.gerar_banco``), mede as leituras da página de
+Movimentações, arquiva o que passa da retenção (``arquivamento.py``) e mede de novo, conferindo que as tabelas
+são as mesmas:
+
+* histórico recente: primeira página do mês atual (só o banco principal);
+* histórico antigo: primeira página de um período já arquivado (abre só os meses do período);
+* giro e perdas: agregação por produto (o que foi arquivado entra pelos totais por produto);
+* valoração: saldo do ledger pelo snapshot.
+
+    python benchmarks/bench_arquivamento.py --produtos 20000 --movimentacoes 2000000
+"""
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from sistema_de_Inventario.arquivamento import RETENCAO_DIAS, arquivar_movimentacoes, pasta_arquivo
+from sistema_de_Inventario.conciliacao import CONSULTA_VALORACAO_LEDGER, registrar_snapshot
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.historico import listar_movimentacoes
+from sistema_de_Inventario.relatorios import CONSULTA_MOVIMENTOS_POR_PRODUTO, relatorios_movimentacoes
+from sistema_de_Inventario.sintetico import gerar_banco
+
+
+def leituras(retencao_dias):
+    hoje = date.today()
+    antigo = hoje - timedelta(days=retencao_dias + 120)
+    return {
+        "histórico recente": lambda conn: listar_movimentacoes(conn, hoje.replace(day=1), hoje)[0],
+        "histórico antigo": lambda conn: listar_movimentacoes(conn, antigo - timedelta(days=30), antigo)[0],
+        "giro e perdas": lambda conn: pd.concat(relatorios_movimentacoes(
+            pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn)), names=["relatorio"]),
+        "valoração": lambda conn: pd.read_sql_query(CONSULTA_VALORACAO_LEDGER, conn),
+    }
+
+
+def medir(funcao, conn, repeticoes):
+    """Mediana em segundos e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(conn)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def tamanho_mb(conn, caminho):
+    # Com WAL, o VACUUM e as exclusões ficam no -wal até o checkpoint
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return Path(caminho).stat().st_size / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=20_000)
+    parser.add_argument("--movimentacoes", type=int, default=2_000_000)
+    parser.add_argument("--retencao-dias", type=int, default=RETENCAO_DIAS)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "inventario.db"
+        geracao = gerar_banco(caminho, args.produtos, args.movimentacoes)
+        print(f"carga: {geracao.produtos:,} produtos e {geracao.movimentacoes:,} movimentações em {geracao.segundos:.1f}s")
+        conn = sqlite3.connect(caminho)
+        for pragma, valor in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        # Como a página de Movimentações faria na primeira visita (ou o job de conciliação)
+        registrar_snapshot(conn)
+
+        funcoes = leituras(args.retencao_dias)
+        antes = {nome: medir(funcao, conn, args.repeticoes) for nome, funcao in funcoes.items()}
+        tamanho_antes = tamanho_mb(conn, caminho)
+
+        resultado = arquivar_movimentacoes(conn, args.retencao_dias)
+        conn.execute("VACUUM")
+        arquivos = list(pasta_arquivo(conn).glob("*.db"))
+        print(f"arquivamento: {resultado.movimentacoes:,} movimentações de {resultado.meses} meses em "
+              f"{resultado.segundos:.1f}s ({resultado.movimentacoes_por_segundo:,.0f}/s)")
+        print(f"banco principal: {tamanho_antes:,.0f} MB -> {tamanho_mb(conn, caminho):,.0f} MB; "
+              f"{len(arquivos)} arquivos mensais com {sum(a.stat().st_size for a in arquivos) / 2**20:,.0f} MB")
+
+        print(f"{'Leitura':<18} {'antes':>9} {'depois':>9}  mesmos resultados")
+        for nome, funcao in funcoes.items():
+            segundos_antes, df_antes = antes[nome]
+            segundos_depois, df_depois = medir(funcao, conn, args.repeticoes)
+            try:
+                pd.testing.assert_frame_equal(df_antes, df_depois, check_dtype=False)
+                iguais = "sim"
+            except AssertionError:
+                iguais = "NÃO"
+            print(f"{nome:<18} {segundos_antes * 1000:7.1f}ms {segundos_depois * 1000:7.1f}ms  {iguais}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
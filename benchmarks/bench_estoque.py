@@ -0,0 +1,114 @@
+"""Vazão do ajuste de estoque concorrente.
+
+Várias threads, cada uma com a sua conexão, movimentam o mesmo produto ao mesmo tempo; o resultado mostra
+as movimentações por segundo e a diferença entre o estoque gravado e o estoque inicial mais a soma das
+movimentações registradas. A garantia de não perder atualizações é verificada em ``tests/test_estoque.py``:
+
+    python benchmarks/bench_estoque.py --threads 8 --operacoes 500
+
+Com ``--ingenuo`` roda também o fluxo antigo (ler saldo, calcular em Python, gravar o valor absoluto),
+que perde atualizações sob concorrência.
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.estoque import movimentar_estoque
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+
+
+ESTOQUE_INICIAL = 1_000_000
+CD_PRODUTO = 1
+
+
+def conectar(caminho):
+    conn = sqlite3.connect(caminho, timeout=30)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+def preparar_banco(caminho):
+    conn = conectar(caminho)
+    aplicar_migracoes(conn)
+    conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+    conn.execute('''INSERT INTO Produtos (cd_produto, nm_produto, categoria_id, vr_custo, vr_venda, vr_estoque_atual, vr_estoque_minimo)
+                    VALUES (?, 'Peça de teste', 1, 10, 20, ?, 0)''', (CD_PRODUTO, ESTOQUE_INICIAL))
+    conn.commit()
+    conn.close()
+
+
+def ajuste_ingenuo(conn, tp_movimento, qt_movimento):
+    # Fluxo antigo da tela "Atualizar Estoque": leitura e escrita em transações separadas
+    estoque = conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = ?", (CD_PRODUTO,)).fetchone()[0]
+    novo = estoque + (qt_movimento if tp_movimento == "Entrada" else -qt_movimento)
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = ? WHERE cd_produto = ?", (novo, CD_PRODUTO))
+    conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo)
+                    VALUES (?, ?, ?, ?, 'Estresse')''',
+                 (CD_PRODUTO, tp_movimento, qt_movimento, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+
+
+def rodar(caminho, n_threads, n_operacoes, ingenuo):
+    preparar_banco(caminho)
+    erros = []
+
+    def trabalhador(semente):
+        rng = random.Random(semente)
+        conn = conectar(caminho)
+        try:
+            for _ in range(n_operacoes):
+                tp_movimento = rng.choice(["Entrada", "Saida"])
+                qt_movimento = rng.randint(1, 10)
+                if ingenuo:
+                    ajuste_ingenuo(conn, tp_movimento, qt_movimento)
+                else:
+                    movimentar_estoque(conn, CD_PRODUTO, tp_movimento, qt_movimento, "Estresse")
+        except Exception as erro:
+            erros.append(erro)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(n_threads)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    segundos = time.perf_counter() - inicio
+
+    conn = conectar(caminho)
+    estoque_final = conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = ?", (CD_PRODUTO,)).fetchone()[0]
+    saldo_movimentos, n_movimentos = conn.execute('''SELECT SUM(CASE WHEN tp_movimento = 'Entrada' THEN qt_movimento ELSE -qt_movimento END),
+                                                            COUNT(*)
+                                                     FROM Movimentacoes WHERE nm_motivo = 'Estresse' ''').fetchone()
+    conn.close()
+    perdidas = ESTOQUE_INICIAL + saldo_movimentos - estoque_final
+    return segundos, n_movimentos, perdidas, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=500, help="movimentações por thread")
+    parser.add_argument("--ingenuo", action="store_true", help="roda também o fluxo antigo para comparação")
+    args = parser.parse_args()
+
+    modos = [("movimentar_estoque", False)] + ([("ingenuo", True)] if args.ingenuo else [])
+    for nome, ingenuo in modos:
+        with tempfile.TemporaryDirectory() as pasta:
+            segundos, n_movimentos, perdidas, erros = rodar(Path(pasta) / "estresse.db", args.threads, args.operacoes, ingenuo)
+        print(f"{nome:<20} {n_movimentos:>7} movimentações em {segundos:6.2f}s ({n_movimentos / segundos:8,.0f}/s) | "
+              f"diferença no saldo: {perdidas} | erros: {len(erros)}")
+        for erro in erros[:5]:
+            print(f"  {type(erro).__name__}: {erro}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Tempo de rerun e memória do Dashboard com os gráficos em cache e com os gráficos nativos.
+
+Para cada modo, num processo novo, abre várias sessões do ``AppTest`` do Streamlit em sequência e roda o
+Dashboard repetidas vezes em cada uma, medindo:
+
+* mediana do rerun na primeira e na última sessão (não deve crescer com o uso);
+* pico de memória residente do processo depois da primeira e da última sessão;
+* figuras ainda registradas no pyplot (deve ser zero) e acertos do cache de gráficos.
+
+    python benchmarks/bench_graficos.py --sessoes 5 --reruns 20
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+MODOS = {"imagem": False, "nativo": True}
+
+
+def medir_modo(modo, sessoes, reruns):
+    """Roda dentro do subprocesso: devolve tempos (ms) e memória (MB) do modo."""
+    import matplotlib.pyplot as plt
+    from streamlit.testing.v1 import AppTest
+
+    from sistema_de_Inventario.paginas.comum import obter_cache_graficos
+
+    medianas, memoria, erros = [], [], []
+    for _ in range(sessoes):
+        app = AppTest.from_file(str(Path.cwd() / "app.py"), default_timeout=120)
+        app.run()
+        app.sidebar.radio[0].set_value("Dashboard").run()
+        app.toggle[0].set_value(MODOS[modo]).run()
+        tempos = []
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            app.run()
+            tempos.append(time.perf_counter() - inicio)
+        medianas.append(statistics.median(tempos) * 1000)
+        memoria.append(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        erros += [str(excecao.value) for excecao in app.exception]
+    return {"modo": modo, "rerun_primeira_ms": medianas[0], "rerun_ultima_ms": medianas[-1],
+            "memoria_primeira_mb": memoria[0], "memoria_ultima_mb": memoria[-1],
+            "figuras_pyplot": len(plt.get_fignums()), "cache": obter_cache_graficos().estatisticas(), "erros": erros}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--modo", help=argparse.SUPPRESS)  # uso interno: execução dentro do subprocesso
+    args = parser.parse_args()
+
+    if args.modo:
+        print(json.dumps(medir_modo(args.modo, args.sessoes, args.reruns)))
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        shutil.copytree(RAIZ / "SQLite", Path(pasta) / "SQLite")
+        shutil.copy(RAIZ / "app.py", pasta)
+        print(f"{'Modo':<8} {'rerun 1ª sessão':>16} {'rerun última':>13} {'pico 1ª sessão':>15} {'pico última':>12} "
+              f"{'figuras':>8}  cache")
+        for modo in MODOS:
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--modo", modo,
+                                    "--sessoes", str(args.sessoes), "--reruns", str(args.reruns)],
+                                   cwd=pasta, capture_output=True, text=True, check=True).stdout
+            r = json.loads(saida.strip().splitlines()[-1])
+            print(f"{modo:<8} {r['rerun_primeira_ms']:14.0f}ms {r['rerun_ultima_ms']:11.0f}ms "
+                  f"{r['memoria_primeira_mb']:13.0f}MB {r['memoria_ultima_mb']:10.0f}MB {r['figuras_pyplot']:>8}  "
+                  f"{r['cache']['acertos']} acertos / {r['cache']['falhas']} falhas")
+            for erro in r["erros"]:
+                print(f"  erro: {erro}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark da importação/exportação em massa.
+
+Gera arquivos sintéticos, importa num banco novo e exporta de volta, medindo linhas por segundo:
+
+    python benchmarks/bench_importacao.py --movimentacoes 1000000
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.exportacao import exportar
+from sistema_de_Inventario.importacao import importar_movimentacoes, importar_produtos
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+
+
+def gerar_arquivos(pasta, n_produtos, n_movimentacoes, semente=42):
+    rng = np.random.default_rng(semente)
+    produtos = pd.DataFrame({
+        "cd_produto": np.arange(1, n_produtos + 1),
+        "nm_produto": [f"Peça {i}" for i in range(1, n_produtos + 1)],
+        "ds_produto": "Produto gerado para benchmark",
+        "categoria_id": rng.integers(1, len(CATEGORIAS_PADRAO) + 1, n_produtos),
+        "vr_custo": rng.uniform(5, 500, n_produtos).round(2),
+        "vr_estoque_atual": rng.integers(0, 200, n_produtos),
+        "vr_estoque_minimo": rng.integers(0, 20, n_produtos),
+    })
+    produtos["vr_venda"] = (produtos["vr_custo"] * 1.8).round(2)
+    caminho_produtos = pasta / "produtos.csv"
+    produtos.to_csv(caminho_produtos, index=False)
+
+    segundos = rng.integers(0, 365 * 24 * 3600, n_movimentacoes)
+    movimentacoes = pd.DataFrame({
+        "produto_id": rng.integers(1, n_produtos + 1, n_movimentacoes),
+        "tp_movimento": np.where(rng.random(n_movimentacoes) < 0.3, "Entrada", "Saida"),
+        "qt_movimento": rng.integers(1, 10, n_movimentacoes),
+        "data_hora": (pd.Timestamp("2025-01-01") + pd.to_timedelta(np.sort(segundos), unit="s")).strftime("%Y-%m-%d %H:%M:%S"),
+        "nm_motivo": rng.choice(["Venda", "Devolução", "Perda", "Ajuste"], n_movimentacoes),
+    })
+    caminho_movimentacoes = pasta / "movimentacoes.csv"
+    movimentacoes.to_csv(caminho_movimentacoes, index=False)
+    return caminho_produtos, caminho_movimentacoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=10_000)
+    parser.add_argument("--movimentacoes", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        caminho_produtos, caminho_movimentacoes = gerar_arquivos(pasta, args.produtos, args.movimentacoes)
+
+        conn = sqlite3.connect(pasta / "bench.db")
+        for pragma, valor in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        aplicar_migracoes(conn)
+        conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+        conn.commit()
+
+        for nome, importar, caminho in [("produtos", importar_produtos, caminho_produtos),
+                                        ("movimentacoes", importar_movimentacoes, caminho_movimentacoes)]:
+            resultado = importar(conn, caminho, args.lote)
+            print(f"importar {nome:<14} {resultado.lidas:>10,} linhas  {resultado.segundos:8.2f}s  "
+                  f"{resultado.linhas_por_segundo:>12,.0f} linhas/s")
+
+        for nome in ["produtos", "movimentacoes"]:
+            for formato in ["csv", "parquet"]:
+                inicio = time.perf_counter()
+                total = exportar(conn, nome, pasta / f"saida_{nome}.{formato}", formato, args.lote)
+                segundos = time.perf_counter() - inicio
+                print(f"exportar {nome:<14} {total:>10,} linhas  {segundos:8.2f}s  "
+                      f"{total / segundos:>12,.0f} linhas/s ({formato})")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Tempos de partida e de rerun do app Streamlit, página a página.
+
+Para cada página, num processo novo (módulos ainda não importados), mede com o ``AppTest`` do Streamlit:
+
+* partida a frio: primeira execução do app, que abre na página "Sobre";
+* primeira visita: a troca para a página, incluindo a importação do módulo dela;
+* rerun: execuções seguintes da mesma página (mediana).
+
+Também confere quais dependências pesadas já estavam carregadas depois da página "Sobre":
+
+    python benchmarks/bench_paginas.py --reruns 10
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sistema_de_Inventario.paginas import PAGINAS
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+DEPENDENCIAS_PESADAS = ["pandas", "matplotlib", "numpy", "pyarrow"]
+
+
+def medir_pagina(pagina, reruns):
+    """Roda dentro do subprocesso: devolve os tempos da página em ms."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(Path.cwd() / "app.py"), default_timeout=120)
+    inicio = time.perf_counter()
+    app.run()
+    partida = time.perf_counter() - inicio
+    carregadas = [nome for nome in DEPENDENCIAS_PESADAS if nome in sys.modules]
+
+    inicio = time.perf_counter()
+    app.sidebar.radio[0].set_value(pagina).run()
+    primeira = time.perf_counter() - inicio
+
+    tempos = []
+    for _ in range(reruns):
+        inicio = time.perf_counter()
+        app.run()
+        tempos.append(time.perf_counter() - inicio)
+    erros = [str(excecao.value) for excecao in app.exception]
+    return {"pagina": pagina, "partida_ms": partida * 1000, "primeira_visita_ms": primeira * 1000,
+            "rerun_ms": statistics.median(tempos) * 1000 if tempos else None,
+            "carregadas_apos_sobre": carregadas, "erros": erros}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--pagina", help=argparse.SUPPRESS)  # uso interno: execução dentro do subprocesso
+    args = parser.parse_args()
+
+    if args.pagina:
+        print(json.dumps(medir_pagina(args.pagina, args.reruns)))
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        # Cópia do banco: as páginas podem gravar (migrações, categorias, classificação ABC)
+        shutil.copytree(RAIZ / "SQLite", Path(pasta) / "SQLite")
+        shutil.copy(RAIZ / "app.py", pasta)
+        print(f"{'Página':<20} {'partida':>9} {'1ª visita':>10} {'rerun':>8}  carregadas após 'Sobre'")
+        for pagina in PAGINAS:
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--pagina", pagina, "--reruns", str(args.reruns)],
+                                   cwd=pasta, capture_output=True, text=True, check=True).stdout
+            resultado = json.loads(saida.strip().splitlines()[-1])
+            print(f"{pagina:<20} {resultado['partida_ms']:7.0f}ms {resultado['primeira_visita_ms']:8.0f}ms "
+                  f"{resultado['rerun_ms']:6.0f}ms  {', '.join(resultado['carregadas_apos_sobre']) or '-'}")
+            for erro in resultado["erros"]:
+                print(f"  erro: {erro}")
+
+
+if __name__ == "__main__":
+    main()
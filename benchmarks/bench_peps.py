@@ -0,0 +1,114 @@
+"""Benchmark das camadas de custo PEPS.
+
+Mede as movimentações por segundo em dois caminhos:
+
+* incremental: cada movimentação inserida dispara os triggers que abrem/consomem as camadas;
+* reconstrução: ``reconstruir_camadas`` relendo o histórico inteiro em lotes de produtos.
+
+Confere também que a reconstrução chega ao mesmo estado dos triggers:
+
+    python benchmarks/bench_peps.py --movimentacoes 10000000 --produtos 100000
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+from sistema_de_Inventario.peps import reconstruir_camadas
+
+
+LOTE_INSERCAO = 50_000
+
+
+def conectar(caminho):
+    conn = sqlite3.connect(caminho)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+def gerar_movimentacoes(n_movimentacoes, n_produtos, inicio, semente=42):
+    """Movimentações sintéticas em ordem de data, em lotes; ~45% entradas com custo variando em torno do preço."""
+    rng = np.random.default_rng(semente)
+    base = datetime(2020, 1, 1)
+    for primeira in range(inicio, n_movimentacoes, LOTE_INSERCAO):
+        n = min(LOTE_INSERCAO, n_movimentacoes - primeira)
+        produtos = rng.integers(1, n_produtos + 1, n)
+        entrada = rng.random(n) < 0.45
+        quantidades = np.where(entrada, rng.integers(5, 30, n), rng.integers(1, 15, n))
+        custos = (produtos % 97 + 5) * rng.uniform(0.9, 1.1, n)
+        segundos = (np.arange(primeira, primeira + n) * 7).tolist()
+        yield [(int(p), "Entrada" if e else "Saida", int(q), (base + timedelta(seconds=s)).strftime("%Y-%m-%d %H:%M:%S"),
+                "Benchmark", round(float(c), 2) if e else None)
+               for p, e, q, s, c in zip(produtos.tolist(), entrada.tolist(), quantidades.tolist(), segundos, custos.tolist())]
+
+
+def inserir(conn, lotes):
+    total = 0
+    for lote in lotes:
+        conn.executemany('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                            VALUES (?, ?, ?, ?, ?, ?)''', lote)
+        conn.commit()
+        total += len(lote)
+    return total
+
+
+def estado(conn):
+    return (conn.execute('''SELECT produto_id, movimentacao_id, qt_restante, ROUND(vr_custo_unitario, 6)
+                            FROM Camadas_Custo ORDER BY produto_id, dt_entrada, id''').fetchall(),
+            conn.execute("SELECT produto_id, ROUND(vr_custo_total, 4) FROM Resumo_Saidas_Produto ORDER BY produto_id").fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--movimentacoes", type=int, default=1_000_000, help="tamanho do histórico para a reconstrução")
+    parser.add_argument("--incrementais", type=int, default=200_000, help="quantas passam pelos triggers")
+    parser.add_argument("--produtos", type=int, default=20_000)
+    args = parser.parse_args()
+    incrementais = min(args.incrementais, args.movimentacoes)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        conn = conectar(Path(pasta) / "peps.db")
+        aplicar_migracoes(conn)
+        conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+        conn.executemany('''INSERT INTO Produtos (cd_produto, nm_produto, categoria_id, vr_custo, vr_venda, vr_estoque_atual, vr_estoque_minimo)
+                            VALUES (?, ?, 1, ?, ?, 0, 0)''',
+                         ((i, f"Peça {i}", float(i % 97 + 5), float(i % 97 + 5) * 2) for i in range(1, args.produtos + 1)))
+        conn.commit()
+
+        geradas = gerar_movimentacoes(args.movimentacoes, args.produtos, 0)
+        inicio = time.perf_counter()
+        n = inserir(conn, (next(geradas) for _ in range(-(-incrementais // LOTE_INSERCAO))))
+        segundos = time.perf_counter() - inicio
+        print(f"{'incremental (triggers)':<26} {n:>10,} movimentações em {segundos:7.2f}s ({n / segundos:10,.0f}/s)")
+
+        pelos_triggers = estado(conn)
+        resultado = reconstruir_camadas(conn)
+        print(f"{'reconstrução':<26} {resultado.movimentacoes:>10,} movimentações em {resultado.segundos:7.2f}s "
+              f"({resultado.movimentacoes_por_segundo:10,.0f}/s)")
+        iguais = estado(conn) == pelos_triggers
+        print(f"reconstrução igual ao estado dos triggers: {'sim' if iguais else 'NÃO'}")
+
+        if args.movimentacoes > n:
+            # O restante do histórico entra sem os triggers PEPS; só a reconstrução calcula as camadas
+            conn.execute("DROP TRIGGER trg_movimentacoes_peps_entrada")
+            conn.execute("DROP TRIGGER trg_movimentacoes_peps_saida")
+            inicio = time.perf_counter()
+            n += inserir(conn, geradas)
+            print(f"{'carga do histórico':<26} {n:>10,} movimentações em {time.perf_counter() - inicio:7.2f}s")
+            resultado = reconstruir_camadas(conn)
+            print(f"{'reconstrução':<26} {resultado.movimentacoes:>10,} movimentações em {resultado.segundos:7.2f}s "
+                  f"({resultado.movimentacoes_por_segundo:10,.0f}/s), {resultado.camadas:,} camadas abertas")
+        conn.close()
+    if not iguais:
+        raise SystemExit("a reconstrução divergiu das camadas mantidas pelos triggers")
+
+
+if __name__ == "__main__":
+    main()
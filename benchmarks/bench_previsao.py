@@ -0,0 +1,79 @@
+"""Benchmark da previsão de demanda e das sugestões de reposição.
+
+Gera um catálogo sintético com um ano de saídas diárias (metade das peças com giro intermitente) e mede
+produtos previstos por segundo no modo serial e com pool de processos:
+
+    python benchmarks/bench_previsao.py --produtos 100000 --processos 4
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+from sistema_de_Inventario.previsao import SEMANAS_HISTORICO, atualizar_sugestoes, carregar_serie_semanal, prever_demanda
+
+
+def preparar_banco(caminho, n_produtos, semente=42):
+    rng = np.random.default_rng(semente)
+    conn = sqlite3.connect(caminho)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    aplicar_migracoes(conn)
+    conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+    conn.executemany('''INSERT INTO Produtos (cd_produto, nm_produto, categoria_id, vr_custo, vr_venda, vr_estoque_atual, vr_estoque_minimo)
+                        VALUES (?, ?, ?, ?, ?, ?, 0)''',
+                     ((i, f"Peça {i}", int(rng.integers(1, len(CATEGORIAS_PADRAO) + 1)), 10.0, 20.0, int(rng.integers(0, 200)))
+                      for i in range(1, n_produtos + 1)))
+
+    # Os totais diários vão direto para o resumo, que é o que a previsão lê
+    hoje = date.today()
+    dias = [str(hoje - timedelta(days=d)) for d in range(SEMANAS_HISTORICO * 7)]
+    probabilidade = np.where(np.arange(n_produtos) % 2 == 0, 0.6, 0.05)
+    for dia in dias:
+        vendeu = rng.random(n_produtos) < probabilidade
+        produtos = np.flatnonzero(vendeu) + 1
+        quantidades = rng.poisson(3, len(produtos)) + 1
+        conn.executemany('''INSERT INTO Resumo_Movimentos_Diarios (dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos)
+                            VALUES (?, ?, 'Saida', ?, 1)''',
+                         zip(repeat(dia), produtos.tolist(), quantidades.tolist()))
+    conn.commit()
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=20_000)
+    parser.add_argument("--processos", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        inicio = time.perf_counter()
+        conn = preparar_banco(Path(pasta) / "previsao.db", args.produtos)
+        print(f"banco sintético: {args.produtos:,} produtos × {SEMANAS_HISTORICO} semanas em {time.perf_counter() - inicio:.1f}s")
+
+        inicio = time.perf_counter()
+        _, matriz = carregar_serie_semanal(conn)
+        segundos = time.perf_counter() - inicio
+        print(f"{'leitura da série':<24} {segundos:6.2f}s")
+
+        inicio = time.perf_counter()
+        prever_demanda(matriz)
+        segundos = time.perf_counter() - inicio
+        print(f"{'previsão (só numpy)':<24} {segundos:6.2f}s ({args.produtos / segundos:12,.0f} SKUs/s)")
+
+        for processos in (1, args.processos):
+            total, segundos = atualizar_sugestoes(conn, processos)
+            print(f"{f'ponta a ponta, {processos} proc.':<24} {segundos:6.2f}s ({total / segundos:12,.0f} SKUs/s)")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
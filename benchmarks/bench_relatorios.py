@@ -0,0 +1,163 @@
+"""Relatórios das páginas Consultar e Movimentações: consultas separadas x uma passada por tabela.
+
+* antigo: as cinco consultas de produtos e as três junções com Movimentacoes, cada uma com a sua varredura;
+* novo: ``relatorios.py``, uma leitura de Produtos (com marcações) e uma agregação de Movimentacoes por produto,
+  recortadas com pandas; a valoração vem do snapshot do ledger (``conciliacao.py``), tirado depois da carga
+  como faria o job de conciliação, mais as movimentações posteriores.
+
+Confere também que os dois caminhos devolvem as mesmas tabelas:
+
+    python benchmarks/bench_relatorios.py --produtos 100000 --movimentacoes 5000000
+"""
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sistema_de_Inventario.conciliacao import CONSULTA_VALORACAO_LEDGER, registrar_snapshot
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+from sistema_de_Inventario.relatorios import (CONSULTA_CATEGORIAS, CONSULTA_MOVIMENTOS_POR_PRODUTO, CONSULTA_PRODUTOS,
+                                              relatorios_movimentacoes, relatorios_produtos)
+
+
+LOTE_INSERCAO = 100_000
+MOTIVOS_ENTRADA = ["Compra", "Devolução"]
+MOTIVOS_SAIDA = ["Venda", "Perda", "Ajuste"]
+
+_SELECT_PRODUTOS = ("SELECT cd_produto AS 'Código', nm_produto AS 'Produto', ds_produto AS 'Descrição', categoria_id AS 'Categoria', "
+                    "vr_custo AS 'Custo', vr_venda AS 'Valor de Venda', vr_estoque_atual AS 'Estoque', vr_estoque_minimo AS 'Estoque Mínimo' FROM Produtos")
+
+# Consultas como estavam nas páginas (o giro ordenado pela coluna, que era a intenção do ORDER BY original)
+ANTIGAS_PRODUTOS = {
+    "produtos": _SELECT_PRODUTOS,
+    "abaixo_minimo": _SELECT_PRODUTOS + " WHERE vr_estoque_atual < vr_estoque_minimo",
+    "excesso": _SELECT_PRODUTOS + " WHERE vr_estoque_atual > (vr_estoque_minimo * 3)",
+    "por_categoria": "SELECT c.nm_categoria AS 'Categoria', COUNT(p.cd_produto) AS 'Quantidade de Produtos' FROM Categorias c "
+                     "LEFT JOIN Produtos p ON c.cd_categoria = p.categoria_id GROUP BY c.nm_categoria",
+}
+ANTIGAS_MOVIMENTACOES = {
+    "giro": "SELECT p.nm_produto AS 'Produto',COUNT(m.id) AS 'Qtd Movimentos de Venda',SUM(m.qt_movimento) AS 'Total de Itens Saidos' "
+            "FROM Produtos p JOIN Movimentacoes m ON p.cd_produto = m.produto_id WHERE m.tp_movimento = 'Saida' "
+            "GROUP BY p.cd_produto ORDER BY 3 DESC",
+    "perdas": "SELECT p.nm_produto AS 'Produto', SUM(m.qt_movimento) AS 'Qtd Perdida', "
+              "SUM(m.qt_movimento * COALESCE(m.vr_custo_unitario, p.vr_custo)) / SUM(m.qt_movimento) AS 'Custo Unitário', "
+              "SUM(m.qt_movimento * COALESCE(m.vr_custo_unitario, p.vr_custo)) AS 'Prejuizo Total' FROM Movimentacoes m "
+              "JOIN Produtos p ON m.produto_id = p.cd_produto WHERE m.nm_motivo = 'Perda' GROUP BY p.cd_produto",
+    "valoracao": "SELECT p.nm_produto, p.vr_estoque_atual AS 'Estoque No Cadastro', SUM(CASE WHEN m.tp_movimento = 'Entrada' "
+                 "THEN m.qt_movimento ELSE 0 END) - SUM(CASE WHEN m.tp_movimento = 'Saida' THEN m.qt_movimento ELSE 0 END) "
+                 "AS 'Estoque Calculado Histórico' FROM Produtos p LEFT JOIN Movimentacoes m ON p.cd_produto = m.produto_id "
+                 "GROUP BY p.cd_produto",
+}
+
+
+def conectar(caminho):
+    conn = sqlite3.connect(caminho)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+def popular(conn, n_produtos, n_movimentacoes, semente=42):
+    """Catálogo e histórico sintéticos. Os triggers de Movimentacoes são removidos antes da carga: os relatórios
+    leem só Produtos e Movimentacoes, e a carga com os resumos e as camadas PEPS levaria muito mais tempo."""
+    rng = np.random.default_rng(semente)
+    aplicar_migracoes(conn)
+    conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+    estoque = rng.integers(0, 200, n_produtos)
+    minimo = rng.integers(0, 60, n_produtos)
+    conn.executemany('''INSERT INTO Produtos (cd_produto, nm_produto, ds_produto, categoria_id, vr_custo, vr_venda,
+                                              vr_estoque_atual, vr_estoque_minimo) VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                     ((i + 1, f"Peça {i + 1}", "Sintética", i % len(CATEGORIAS_PADRAO) + 1, float(i % 97 + 5),
+                       float(i % 97 + 5) * 2, int(estoque[i]), int(minimo[i])) for i in range(n_produtos)))
+    for (nome,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'Movimentacoes'").fetchall():
+        conn.execute(f"DROP TRIGGER {nome}")
+    conn.commit()
+
+    base = datetime(2020, 1, 1)
+    for primeira in range(0, n_movimentacoes, LOTE_INSERCAO):
+        n = min(LOTE_INSERCAO, n_movimentacoes - primeira)
+        produtos = rng.integers(1, n_produtos + 1, n)
+        entrada = rng.random(n) < 0.45
+        motivos = np.where(entrada, rng.choice(MOTIVOS_ENTRADA, n, p=[0.9, 0.1]),
+                           rng.choice(MOTIVOS_SAIDA, n, p=[0.85, 0.05, 0.1]))
+        quantidades = np.where(entrada, rng.integers(5, 30, n), rng.integers(1, 15, n))
+        custos = (produtos % 97 + 5) * rng.uniform(0.9, 1.1, n)
+        conn.executemany('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                            VALUES (?, ?, ?, ?, ?, ?)''',
+                         ((p, "Entrada" if e else "Saida", q, (base + timedelta(seconds=(primeira + i) * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+                           m, round(c, 2) if e else None)
+                          for i, (p, e, m, q, c) in enumerate(zip(produtos.tolist(), entrada.tolist(), motivos.tolist(),
+                                                                  quantidades.tolist(), custos.tolist()))))
+        conn.commit()
+    conn.execute("ANALYZE")
+    registrar_snapshot(conn)
+
+
+def antigo_produtos(conn):
+    return {nome: pd.read_sql_query(query, conn) for nome, query in ANTIGAS_PRODUTOS.items()}
+
+
+def antigo_movimentacoes(conn):
+    return {nome: pd.read_sql_query(query, conn) for nome, query in ANTIGAS_MOVIMENTACOES.items()}
+
+
+def novo_produtos(conn):
+    return relatorios_produtos(pd.read_sql_query(CONSULTA_PRODUTOS, conn), pd.read_sql_query(CONSULTA_CATEGORIAS, conn))
+
+
+def novo_movimentacoes(conn):
+    relatorios = relatorios_movimentacoes(pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn))
+    relatorios["valoracao"] = pd.read_sql_query(CONSULTA_VALORACAO_LEDGER, conn)
+    return relatorios
+
+
+PAGINAS = {"Consultar": (antigo_produtos, novo_produtos), "Movimentações": (antigo_movimentacoes, novo_movimentacoes)}
+
+
+def medir(funcao, conn, repeticoes):
+    """Mediana em segundos e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(conn)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=100_000)
+    parser.add_argument("--movimentacoes", type=int, default=5_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        conn = conectar(Path(pasta) / "relatorios.db")
+        inicio = time.perf_counter()
+        popular(conn, args.produtos, args.movimentacoes)
+        print(f"carga: {args.produtos:,} produtos e {args.movimentacoes:,} movimentações em {time.perf_counter() - inicio:.1f}s")
+
+        print(f"{'Página':<15} {'antigo':>9} {'novo':>9} {'ganho':>7}  mesmos resultados")
+        for pagina, (funcao_antiga, funcao_nova) in PAGINAS.items():
+            segundos_antigo, antigos = medir(funcao_antiga, conn, args.repeticoes)
+            segundos_novo, novos = medir(funcao_nova, conn, args.repeticoes)
+            iguais = True
+            for relatorio, df in antigos.items():
+                try:
+                    pd.testing.assert_frame_equal(df, novos[relatorio], check_dtype=False)
+                except AssertionError:
+                    iguais = False
+            print(f"{pagina:<15} {segundos_antigo * 1000:7.0f}ms {segundos_novo * 1000:7.0f}ms "
+                  f"{segundos_antigo / segundos_novo:6.1f}x  {'sim' if iguais else 'NÃO'}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Suíte de benchmarks do inventário em várias escalas, com resultado em JSON para comparar versões.
+
+Para cada escala, gera um banco sintético reprodutível (``sintetico.gerar_banco``, mesma semente = mesmo banco)
+e mede:
+
+* carga: geração do banco (movimentações por segundo, com os triggers de resumo);
+* páginas: cada página do app pelo ``AppTest``, num processo novo (primeira visita, rerun e o tempo das
+  instruções SQL que a página disparou, pela instrumentação das conexões);
+* ajuste de estoque: ``movimentar_estoque`` em produtos sorteados (latência e operações por segundo);
+* importação: produtos novos e movimentações em Parquet pelo ``importacao.py`` (linhas por segundo).
+
+    python benchmarks/bench_suite.py --escalas pequena media --saida resultados.json
+    python benchmarks/bench_suite.py --escalas pequena --comparar resultados.json
+
+Com ``--comparar``, cada métrica é comparada com o JSON anterior; a saída é 1 se alguma piorou além da tolerância.
+Métricas terminadas em ``_ms`` ou ``_s`` são melhores menores; terminadas em ``_por_segundo``, maiores. Tempos abaixo
+de 1 ms nas duas execuções não entram na comparação.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.estoque import movimentar_estoque
+from sistema_de_Inventario.importacao import COLUNAS_PRODUTOS, importar_movimentacoes, importar_produtos
+from sistema_de_Inventario.paginas import PAGINAS
+from sistema_de_Inventario.sintetico import SEMENTE, gerar_banco, gerar_movimentacoes, gerar_produtos
+from sistema_de_Inventario.tempos import percentis
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# nome -> (produtos, movimentações)
+ESCALAS = {
+    "pequena": (1_000, 20_000),
+    "media": (10_000, 500_000),
+    "grande": (100_000, 5_000_000),
+}
+
+
+def medir_paginas(reruns):
+    """Roda dentro do subprocesso, na pasta com SQLite/inventario.db e app.py: tempos (ms) de cada página."""
+    from streamlit.testing.v1 import AppTest
+
+    from sistema_de_Inventario.paginas.comum import obter_registro_consultas
+
+    app = AppTest.from_file(str(Path.cwd() / "app.py"), default_timeout=600)
+    app.run()
+    resultado = {}
+    for pagina in PAGINAS:
+        inicio = time.perf_counter()
+        app.sidebar.radio[0].set_value(pagina).run()
+        primeira = time.perf_counter() - inicio
+        tempos = []
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            app.run()
+            tempos.append(time.perf_counter() - inicio)
+        resultado[pagina] = {"primeira_visita_ms": primeira * 1000, "rerun_ms": statistics.median(tempos) * 1000,
+                             "erros": [str(excecao.value) for excecao in app.exception]}
+    for linha in obter_registro_consultas().resumo_paginas():
+        if linha["pagina"] in resultado:
+            resultado[linha["pagina"]].update({"sql_instrucoes": linha["execucoes"], "sql_total_ms": linha["total_ms"],
+                                               "sql_p95_ms": linha["p95_ms"]})
+    return resultado
+
+
+def medir_ajuste_estoque(caminho, n_produtos, operacoes, semente):
+    """Latência de ``movimentar_estoque`` (uma transação por ajuste) em produtos sorteados."""
+    sorteio = random.Random(semente)
+    conn = sqlite3.connect(caminho)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    tempos = []
+    try:
+        for i in range(operacoes):
+            # Entrada e saída alternadas: o saldo volta ao que era e nenhuma saída falta estoque
+            tp_movimento, nm_motivo = ("Entrada", "Devolução") if i % 2 == 0 else ("Saida", "Venda")
+            inicio = time.perf_counter()
+            movimentar_estoque(conn, sorteio.randint(1, n_produtos), tp_movimento, 1, nm_motivo)
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        conn.close()
+    mediana, p95, p99 = percentis(tempos)
+    return {"operacoes": operacoes, "mediana_ms": mediana * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000,
+            "operacoes_por_segundo": operacoes / sum(tempos)}
+
+
+def medir_importacao(caminho, pasta, n_produtos, n_movimentacoes, semente):
+    """Importação de um catálogo de produtos novos e de um mês de movimentações, em Parquet."""
+    novos = gerar_produtos(max(n_produtos // 10, 100), semente + 1)
+    novos["cd_produto"] += n_produtos
+    novos["vr_estoque_atual"] = 0
+    novos["vr_estoque_minimo"] = 5
+    arquivo_produtos = pasta / "produtos_novos.parquet"
+    novos[COLUNAS_PRODUTOS].to_parquet(arquivo_produtos, index=False)
+
+    catalogo = gerar_produtos(n_produtos, SEMENTE)
+    arquivo_movimentacoes = pasta / "movimentacoes_mes.parquet"
+    lotes = gerar_movimentacoes(catalogo, max(n_movimentacoes // 20, 1_000), datetime.now(), dias=30, semente=semente + 1)
+    pd.concat(lotes, ignore_index=True).to_parquet(arquivo_movimentacoes, index=False)
+
+    conn = sqlite3.connect(caminho)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    try:
+        resultados = {}
+        for nome, importar, arquivo in [("produtos", importar_produtos, arquivo_produtos),
+                                        ("movimentacoes", importar_movimentacoes, arquivo_movimentacoes)]:
+            carga = importar(conn, arquivo)
+            resultados[nome] = {"linhas": carga.lidas, "rejeitadas": carga.rejeitadas, "total_s": carga.segundos,
+                                "linhas_por_segundo": carga.linhas_por_segundo}
+    finally:
+        conn.close()
+    return resultados
+
+
+def rodar_escala(nome, n_produtos, n_movimentacoes, args):
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta = Path(pasta)
+        (pasta / "SQLite").mkdir()
+        caminho = pasta / "SQLite" / "inventario.db"
+        geracao = gerar_banco(caminho, n_produtos, n_movimentacoes, args.semente)
+        print(f"[{nome}] banco: {geracao.produtos:,} produtos, {geracao.movimentacoes:,} movimentações em "
+              f"{geracao.segundos:.1f}s", flush=True)
+        resultado = {"produtos": n_produtos, "movimentacoes": n_movimentacoes,
+                     "carga": {"total_s": geracao.segundos, "movimentacoes_por_segundo": geracao.movimentacoes_por_segundo}}
+
+        shutil.copy(RAIZ / "app.py", pasta)
+        saida = subprocess.run([sys.executable, os.path.abspath(__file__), "--paginas-internas", "--reruns", str(args.reruns)],
+                               cwd=pasta, capture_output=True, text=True, check=True).stdout
+        resultado["paginas"] = json.loads(saida.strip().splitlines()[-1])
+        for pagina, tempos in resultado["paginas"].items():
+            print(f"[{nome}] {pagina:<18} 1ª visita {tempos['primeira_visita_ms']:8.0f}ms  rerun {tempos['rerun_ms']:7.0f}ms  "
+                  f"SQL {tempos.get('sql_total_ms', 0):8.0f}ms", flush=True)
+            for erro in tempos["erros"]:
+                print(f"  erro: {erro}")
+
+        resultado["ajuste_estoque"] = medir_ajuste_estoque(caminho, n_produtos, args.ajustes, args.semente)
+        print(f"[{nome}] ajuste de estoque: mediana {resultado['ajuste_estoque']['mediana_ms']:.2f}ms, "
+              f"p95 {resultado['ajuste_estoque']['p95_ms']:.2f}ms", flush=True)
+        resultado["importacao"] = medir_importacao(caminho, pasta, n_produtos, n_movimentacoes, args.semente)
+        for tipo, carga in resultado["importacao"].items():
+            print(f"[{nome}] importação de {tipo}: {carga['linhas']:,} linhas, {carga['linhas_por_segundo']:,.0f} linhas/s",
+                  flush=True)
+        return resultado
+
+
+def _metricas(dados, prefixo=""):
+    """Achata o JSON em {caminho: valor} só com as métricas comparáveis."""
+    for chave, valor in dados.items():
+        caminho = f"{prefixo}{chave}"
+        if isinstance(valor, dict):
+            yield from _metricas(valor, caminho + ".")
+        elif isinstance(valor, (int, float)) and chave.endswith(("_ms", "_s", "_por_segundo")):
+            yield caminho, valor
+
+
+def comparar(atual, anterior, tolerancia):
+    """Imprime a variação de cada métrica presente nos dois resultados; devolve as que pioraram além da tolerância."""
+    anteriores = dict(_metricas(anterior["escalas"]))
+    pioras = []
+    print(f"\nComparação com {anterior.get('commit') or '?'} ({anterior.get('gerado_em')}):")
+    for caminho, valor in _metricas(atual["escalas"]):
+        base = anteriores.get(caminho)
+        # Tempos abaixo de 1 ms oscilam mais que a tolerância de uma execução para outra
+        if not base or not valor or (caminho.endswith("_ms") and max(base, valor) < 1.0):
+            continue
+        # Razão > 1 é sempre piora: tempo maior ou vazão menor
+        razao = base / valor if caminho.endswith("_por_segundo") else valor / base
+        piorou = razao > 1 + tolerancia
+        if piorou:
+            pioras.append(caminho)
+        print(f"{'PIOROU ' if piorou else '       '}{caminho:<70} {base:12.2f} -> {valor:12.2f}  ({razao:5.2f}x)")
+    return pioras
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", choices=list(ESCALAS), default=["pequena", "media"])
+    parser.add_argument("--semente", type=int, default=SEMENTE)
+    parser.add_argument("--reruns", type=int, default=5)
+    parser.add_argument("--ajustes", type=int, default=2_000, help="operações de ajuste de estoque")
+    parser.add_argument("--saida", type=Path, help="grava o resultado neste JSON")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora aceita na comparação (0.2 = 20%%)")
+    parser.add_argument("--paginas-internas", action="store_true", help=argparse.SUPPRESS)  # uso interno: subprocesso
+    args = parser.parse_args()
+
+    if args.paginas_internas:
+        print(json.dumps(medir_paginas(args.reruns)))
+        return
+
+    resultado = {"gerado_em": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "commit": _commit(),
+                 "python": platform.python_version(), "sqlite": sqlite3.sqlite_version, "semente": args.semente,
+                 "escalas": {}}
+    for nome in args.escalas:
+        resultado["escalas"][nome] = rodar_escala(nome, *ESCALAS[nome], args)
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nResultado gravado em {args.saida}")
+    if args.comparar:
+        pioras = comparar(resultado, json.loads(args.comparar.read_text(encoding="utf-8")), args.tolerancia)
+        if pioras:
+            raise SystemExit(f"{len(pioras)} métricas pioraram mais de {args.tolerancia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
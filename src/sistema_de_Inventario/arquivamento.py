@@ -0,0 +1,187 @@
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sistema_de_Inventario.conciliacao import consolidar_ledger
+from sistema_de_Inventario.db import CAMINHO_DB
+
+
+RETENCAO_DIAS = 365
+PASTA_ARQUIVO = "arquivo"     # ao lado do banco principal
+APELIDO = "arquivo"           # nome do banco anexado nas consultas
+
+# Mesmas colunas de Movimentacoes; o id é preservado (o AUTOINCREMENT do banco principal nunca o reaproveita)
+ESQUEMA_ARQUIVO = [
+    '''CREATE TABLE IF NOT EXISTS {apelido}.Movimentacoes (
+            id INTEGER PRIMARY KEY,
+            produto_id INTEGER,
+            tp_movimento TEXT,
+            qt_movimento INTEGER,
+            data_hora DATETIME,
+            nm_motivo TEXT,
+            vr_custo_unitario REAL
+        )''',
+    "CREATE INDEX IF NOT EXISTS {apelido}.idx_movimentacoes_data_id ON Movimentacoes (data_hora)",
+    "CREATE INDEX IF NOT EXISTS {apelido}.idx_movimentacoes_produto_data ON Movimentacoes (produto_id, data_hora)",
+]
+
+COLUNAS = "id, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario"
+
+# Totais do mês por produto, somados ao resumo antes de as linhas saírem do banco principal (mesma regra de
+# relatorios.CONSULTA_MOVIMENTOS_POR_PRODUTO: perdas sem custo na movimentação ficam em quantidade)
+_TOTAIS_DO_MES = '''SELECT produto_id,
+                           SUM(tp_movimento = 'Saida'), TOTAL(CASE WHEN tp_movimento = 'Saida' THEN qt_movimento END),
+                           SUM(nm_motivo = 'Perda'), TOTAL(CASE WHEN nm_motivo = 'Perda' THEN qt_movimento END),
+                           TOTAL(CASE WHEN nm_motivo = 'Perda' THEN qt_movimento * vr_custo_unitario END),
+                           TOTAL(CASE WHEN nm_motivo = 'Perda' AND vr_custo_unitario IS NULL THEN qt_movimento END)
+                    FROM main.Movimentacoes WHERE data_hora >= ? AND data_hora < ?
+                    GROUP BY produto_id'''
+
+
+@dataclass
+class ResultadoArquivamento:
+    meses: int = 0
+    movimentacoes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def movimentacoes_por_segundo(self):
+        return self.movimentacoes / self.segundos if self.segundos else 0.0
+
+
+def _proximo_mes(mes):
+    ano, numero = map(int, mes.split("-"))
+    return f"{ano + numero // 12:04d}-{numero % 12 + 1:02d}"
+
+
+def pasta_arquivo(conn):
+    """Pasta dos arquivos mensais do banco ``conn`` (``None`` para bancos em memória)."""
+    caminho = next(arquivo for _, nome, arquivo in conn.execute("PRAGMA database_list") if nome == "main")
+    return Path(caminho).parent / PASTA_ARQUIVO if caminho else None
+
+
+def meses_arquivados(conn, dt_inicio=None, dt_fim=None):
+    """``(mês, caminho do arquivo)`` dos meses arquivados que o período alcança, do mais recente ao mais antigo."""
+    pasta = pasta_arquivo(conn)
+    linhas = conn.execute('''SELECT nm_mes, nm_arquivo FROM Arquivos_Movimentacoes
+                             WHERE nm_mes >= ? AND nm_mes <= ? ORDER BY nm_mes DESC''',
+                          (str(dt_inicio)[:7] if dt_inicio else "", str(dt_fim)[:7] if dt_fim else "9999"))
+    return [(mes, pasta / arquivo) for mes, arquivo in linhas]
+
+
+@contextmanager
+def anexar(conn, caminho, apelido=APELIDO):
+    """Anexa o arquivo mensal como ``apelido`` durante o bloco (fora de transação: o SQLite não anexa dentro de uma)."""
+    conn.execute("ATTACH DATABASE ? AS " + apelido, (str(caminho),))
+    try:
+        yield apelido
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute("DETACH DATABASE " + apelido)
+
+
+def arquivar_mes(conn, mes, agora):
+    """Move as movimentações de ``mes`` ('AAAA-MM') para o arquivo mensal; devolve quantas saíram do banco.
+
+    Em duas transações, para nenhuma linha se perder se o processo cair no meio: primeiro a cópia é gravada
+    no arquivo (``INSERT OR IGNORE``: rodar de novo não duplica); depois, no banco principal, o ledger é
+    consolidado, os totais de giro e perdas vão para ``Resumo_Arquivado_Produto``, as linhas são apagadas e
+    o mês é registrado em ``Arquivos_Movimentacoes``. Os resumos mantidos por trigger não descontam exclusões.
+    """
+    pasta = pasta_arquivo(conn)
+    pasta.mkdir(parents=True, exist_ok=True)
+    nm_arquivo = f"movimentacoes_{mes}.db"
+    faixa = (f"{mes}-01", f"{_proximo_mes(mes)}-01")
+
+    with anexar(conn, pasta / nm_arquivo) as apelido:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for comando in ESQUEMA_ARQUIVO:
+                conn.execute(comando.format(apelido=apelido))
+            conn.execute(f'''INSERT OR IGNORE INTO {apelido}.Movimentacoes ({COLUNAS})
+                             SELECT {COLUNAS} FROM main.Movimentacoes WHERE data_hora >= ? AND data_hora < ?''', faixa)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            quantidade, copiadas = conn.execute(
+                f'''SELECT COUNT(*), COUNT(a.id) FROM main.Movimentacoes m LEFT JOIN {apelido}.Movimentacoes a ON a.id = m.id
+                    WHERE m.data_hora >= ? AND m.data_hora < ?''', faixa).fetchone()
+            if copiadas != quantidade:
+                raise RuntimeError(f"Arquivo de {mes} incompleto: {copiadas} de {quantidade} movimentações copiadas")
+            consolidar_ledger(conn, agora)
+            # WHERE true: sem ele o ON CONFLICT seria lido como parte do SELECT
+            conn.execute(f'''INSERT INTO Resumo_Arquivado_Produto (produto_id, qt_mov_saida, qt_saida, qt_mov_perda, qt_perda,
+                                                                   vr_perda_custeada, qt_perda_sem_custo)
+                             SELECT * FROM ({_TOTAIS_DO_MES}) WHERE true
+                             ON CONFLICT (produto_id) DO UPDATE SET
+                                 qt_mov_saida = qt_mov_saida + excluded.qt_mov_saida,
+                                 qt_saida = qt_saida + excluded.qt_saida,
+                                 qt_mov_perda = qt_mov_perda + excluded.qt_mov_perda,
+                                 qt_perda = qt_perda + excluded.qt_perda,
+                                 vr_perda_custeada = vr_perda_custeada + excluded.vr_perda_custeada,
+                                 qt_perda_sem_custo = qt_perda_sem_custo + excluded.qt_perda_sem_custo''', faixa)
+            conn.execute("DELETE FROM main.Movimentacoes WHERE data_hora >= ? AND data_hora < ?", faixa)
+            # Um mês já arquivado pode receber movimentações retroativas, importadas depois
+            conn.execute('''INSERT INTO Arquivos_Movimentacoes (nm_mes, nm_arquivo, qt_movimentacoes, dt_arquivamento)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT (nm_mes) DO UPDATE SET qt_movimentacoes = qt_movimentacoes + excluded.qt_movimentacoes,
+                                                               dt_arquivamento = excluded.dt_arquivamento''',
+                         (mes, nm_arquivo, quantidade, agora))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        # O arquivo não recebe mais escritas: compacta as páginas de uma vez
+        conn.execute(f"VACUUM {apelido}")
+    return quantidade
+
+
+def arquivar_movimentacoes(conn, retencao_dias=RETENCAO_DIAS, hoje=None):
+    """Arquiva, mês a mês, as movimentações dos meses inteiros anteriores à janela de retenção.
+
+    O mês que contém o início da janela fica no banco principal, então nenhum arquivo guarda um mês pela metade.
+    """
+    resultado = ResultadoArquivamento()
+    inicio = time.perf_counter()
+    hoje = hoje or date.today()
+    corte = (hoje - timedelta(days=retencao_dias)).strftime("%Y-%m-01")
+    meses = [mes for (mes,) in conn.execute('''SELECT DISTINCT SUBSTR(data_hora, 1, 7) FROM Movimentacoes
+                                                WHERE data_hora < ? ORDER BY 1''', (corte,))]
+    for mes in meses:
+        resultado.movimentacoes += arquivar_mes(conn, mes, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        resultado.meses += 1
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Move as movimentações antigas para arquivos SQLite mensais, fora do banco principal.")
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--retencao-dias", type=int, default=RETENCAO_DIAS,
+                        help="movimentações mais novas que isso ficam no banco principal")
+    parser.add_argument("--vacuum", action="store_true", help="compacta o banco principal depois de arquivar")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        resultado = arquivar_movimentacoes(conn, args.retencao_dias)
+        print(f"{resultado.movimentacoes} movimentações de {resultado.meses} meses arquivadas em {resultado.segundos:.1f}s "
+              f"({resultado.movimentacoes_por_segundo:,.0f}/s) em {pasta_arquivo(conn)}")
+        if args.vacuum and resultado.movimentacoes:
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import re
+
+import pandas as pd
+
+
+LIMITE_RESULTADOS = 200
+
+# Pesos do bm25 por coluna do índice: código, nome, descrição
+PESOS_BM25 = (10.0, 5.0, 1.0)
+
+COLUNAS_CONSULTA = """p.cd_produto AS 'Código', p.nm_produto AS 'Produto', p.ds_produto AS 'Descrição',
+                      p.categoria_id AS 'Categoria', p.vr_custo AS 'Custo', p.vr_venda AS 'Valor de Venda',
+                      p.vr_estoque_atual AS 'Estoque', p.vr_estoque_minimo AS 'Estoque Mínimo'"""
+
+
+def montar_consulta_fts(texto):
+    """Converte o texto digitado numa expressão MATCH segura: cada palavra vira um prefixo entre aspas.
+
+    Operadores do FTS5 (AND, OR, NEAR, aspas, asteriscos...) digitados pelo usuário são tratados como texto.
+    Devolve ``None`` quando não sobra nenhuma palavra para buscar.
+    """
+    termos = re.findall(r"\w+", texto or "")
+    if not termos:
+        return None
+    return " ".join(f'"{termo}"*' for termo in termos)
+
+
+def buscar_produtos(conn, texto, limite=LIMITE_RESULTADOS):
+    """Busca produtos por código, nome ou descrição no índice Produtos_fts, ordenados por relevância."""
+    consulta = montar_consulta_fts(texto)
+    if consulta is None:
+        return pd.DataFrame(columns=["Código", "Produto", "Descrição", "Categoria", "Custo",
+                                     "Valor de Venda", "Estoque", "Estoque Mínimo"])
+    query = f'''SELECT {COLUNAS_CONSULTA}
+                FROM Produtos_fts f
+                JOIN Produtos p ON p.cd_produto = f.rowid
+                WHERE Produtos_fts MATCH ?
+                ORDER BY bm25(Produtos_fts, ?, ?, ?)
+                LIMIT ?'''
+    return pd.read_sql_query(query, conn, params=(consulta, *PESOS_BM25, limite))
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+TAMANHO_MAXIMO = 128
+
+
+def versao_dados(conn, chave="dados"):
+    """Versão atual dos dados, incrementada por triggers a cada escrita (ver migracoes.py, versão 6)."""
+    linha = conn.execute("SELECT nr_versao FROM Versoes_Dados WHERE nm_chave = ?", (chave,)).fetchone()
+    return linha[0] if linha else 0
+
+
+class CacheConsultas:
+    """Cache LRU de resultados de consultas somente leitura, chaveado por SQL e parâmetros.
+
+    Cada entrada guarda a versão dos dados em que foi calculada; quando alguma escrita incrementa
+    ``Versoes_Dados``, as entradas antigas deixam de valer e a consulta é executada de novo. Consultas que
+    dependem de outras chaves além de 'dados' (``chaves``) guardam também a versão delas.
+    """
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO):
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas = OrderedDict()
+        self._versao = None
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def ler(self, conn, query, params=(), chaves=()):
+        versao = versao_dados(conn)
+        extras = tuple(versao_dados(conn, outra) for outra in chaves)
+        chave = (query, tuple(params))
+        with self._trava:
+            if versao != self._versao:
+                # Os dados mudaram: nenhuma entrada guardada vale mais
+                self._entradas.clear()
+                self._versao = versao
+            guardada = self._entradas.get(chave)
+            if guardada is not None and guardada[0] == extras:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return guardada[1].copy()
+            self.falhas += 1
+
+        df = pd.read_sql_query(query, conn, params=params)
+        with self._trava:
+            if versao == self._versao:
+                self._entradas[chave] = (extras, df)
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.tamanho_maximo:
+                    self._entradas.popitem(last=False)
+        return df.copy()
+
+    def limpar(self):
+        with self._trava:
+            self._entradas.clear()
+            self._versao = None
+
+    def estatisticas(self):
+        with self._trava:
+            total = self.acertos + self.falhas
+            return {
+                "entradas": len(self._entradas),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / total if total else 0.0,
+                "versao_dados": self._versao,
+            }
@@ -0,0 +1,174 @@
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+from sistema_de_Inventario.curva_abc import atualizar_curvas_abc
+from sistema_de_Inventario.db import CAMINHO_DB
+from sistema_de_Inventario.migracoes import aplicar_migracoes
+
+
+# A partir de quantas movimentações ainda não consolidadas a página de Movimentações avisa que o job parou
+MOVIMENTACOES_POR_SNAPSHOT = 100_000
+DIVERGENCIAS_MOSTRADAS = 20
+
+_ULTIMA_CONSOLIDADA = "COALESCE((SELECT nr_ultima_movimentacao FROM Snapshots_Ledger ORDER BY id DESC LIMIT 1), 0)"
+
+# Saldo por produto das movimentações com id na faixa (?, ?]: leitura pela faixa do rowid, não pelo histórico.
+# NOT INDEXED: sem ele o planejador prefere varrer o índice de cobertura (produto_id, ...), já ordenado para o GROUP BY
+_SALDO_FAIXA = '''SELECT produto_id, COUNT(*) AS qt_movimentacoes,
+                         COALESCE(SUM(CASE tp_movimento WHEN 'Entrada' THEN qt_movimento
+                                                        WHEN 'Saida' THEN -qt_movimento ELSE 0 END), 0) AS qt_delta
+                  FROM Movimentacoes NOT INDEXED WHERE id > ? AND id <= ? GROUP BY produto_id'''
+
+# Saldo do ledger de cada produto: o do último snapshot mais as movimentações gravadas depois dele
+CONSULTA_SALDOS_LEDGER = f'''SELECT p.cd_produto, p.nm_produto, p.vr_estoque_atual,
+                                    COALESCE(s.qt_saldo, 0) + COALESCE(d.qt_delta, 0) AS qt_ledger
+                             FROM Produtos p
+                             LEFT JOIN Saldos_Snapshot s ON s.produto_id = p.cd_produto
+                             LEFT JOIN (SELECT produto_id,
+                                               SUM(CASE tp_movimento WHEN 'Entrada' THEN qt_movimento
+                                                                     WHEN 'Saida' THEN -qt_movimento ELSE 0 END) AS qt_delta
+                                        FROM Movimentacoes NOT INDEXED WHERE id > {_ULTIMA_CONSOLIDADA}
+                                        GROUP BY produto_id) d ON d.produto_id = p.cd_produto
+                             ORDER BY p.cd_produto'''
+
+# Tabela "Valoração de Inventário" da página de Movimentações (mesmas colunas do relatório pelo histórico inteiro)
+CONSULTA_VALORACAO_LEDGER = f'''SELECT nm_produto, vr_estoque_atual AS 'Estoque No Cadastro',
+                                       qt_ledger AS 'Estoque Calculado Histórico'
+                                FROM ({CONSULTA_SALDOS_LEDGER})'''
+
+CONSULTA_DIVERGENCIAS = '''SELECT d.produto_id AS 'Código', p.nm_produto AS 'Produto', d.qt_cadastro AS 'Estoque No Cadastro',
+                                  d.qt_ledger AS 'Estoque pelo Ledger', d.qt_ledger - COALESCE(d.qt_cadastro, 0) AS 'Diferença',
+                                  d.dt_deteccao AS 'Detectada em'
+                           FROM Divergencias_Estoque d JOIN Produtos p ON p.cd_produto = d.produto_id
+                           ORDER BY ABS(d.qt_ledger - COALESCE(d.qt_cadastro, 0)) DESC, d.produto_id'''
+
+
+@dataclass
+class ResultadoConciliacao:
+    produtos: int = 0
+    divergencias: int = 0
+    movimentacoes_consolidadas: int = 0
+    ultima_movimentacao: int = 0
+    segundos: float = 0.0
+
+
+def ultimo_snapshot(conn):
+    """``(id da última movimentação consolidada, data do snapshot)``, ou ``(0, None)`` se ainda não houve snapshot."""
+    linha = conn.execute('''SELECT nr_ultima_movimentacao, dt_snapshot FROM Snapshots_Ledger
+                            ORDER BY id DESC LIMIT 1''').fetchone()
+    return linha if linha else (0, None)
+
+
+def movimentacoes_pendentes(conn):
+    """Quantas movimentações (no máximo) foram gravadas depois do último snapshot, pela diferença de ids."""
+    ultima = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Movimentacoes").fetchone()[0]
+    return max(ultima - ultimo_snapshot(conn)[0], 0)
+
+
+def consolidar_ledger(conn, agora):
+    """Soma ao snapshot as movimentações novas, dentro da transação de quem chama; devolve ``(quantidade, último id)``."""
+    anterior = ultimo_snapshot(conn)[0]
+    ultima = conn.execute("SELECT COALESCE(MAX(id), 0) FROM Movimentacoes").fetchone()[0]
+    if ultima <= anterior:
+        return 0, anterior
+    quantidade = conn.execute(f"SELECT COALESCE(SUM(qt_movimentacoes), 0) FROM ({_SALDO_FAIXA})",
+                              (anterior, ultima)).fetchone()[0]
+    # WHERE true: sem ele o ON CONFLICT seria lido como parte do SELECT
+    conn.execute(f'''INSERT INTO Saldos_Snapshot (produto_id, qt_saldo)
+                     SELECT produto_id, qt_delta FROM ({_SALDO_FAIXA}) WHERE true
+                     ON CONFLICT (produto_id) DO UPDATE SET qt_saldo = qt_saldo + excluded.qt_saldo''', (anterior, ultima))
+    conn.execute("INSERT INTO Snapshots_Ledger (nr_ultima_movimentacao, qt_movimentacoes, dt_snapshot) VALUES (?, ?, ?)",
+                 (ultima, quantidade, agora))
+    return quantidade, ultima
+
+
+def registrar_snapshot(conn):
+    """Consolida as movimentações gravadas desde o último snapshot; devolve quantas foram somadas."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        quantidade, _ = consolidar_ledger(conn, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return quantidade
+
+
+def conciliar(conn, snapshot=True):
+    """Compara o saldo do ledger (snapshot + movimentações novas) com ``Produtos.vr_estoque_atual``.
+
+    As divergências ficam em ``Divergencias_Estoque`` com a data em que apareceram pela primeira vez; as que
+    sumiram são apagadas. Com ``snapshot``, as movimentações novas são consolidadas antes, na mesma transação,
+    e a próxima conciliação relê só o que entrar depois. O custo não cresce com o tamanho do histórico.
+    """
+    resultado = ResultadoConciliacao()
+    inicio = time.perf_counter()
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if snapshot:
+            resultado.movimentacoes_consolidadas, resultado.ultima_movimentacao = consolidar_ledger(conn, agora)
+        else:
+            resultado.ultima_movimentacao = ultimo_snapshot(conn)[0]
+        detectadas = dict(conn.execute("SELECT produto_id, dt_deteccao FROM Divergencias_Estoque"))
+        divergencias = []
+        for cd_produto, _, qt_cadastro, qt_ledger in conn.execute(CONSULTA_SALDOS_LEDGER):
+            resultado.produtos += 1
+            if qt_ledger != (qt_cadastro or 0):
+                divergencias.append((cd_produto, qt_ledger, qt_cadastro, detectadas.get(cd_produto, agora)))
+        conn.execute("DELETE FROM Divergencias_Estoque")
+        conn.executemany('''INSERT INTO Divergencias_Estoque (produto_id, qt_ledger, qt_cadastro, dt_deteccao)
+                            VALUES (?, ?, ?, ?)''', divergencias)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    resultado.divergencias = len(divergencias)
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Concilia o estoque do cadastro com o ledger de movimentações, a partir do último snapshot.")
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--sem-snapshot", action="store_true", help="só compara, sem consolidar as movimentações novas")
+    parser.add_argument("--sem-curva-abc", action="store_true",
+                        help="não recalcula a curva ABC (por padrão, recalculada junto com a conciliação)")
+    parser.add_argument("--intervalo", type=float, default=0,
+                        help="repete a conciliação a cada N segundos (job em segundo plano); 0 = roda uma vez")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    resultado = ResultadoConciliacao()
+    try:
+        # Snapshots_Ledger e Divergencias_Estoque vêm da migração 10
+        aplicar_migracoes(conn)
+        while True:
+            resultado = conciliar(conn, snapshot=not args.sem_snapshot)
+            print(f"{datetime.now():%Y-%m-%d %H:%M:%S} {resultado.produtos} produtos conciliados em "
+                  f"{resultado.segundos * 1000:.0f}ms ({resultado.movimentacoes_consolidadas} movimentações novas "
+                  f"consolidadas, até a {resultado.ultima_movimentacao}); {resultado.divergencias} divergências", flush=True)
+            for linha in conn.execute(CONSULTA_DIVERGENCIAS + f" LIMIT {DIVERGENCIAS_MOSTRADAS}"):
+                print("  produto {}: {}, cadastro {}, ledger {} (diferença {}, desde {})".format(*linha))
+            if not args.sem_curva_abc:
+                # Mantém a curva em dia mesmo sem ninguém abrir o Dashboard; só regrava os produtos que mudaram
+                regravadas = atualizar_curvas_abc(conn)
+                print("  curva ABC: " + ", ".join(f"{base} {quantidade} produtos regravados"
+                                                  for base, quantidade in regravadas.items()), flush=True)
+            if not args.intervalo:
+                break
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+    if not args.intervalo and resultado.divergencias:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from sistema_de_Inventario.cache import versao_dados
+
+
+# Percentual acumulado máximo de cada classe: até 80% = A, até 95% = B, o restante = C
+LIMITES_ABC = (80.0, 95.0)
+CLASSES = np.array(["A", "B", "C"])
+
+# Bases de cálculo (valor parado em estoque ou valor das saídas numa janela de tempo) e as chaves de
+# Versoes_Dados de que cada uma depende
+BASES = {
+    "estoque": ("estoque_custo",),
+    "saidas": ("estoque_custo", "movimentacoes"),
+}
+
+# Janela em dias de cada base no Dashboard (None = sem janela)
+JANELAS = {"estoque": None, "saidas": 90}
+
+# Diferença a partir da qual uma linha gravada é regravada: meio centavo no valor, centésimo de ponto percentual
+TOLERANCIA_VALOR = 0.005
+TOLERANCIA_PERCENTUAL = 0.01
+
+
+def classificar(valores, limites=LIMITES_ABC):
+    """Classifica um vetor de valores em A/B/C pelo percentual acumulado, em ordem decrescente de valor.
+
+    Devolve ``(ordem, percentual_individual, percentual_acumulado, classes)``, já na ordem decrescente;
+    ``ordem`` são os índices dos valores originais.
+    """
+    valores = np.nan_to_num(np.asarray(valores, dtype=float))
+    ordem = np.argsort(-valores, kind="stable")
+    ordenados = valores[ordem]
+    total = ordenados.sum()
+    if total <= 0:
+        zeros = np.zeros(len(ordenados))
+        return ordem, zeros, zeros, np.full(len(ordenados), "C")
+    individual = ordenados / total * 100
+    acumulado = np.cumsum(individual)
+    classes = CLASSES[np.searchsorted(np.asarray(limites), acumulado, side="left")]
+    return ordem, individual, acumulado, classes
+
+
+def _valores_base(conn, base, dias):
+    if base == "estoque":
+        return pd.read_sql_query('''SELECT cd_produto, COALESCE(vr_estoque_atual * vr_custo, 0) AS valor
+                                    FROM Produtos''', conn)
+    if base == "saidas":
+        condicao, parametros = "", []
+        if dias:
+            condicao = "AND m.data_hora >= ?"
+            parametros.append((datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S"))
+        return pd.read_sql_query(f'''SELECT p.cd_produto, COALESCE(SUM(m.qt_movimento), 0) * p.vr_custo AS valor
+                                     FROM Produtos p
+                                     LEFT JOIN Movimentacoes m
+                                       ON m.produto_id = p.cd_produto AND m.tp_movimento = 'Saida' {condicao}
+                                     GROUP BY p.cd_produto''', conn, params=parametros)
+    raise ValueError(f"Base de cálculo desconhecida: {base}")
+
+
+def calcular_curva_abc(conn, base="estoque", dias=None):
+    """Calcula a curva ABC do catálogo inteiro e devolve um DataFrame ordenado por valor."""
+    df = _valores_base(conn, base, dias)
+    ordem, individual, acumulado, classes = classificar(df["valor"].to_numpy())
+    return pd.DataFrame({
+        "cd_produto": df["cd_produto"].to_numpy()[ordem],
+        "cd_classe": classes,
+        "vr_base": df["valor"].to_numpy()[ordem],
+        "pc_individual": individual,
+        "pc_acumulado": acumulado,
+        "nr_posicao": np.arange(1, len(ordem) + 1),
+    })
+
+
+def _diferencas(gravada, nova):
+    """Linhas de ``nova`` que diferem da classificação ``gravada`` e os produtos gravados que saíram do catálogo."""
+    juntas = nova.merge(gravada, on="cd_produto", how="left", suffixes=("", "_gravada"))
+    mudou = juntas["cd_classe"].ne(juntas["cd_classe_gravada"]) | juntas["nr_posicao"].ne(juntas["nr_posicao_gravada"])
+    # Escrito como "fora da tolerância" para que os produtos ainda não gravados (NaN) também contem
+    mudou |= ~(juntas["vr_base"] - juntas["vr_base_gravada"]).abs().le(TOLERANCIA_VALOR)
+    for coluna in ("pc_individual", "pc_acumulado"):
+        mudou |= ~(juntas[coluna] - juntas[coluna + "_gravada"]).abs().le(TOLERANCIA_PERCENTUAL)
+    removidos = gravada.loc[~gravada["cd_produto"].isin(nova["cd_produto"]), "cd_produto"]
+    return nova[mudou.to_numpy()], removidos
+
+
+def atualizar_curva_abc(conn, base="estoque", dias=None, forcar=False):
+    """Recalcula a classificação se os dados da base mudaram e regrava só as linhas que mudaram.
+
+    Para a base de saídas com janela de dias, o cálculo também expira na virada do dia. O cálculo novo é
+    comparado com o gravado: só os produtos que mudaram de classe, de posição, de valor ou de percentual
+    (além da tolerância) são regravados, e a chave 'abc' de ``Versoes_Dados`` só sobe quando algo mudou.
+    Devolve quantas linhas foram regravadas ou apagadas.
+
+    Sem mudança nas versões da base, custa só a leitura delas: o Dashboard pode chamar a cada renderização.
+    """
+    # As versões só crescem, então a soma muda sempre que qualquer uma delas muda
+    versao = sum(versao_dados(conn, chave) for chave in BASES[base])
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    anterior = conn.execute("SELECT nr_versao, nr_dias, dt_calculo FROM Calculos_ABC WHERE tp_base = ?", (base,)).fetchone()
+    if (not forcar and anterior is not None and anterior[0] == versao and anterior[1] == dias
+            and (not dias or anterior[2][:10] == hoje)):
+        return 0
+
+    df = calcular_curva_abc(conn, base, dias)
+    gravada = pd.read_sql_query('''SELECT cd_produto, cd_classe, vr_base, pc_individual, pc_acumulado, nr_posicao
+                                   FROM Classificacao_ABC WHERE tp_base = ?''', conn, params=(base,))
+    mudadas, removidos = _diferencas(gravada, df)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if len(mudadas) or len(removidos):
+            conn.executemany("DELETE FROM Classificacao_ABC WHERE tp_base = ? AND cd_produto = ?",
+                             ((base, int(cd)) for cd in removidos))
+            conn.executemany('''INSERT INTO Classificacao_ABC
+                                (tp_base, cd_produto, cd_classe, vr_base, pc_individual, pc_acumulado, nr_posicao)
+                                VALUES (?, ?, ?, ?, ?, ?, ?)
+                                ON CONFLICT (tp_base, cd_produto) DO UPDATE SET
+                                    cd_classe = excluded.cd_classe, vr_base = excluded.vr_base,
+                                    pc_individual = excluded.pc_individual, pc_acumulado = excluded.pc_acumulado,
+                                    nr_posicao = excluded.nr_posicao''',
+                             ((base, int(cd), classe, float(valor), float(ind), float(acum), int(pos))
+                              for cd, classe, valor, ind, acum, pos in mudadas.itertuples(index=False, name=None)))
+            # Invalida só as leituras da curva nos caches de consultas e de gráficos
+            conn.execute("UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'abc'")
+        conn.execute('''INSERT INTO Calculos_ABC (tp_base, nr_versao, nr_dias, dt_calculo) VALUES (?, ?, ?, ?)
+                        ON CONFLICT (tp_base) DO UPDATE SET
+                            nr_versao = excluded.nr_versao, nr_dias = excluded.nr_dias, dt_calculo = excluded.dt_calculo''',
+                     (base, versao, dias, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return len(mudadas) + len(removidos)
+
+
+def atualizar_curvas_abc(conn):
+    """Atualiza todas as bases com as janelas do Dashboard; devolve as linhas regravadas de cada base."""
+    return {base: atualizar_curva_abc(conn, base, dias) for base, dias in JANELAS.items()}
+
+
+def ultimo_calculo(conn, base="estoque"):
+    """Data do último cálculo gravado da base, ou ``None`` se a curva ainda não foi calculada."""
+    linha = conn.execute("SELECT dt_calculo FROM Calculos_ABC WHERE tp_base = ?", (base,)).fetchone()
+    return linha[0] if linha else None
+
+
+def consulta_curva_abc(base="estoque", limite=None):
+    """SQL e parâmetros da classificação gravada (mais valiosos primeiro), com o nome de cada produto."""
+    query = '''SELECT a.cd_produto, p.nm_produto, a.cd_classe AS Classe, a.vr_base AS valor_total,
+                      a.pc_individual AS percent_individual, a.pc_acumulado AS percent_acumulado
+               FROM Classificacao_ABC a
+               JOIN Produtos p ON p.cd_produto = a.cd_produto
+               WHERE a.tp_base = ?
+               ORDER BY a.nr_posicao'''
+    parametros = (base,)
+    if limite:
+        query += " LIMIT ?"
+        parametros += (limite,)
+    return query, parametros
+
+
+def consulta_resumo_classes(base="estoque"):
+    """SQL e parâmetros da quantidade de produtos e do valor total por classe."""
+    return ('''SELECT cd_classe AS Classe, COUNT(*) AS Produtos, SUM(vr_base) AS Valor
+               FROM Classificacao_ABC WHERE tp_base = ?
+               GROUP BY cd_classe ORDER BY cd_classe''', (base,))
+
+
+def ler_curva_abc(conn, base="estoque", limite=None):
+    query, parametros = consulta_curva_abc(base, limite)
+    return pd.read_sql_query(query, conn, params=parametros)
+
+
+def classes_por_produto(conn, base="estoque"):
+    """Dicionário ``cd_produto -> classe`` da última classificação gravada, para uso em outras páginas."""
+    return dict(conn.execute("SELECT cd_produto, cd_classe FROM Classificacao_ABC WHERE tp_base = ?", (base,)))
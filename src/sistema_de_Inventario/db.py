@@ -0,0 +1,108 @@
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from sistema_de_Inventario.instrumentacao import ConexaoInstrumentada
+
+
+# Caminho padrão do banco de dados (relativo à pasta onde o app é executado)
+CAMINHO_DB = Path("SQLite") / "inventario.db"
+
+# Pragmas aplicados em toda conexão nova do pool. O busy timeout não entra aqui: vem só do ``timeout`` do
+# sqlite3.connect (um PRAGMA busy_timeout aplicado depois o sobrescreveria)
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,   # 256 MB mapeados em memória
+    "cache_size": -65536,     # 64 MB de cache de páginas (valor negativo = KiB)
+    "temp_store": "MEMORY",
+}
+
+
+class PoolConexoes:
+    """Pool de conexões SQLite reaproveitadas entre reruns e sessões do Streamlit.
+
+    Cada conexão é aberta uma única vez, recebe os pragmas de desempenho e volta
+    para a fila ao final do bloco ``with pool.conexao() as conn``. Com um ``registro``
+    (``instrumentacao.RegistroConsultas``), as conexões registram o tempo de cada instrução. ``timeout``
+    (segundos) é o busy timeout de cada conexão e também a espera máxima por uma conexão livre.
+    """
+
+    def __init__(self, caminho=CAMINHO_DB, tamanho=5, timeout=30.0, registro=None):
+        self.caminho = str(caminho)
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self.registro = registro
+        self._livres = queue.LifoQueue()
+        self._todas = []
+        self._trava = threading.Lock()
+        self._checkouts = 0
+        self._esperas = 0
+        self._tempo_espera = 0.0
+
+    def _nova_conexao(self):
+        fabrica = ConexaoInstrumentada if self.registro is not None else sqlite3.Connection
+        conn = sqlite3.connect(self.caminho, check_same_thread=False, timeout=self.timeout, factory=fabrica)
+        for pragma, valor in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        if self.registro is not None:
+            conn.registro = self.registro
+        return conn
+
+    def _retirar(self):
+        inicio = time.perf_counter()
+        try:
+            conn = self._livres.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._trava:
+                if len(self._todas) < self.tamanho:
+                    conn = self._nova_conexao()
+                    self._todas.append(conn)
+            if conn is None:
+                try:
+                    conn = self._livres.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"Nenhuma conexão livre no pool após {self.timeout}s") from None
+                with self._trava:
+                    self._esperas += 1
+        espera = time.perf_counter() - inicio
+        with self._trava:
+            self._checkouts += 1
+            self._tempo_espera += espera
+        return conn
+
+    def _devolver(self, conn):
+        # Transações esquecidas abertas não podem vazar para o próximo usuário
+        if conn.in_transaction:
+            conn.rollback()
+        self._livres.put(conn)
+
+    @contextmanager
+    def conexao(self):
+        conn = self._retirar()
+        try:
+            yield conn
+        finally:
+            self._devolver(conn)
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                "conexoes_abertas": len(self._todas),
+                "conexoes_livres": self._livres.qsize(),
+                "checkouts": self._checkouts,
+                "checkouts_com_espera": self._esperas,
+                "tempo_espera_total_ms": self._tempo_espera * 1000,
+                "tempo_espera_medio_ms": (self._tempo_espera / self._checkouts * 1000) if self._checkouts else 0.0,
+            }
+
+    def fechar(self):
+        with self._trava:
+            for conn in self._todas:
+                conn.close()
+            self._todas.clear()
+            self._livres = queue.LifoQueue()
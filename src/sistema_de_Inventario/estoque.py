@@ -0,0 +1,105 @@
+import random
+import sqlite3
+import time
+from datetime import datetime
+
+
+TENTATIVAS = 6
+ESPERA_INICIAL = 0.02  # segundos; dobra a cada nova tentativa
+
+
+class ProdutoNaoEncontrado(LookupError):
+    pass
+
+
+class EstoqueInsuficiente(ValueError):
+    pass
+
+
+def _banco_ocupado(erro):
+    # Códigos estendidos (ex.: SQLITE_BUSY_SNAPSHOT) guardam o código primário nos 8 bits menores
+    return (getattr(erro, "sqlite_errorcode", 0) & 0xFF) in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+
+
+def _com_retentativa(operacao, tentativas=TENTATIVAS, espera_inicial=ESPERA_INICIAL):
+    """Executa ``operacao`` repetindo com backoff exponencial (e jitter) enquanto o banco estiver ocupado."""
+    for tentativa in range(tentativas):
+        try:
+            return operacao()
+        except sqlite3.OperationalError as erro:
+            if not _banco_ocupado(erro) or tentativa == tentativas - 1:
+                raise
+            time.sleep(espera_inicial * (2 ** tentativa) * (1 + random.random()))
+
+
+def _inserir_movimentacao(conn, cd_produto, tp_movimento, qt_movimento, nm_motivo, vr_custo_unitario=None):
+    # O custo das saídas (e das entradas sem custo informado) é preenchido pelos triggers PEPS
+    data_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                    VALUES (?, ?, ?, ?, ?, ?)''', (cd_produto, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario))
+
+
+def movimentar_estoque(conn, cd_produto, tp_movimento, qt_movimento, nm_motivo, permitir_negativo=False,
+                       vr_custo_unitario=None):
+    """Aplica uma Entrada/Saída ao estoque e registra a movimentação numa única transação.
+
+    O ajuste é relativo (``vr_estoque_atual = vr_estoque_atual + delta``) sob ``BEGIN IMMEDIATE``, então
+    operadores simultâneos no mesmo produto nunca perdem atualizações. ``vr_custo_unitario`` é o custo
+    pago numa Entrada (sem ele, vale o custo atual do produto). Devolve o novo estoque.
+    """
+    if tp_movimento not in ("Entrada", "Saida"):
+        raise ValueError("O tipo de movimento deve ser 'Entrada' ou 'Saida'.")
+    if qt_movimento <= 0:
+        raise ValueError("A quantidade movimentada deve ser maior que zero.")
+    delta = qt_movimento if tp_movimento == "Entrada" else -qt_movimento
+
+    def operacao():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            linhas = conn.execute('''UPDATE Produtos SET vr_estoque_atual = COALESCE(vr_estoque_atual, 0) + ?
+                                     WHERE cd_produto = ? AND (? OR COALESCE(vr_estoque_atual, 0) + ? >= 0)
+                                     RETURNING vr_estoque_atual''',
+                                  (delta, cd_produto, permitir_negativo, delta)).fetchall()
+            if not linhas:
+                if conn.execute("SELECT 1 FROM Produtos WHERE cd_produto = ?", (cd_produto,)).fetchone():
+                    raise EstoqueInsuficiente(f"Estoque insuficiente para a saída de {qt_movimento} unidades.")
+                raise ProdutoNaoEncontrado(f"Produto {cd_produto} não encontrado.")
+            _inserir_movimentacao(conn, cd_produto, tp_movimento, qt_movimento, nm_motivo,
+                                  vr_custo_unitario if tp_movimento == "Entrada" else None)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return linhas[0][0]
+
+    return _com_retentativa(operacao)
+
+
+def definir_estoque(conn, cd_produto, novo_estoque, nm_motivo):
+    """Leva o estoque do produto a ``novo_estoque``, registrando a diferença como Entrada ou Saída.
+
+    A leitura do saldo atual acontece dentro da mesma transação ``BEGIN IMMEDIATE`` da escrita.
+    Devolve ``(tp_movimento, qt_movimento)`` ou ``None`` quando o estoque já era igual.
+    """
+    def operacao():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            linha = conn.execute("SELECT COALESCE(vr_estoque_atual, 0) FROM Produtos WHERE cd_produto = ?",
+                                 (cd_produto,)).fetchone()
+            if linha is None:
+                raise ProdutoNaoEncontrado(f"Produto {cd_produto} não encontrado.")
+            diferenca = novo_estoque - linha[0]
+            if diferenca == 0:
+                conn.rollback()
+                return None
+            tp_movimento = "Entrada" if diferenca > 0 else "Saida"
+            conn.execute("UPDATE Produtos SET vr_estoque_atual = COALESCE(vr_estoque_atual, 0) + ? WHERE cd_produto = ?",
+                         (diferenca, cd_produto))
+            _inserir_movimentacao(conn, cd_produto, tp_movimento, abs(diferenca), nm_motivo)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return tp_movimento, abs(diferenca)
+
+    return _com_retentativa(operacao)
@@ -0,0 +1,99 @@
+import argparse
+import csv
+import sqlite3
+import time
+from pathlib import Path
+
+from sistema_de_Inventario.db import CAMINHO_DB
+from sistema_de_Inventario.importacao import COLUNAS_MOVIMENTACOES, COLUNAS_PRODUTOS, TAMANHO_LOTE
+
+
+# Consultas de exportação, com as mesmas colunas aceitas pela importação (o arquivo exportado pode ser reimportado)
+CONSULTAS_EXPORTACAO = {
+    "produtos": f"SELECT {', '.join(COLUNAS_PRODUTOS)} FROM Produtos ORDER BY cd_produto",
+    "movimentacoes": f"SELECT id, {', '.join(COLUNAS_MOVIMENTACOES)} FROM Movimentacoes ORDER BY id",
+}
+
+
+# Tipos fixos no Parquet: inferir pelo primeiro lote falharia quando uma coluna começa toda nula
+COLUNAS_INTEIRAS = {"id", "cd_produto", "categoria_id", "vr_estoque_atual", "vr_estoque_minimo", "produto_id", "qt_movimento"}
+COLUNAS_DECIMAIS = {"vr_custo", "vr_venda", "vr_custo_unitario"}
+
+
+def _esquema_parquet(pa, colunas):
+    return pa.schema([(coluna, pa.int64() if coluna in COLUNAS_INTEIRAS else
+                       pa.float64() if coluna in COLUNAS_DECIMAIS else pa.string())
+                      for coluna in colunas])
+
+
+def _lotes(cursor, tamanho_lote):
+    while True:
+        linhas = cursor.fetchmany(tamanho_lote)
+        if not linhas:
+            break
+        yield linhas
+
+
+def exportar(conn, tipo, destino, formato=None, tamanho_lote=TAMANHO_LOTE):
+    """Grava ``produtos`` ou ``movimentacoes`` em CSV/Parquet lendo o cursor em lotes.
+
+    ``destino`` pode ser um caminho ou um arquivo aberto (texto para CSV, binário para Parquet).
+    Devolve a quantidade de linhas exportadas.
+    """
+    if formato is None:
+        formato = "parquet" if str(getattr(destino, "name", destino)).lower().endswith(".parquet") else "csv"
+    cursor = conn.execute(CONSULTAS_EXPORTACAO[tipo])
+    colunas = [descricao[0] for descricao in cursor.description]
+    total = 0
+
+    if formato == "csv":
+        arquivo = open(destino, "w", newline="", encoding="utf-8") if isinstance(destino, (str, Path)) else destino
+        try:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas)
+            for linhas in _lotes(cursor, tamanho_lote):
+                escritor.writerows(linhas)
+                total += len(linhas)
+        finally:
+            if arquivo is not destino:
+                arquivo.close()
+    elif formato == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("A exportação em Parquet precisa do pacote 'pyarrow' "
+                              "(pip install 'sistema_de_inventario[parquet]').") from None
+        esquema = _esquema_parquet(pa, colunas)
+        with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+            for linhas in _lotes(cursor, tamanho_lote):
+                colunares = list(zip(*linhas))
+                escritor.write_table(pa.Table.from_arrays(
+                    [pa.array(valores, type=campo.type) for valores, campo in zip(colunares, esquema)], schema=esquema))
+                total += len(linhas)
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exportação de produtos e movimentações em CSV ou Parquet.")
+    parser.add_argument("tipo", choices=sorted(CONSULTAS_EXPORTACAO))
+    parser.add_argument("destino", type=Path)
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas lidas por vez")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        inicio = time.perf_counter()
+        total = exportar(conn, args.tipo, args.destino, tamanho_lote=args.lote)
+        segundos = time.perf_counter() - inicio
+    finally:
+        conn.close()
+    print(f"{total} linhas exportadas para {args.destino} em {segundos:.2f}s "
+          f"({total / segundos if segundos else 0:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import io
+import threading
+from collections import OrderedDict
+
+from matplotlib.figure import Figure
+
+from sistema_de_Inventario.cache import versao_dados
+
+
+TAMANHO_MAXIMO = 64
+DPI = 100
+
+COR_CATEGORIA = "#2E86C1"
+COR_ESTOQUE = "#28B463"
+
+
+def rasterizar(fig, dpi=DPI):
+    """PNG da figura. A figura é liberada logo em seguida: nada fica registrado no pyplot."""
+    buffer = io.BytesIO()
+    try:
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+class CacheGraficos:
+    """Cache LRU de gráficos já rasterizados, chaveado por nome, parâmetros e versão dos dados.
+
+    Segue o ``CacheConsultas``: quando a versão dos dados muda, todas as imagens antigas são descartadas.
+    """
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO):
+        self.tamanho_maximo = tamanho_maximo
+        self._imagens = OrderedDict()
+        self._versao = None
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def png(self, conn, chave, desenhar, chaves=()):
+        """Devolve o PNG de ``chave`` na versão atual dos dados; ``desenhar()`` só é chamado na falta.
+
+        ``chaves``: outras chaves de ``Versoes_Dados`` de que o gráfico depende, como no ``CacheConsultas``.
+        """
+        versao = versao_dados(conn)
+        extras = tuple(versao_dados(conn, outra) for outra in chaves)
+        with self._trava:
+            if versao != self._versao:
+                self._imagens.clear()
+                self._versao = versao
+            guardada = self._imagens.get(chave)
+            if guardada is not None and guardada[0] == extras:
+                self._imagens.move_to_end(chave)
+                self.acertos += 1
+                return guardada[1]
+            self.falhas += 1
+
+        imagem = rasterizar(desenhar())
+        with self._trava:
+            if versao == self._versao:
+                self._imagens[chave] = (extras, imagem)
+                while len(self._imagens) > self.tamanho_maximo:
+                    self._imagens.popitem(last=False)
+        return imagem
+
+    def limpar(self):
+        with self._trava:
+            self._imagens.clear()
+            self._versao = None
+
+    def estatisticas(self):
+        with self._trava:
+            return {"imagens": len(self._imagens), "bytes": sum(len(imagem) for _, imagem in self._imagens.values()),
+                    "acertos": self.acertos, "falhas": self.falhas, "versao_dados": self._versao}
+
+
+# Figuras matplotlib (API orientada a objetos, sem o estado global do pyplot, que é compartilhado entre sessões)
+
+def figura_valor_categoria(df):
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(df["nm_categoria"], df["valor"], color=COR_CATEGORIA)
+    ax.set_ylabel("Valor (R$)")
+    fig.tight_layout()
+    return fig
+
+
+def figura_top_estoque(df):
+    fig = Figure()
+    ax = fig.subplots()
+    ax.bar(df["nm_produto"], df["vr_estoque_atual"], color=COR_ESTOQUE)
+    ax.set_ylabel("Qtd em Estoque")
+    fig.tight_layout()
+    return fig
+
+
+def figura_evolucao(df_pivot):
+    fig = Figure(figsize=(10, 4))
+    ax = fig.subplots()
+    df_pivot.plot(kind="line", marker="o", ax=ax)
+    ax.set_title("Evolução Temporal")
+    ax.tick_params(axis="x", labelrotation=0)
+    ax.grid(True, linestyle="--", alpha=0.6)
+    return fig
+
+
+def figura_curva_abc(df_abc):
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    df_plot = df_abc.iloc[::-1]
+    ax.barh(df_plot["nm_produto"], df_plot["percent_individual"], color="blue", alpha=0.3, label="Valor Individual (%)")
+    ax.plot(df_plot["percent_acumulado"], df_plot["nm_produto"], color="red", marker="D", ms=5, label="Acumulado (%)")
+    ax.set_xlim(0, 110)
+    ax.set_xlabel("Percentual (%)")
+    ax.set_title("Top 10 Produtos - Curva ABC (Vista Horizontal)")
+    ax.legend(loc="lower right")
+    fig.tight_layout()
+    return fig
+
+
+# Especificações Vega-Lite equivalentes, para o modo de gráficos nativos do Streamlit
+
+VEGA_VALOR_CATEGORIA = {
+    "mark": {"type": "bar", "color": COR_CATEGORIA},
+    "encoding": {
+        "x": {"field": "nm_categoria", "type": "nominal", "title": None, "axis": {"labelAngle": 0}},
+        "y": {"field": "valor", "type": "quantitative", "title": "Valor (R$)"},
+    },
+}
+
+VEGA_TOP_ESTOQUE = {
+    "mark": {"type": "bar", "color": COR_ESTOQUE},
+    "encoding": {
+        "x": {"field": "nm_produto", "type": "nominal", "title": None, "sort": None, "axis": {"labelAngle": 0}},
+        "y": {"field": "vr_estoque_atual", "type": "quantitative", "title": "Qtd em Estoque"},
+    },
+}
+
+# Recebe o formato longo (data, tp_movimento, total)
+VEGA_EVOLUCAO = {
+    "mark": {"type": "line", "point": True},
+    "encoding": {
+        "x": {"field": "data", "type": "temporal", "title": None},
+        "y": {"field": "total", "type": "quantitative", "title": None},
+        "color": {"field": "tp_movimento", "type": "nominal", "title": None},
+    },
+}
+
+VEGA_CURVA_ABC = {
+    "encoding": {"y": {"field": "nm_produto", "type": "nominal", "title": None, "sort": None}},
+    "layer": [
+        {"mark": {"type": "bar", "color": "blue", "opacity": 0.3},
+         "encoding": {"x": {"field": "percent_individual", "type": "quantitative", "title": "Percentual (%)",
+                            "scale": {"domain": [0, 110]}}}},
+        {"mark": {"type": "line", "color": "red", "point": {"shape": "diamond", "color": "red"}},
+         "encoding": {"x": {"field": "percent_acumulado", "type": "quantitative"}}},
+    ],
+}
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from sistema_de_Inventario.arquivamento import anexar, meses_arquivados
+
+
+TAMANHO_PAGINA = 50
+
+
+def _filtros_sql(dt_inicio=None, dt_fim=None, produto_id=None, tp_movimento=None):
+    condicoes, parametros = [], []
+    if dt_inicio is not None:
+        condicoes.append("data_hora >= ?")
+        parametros.append(str(dt_inicio))
+    if dt_fim is not None:
+        # dt_fim é inclusivo: tudo antes do início do dia seguinte
+        condicoes.append("data_hora < ?")
+        parametros.append(str(dt_fim + timedelta(days=1)))
+    if produto_id is not None:
+        condicoes.append("produto_id = ?")
+        parametros.append(int(produto_id))
+    if tp_movimento is not None:
+        condicoes.append("tp_movimento = ?")
+        parametros.append(tp_movimento)
+    return condicoes, parametros
+
+
+def listar_movimentacoes(conn, dt_inicio=None, dt_fim=None, produto_id=None, tp_movimento=None,
+                         apos=None, limite=TAMANHO_PAGINA):
+    """Devolve uma página do histórico (mais recente primeiro) e o cursor da próxima página.
+
+    A paginação é por chave (``data_hora``, ``id``): ``apos`` é o cursor devolvido pela página anterior
+    e a consulta continua a partir dele pelo índice, sem OFFSET e sem ler as páginas já exibidas.
+    O cursor devolvido é ``None`` quando não há mais linhas.
+
+    Meses arquivados (ver arquivamento.py) só são lidos quando o período e o cursor chegam neles e a página
+    ainda não foi completada por linhas mais novas.
+    """
+    condicoes, parametros = _filtros_sql(dt_inicio, dt_fim, produto_id, tp_movimento)
+    if apos is not None:
+        condicoes.append("(data_hora, id) < (?, ?)")
+        parametros.extend(apos)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    query = '''SELECT id, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo
+               FROM {tabela} {where}
+               ORDER BY data_hora DESC, id DESC
+               LIMIT ?'''
+    # Uma linha a mais só para saber se existe próxima página
+    parametros.append(limite + 1)
+    df = pd.read_sql_query(query.format(tabela="Movimentacoes", where=where), conn, params=parametros)
+    for mes, caminho in meses_arquivados(conn, dt_inicio, apos[0] if apos is not None else dt_fim):
+        # Página já completa com linhas posteriores ao mês ('AAAA-MM-32' vem depois de qualquer dia dele):
+        # nada deste arquivo nem dos anteriores entraria nela
+        if len(df) > limite and df["data_hora"].iloc[limite] >= mes + "-32":
+            break
+        with anexar(conn, caminho) as apelido:
+            df_arquivo = pd.read_sql_query(query.format(tabela=f"{apelido}.Movimentacoes", where=where), conn,
+                                           params=parametros)
+        # Um DataFrame vazio no concat deixaria as colunas como object
+        if df_arquivo.empty:
+            continue
+        if df.empty:
+            df = df_arquivo
+            continue
+        df = (pd.concat([df, df_arquivo], ignore_index=True)
+              .sort_values(["data_hora", "id"], ascending=False, kind="stable")
+              .head(limite + 1).reset_index(drop=True))
+    proximo = None
+    if len(df) > limite:
+        df = df.iloc[:limite]
+        ultima = df.iloc[-1]
+        proximo = (ultima["data_hora"], int(ultima["id"]))
+    return df, proximo
+
+
+def iterar_movimentacoes(conn, dt_inicio=None, dt_fim=None, produto_id=None, tp_movimento=None,
+                         limite=TAMANHO_PAGINA):
+    """Gera as páginas do histórico sob demanda; cada página só é lida quando o consumidor pede a próxima."""
+    apos = None
+    while True:
+        df, apos = listar_movimentacoes(conn, dt_inicio, dt_fim, produto_id, tp_movimento, apos, limite)
+        if not df.empty:
+            yield df
+        if apos is None:
+            break
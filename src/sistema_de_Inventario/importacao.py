@@ -0,0 +1,291 @@
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from sistema_de_Inventario.db import CAMINHO_DB, PRAGMAS
+from sistema_de_Inventario.migracoes import aplicar_migracoes
+
+
+TAMANHO_LOTE = 50_000
+MAX_ERROS_GUARDADOS = 100
+
+COLUNAS_PRODUTOS = ["cd_produto", "nm_produto", "ds_produto", "categoria_id",
+                    "vr_custo", "vr_venda", "vr_estoque_atual", "vr_estoque_minimo"]
+COLUNAS_MOVIMENTACOES = ["produto_id", "tp_movimento", "qt_movimento", "data_hora", "nm_motivo", "vr_custo_unitario"]
+
+TIPOS_MOVIMENTO = {"Entrada", "Saida"}
+
+# Chaves de Versoes_Dados que uma carga altera: cadastro e estoque dos produtos e o histórico de movimentações
+CHAVES_VERSAO_CARGA = ("dados", "estoque_custo", "movimentacoes")
+
+
+@dataclass
+class ResultadoCarga:
+    lidas: int = 0
+    gravadas: int = 0
+    ignoradas: int = 0
+    rejeitadas: int = 0
+    movimentacoes: int = 0
+    segundos: float = 0.0
+    erros: list = field(default_factory=list)
+
+    @property
+    def linhas_por_segundo(self):
+        return self.lidas / self.segundos if self.segundos else 0.0
+
+    def _rejeitar(self, linhas, motivo):
+        self.rejeitadas += len(linhas)
+        for linha in linhas[:max(0, MAX_ERROS_GUARDADOS - len(self.erros))]:
+            self.erros.append((int(linha), motivo))
+
+
+def ler_em_lotes(arquivo, tamanho_lote=TAMANHO_LOTE, formato=None):
+    """Lê um CSV ou Parquet em DataFrames de até ``tamanho_lote`` linhas, sem carregar o arquivo inteiro."""
+    if formato is None:
+        formato = "parquet" if str(getattr(arquivo, "name", arquivo)).lower().endswith(".parquet") else "csv"
+    if formato == "csv":
+        try:
+            yield from pd.read_csv(arquivo, chunksize=tamanho_lote, dtype=str, keep_default_na=False)
+        except pd.errors.ParserError as erro:
+            raise ValueError(f"Arquivo CSV inválido: {erro}") from erro
+    elif formato == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("A leitura de arquivos Parquet precisa do pacote 'pyarrow' "
+                              "(pip install 'sistema_de_inventario[parquet]').") from None
+        # Erros do pyarrow (arquivo corrompido, tipo não suportado) viram ValueError, como os do CSV
+        try:
+            for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=tamanho_lote):
+                yield lote.to_pandas().astype("string").fillna("")
+        except pa.ArrowException as erro:
+            raise ValueError(f"Arquivo Parquet inválido: {erro}") from erro
+    else:
+        raise ValueError(f"Formato não suportado: {formato}")
+
+
+@contextmanager
+def _versoes_por_lote(conn, chaves=CHAVES_VERSAO_CARGA):
+    """Desliga os triggers de versão (um UPDATE em Versoes_Dados por linha) e incrementa cada uma de ``chaves``
+    uma única vez no fim do bloco.
+
+    Roda dentro da transação do lote: a linha de ``Carga_Em_Lote`` (migração 13) é apagada antes do commit, então
+    nenhuma outra conexão a vê, e um rollback desfaz tudo junto com o lote.
+    """
+    conn.execute("INSERT INTO Carga_Em_Lote (id) VALUES (1)")
+    yield
+    conn.execute("DELETE FROM Carga_Em_Lote")
+    conn.executemany("UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = ?", [(chave,) for chave in chaves])
+
+
+def _validar_colunas(df, obrigatorias):
+    faltando = [coluna for coluna in obrigatorias if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no arquivo: {', '.join(faltando)}")
+
+
+def _numero(serie):
+    return pd.to_numeric(serie.str.strip().str.replace(",", ".", regex=False), errors="coerce")
+
+
+def _preparar_produtos(df, categorias, resultado, primeira_linha):
+    df = df.copy()
+    # Número da linha no arquivo (cabeçalho = linha 1), para as mensagens de erro
+    df["nr_linha"] = range(primeira_linha, primeira_linha + len(df))
+    for coluna in ["cd_produto", "categoria_id", "vr_custo", "vr_venda", "vr_estoque_atual", "vr_estoque_minimo"]:
+        df[coluna] = _numero(df[coluna]) if coluna in df.columns else 0
+    df["nm_produto"] = df["nm_produto"].str.strip()
+    if "ds_produto" not in df.columns:
+        df["ds_produto"] = ""
+
+    regras = [
+        (df["cd_produto"].isna() | (df["cd_produto"] % 1 != 0), "código do produto inválido"),
+        (df["nm_produto"] == "", "nome do produto vazio"),
+        (~df["categoria_id"].isin(categorias), "categoria inexistente em Categorias"),
+        (df["vr_custo"].isna() | df["vr_venda"].isna() | (df["vr_custo"] < 0) | (df["vr_venda"] < 0),
+         "preço de custo ou venda inválido"),
+        (df["vr_estoque_atual"].isna() | (df["vr_estoque_atual"] < 0) | (df["vr_estoque_atual"] % 1 != 0),
+         "estoque atual inválido"),
+        (df["vr_estoque_minimo"] < 0, "estoque mínimo inválido"),
+    ]
+    invalidas = pd.Series(False, index=df.index)
+    for mascara, motivo in regras:
+        mascara = mascara & ~invalidas
+        resultado._rejeitar(df.loc[mascara, "nr_linha"].tolist(), motivo)
+        invalidas |= mascara
+    df = df[~invalidas]
+    df["vr_estoque_minimo"] = df["vr_estoque_minimo"].fillna(0)
+    return df.astype({"cd_produto": int, "categoria_id": int, "vr_estoque_atual": int, "vr_estoque_minimo": int})
+
+
+def _preparar_movimentacoes(df, resultado, primeira_linha, agora):
+    df = df.copy()
+    df["nr_linha"] = range(primeira_linha, primeira_linha + len(df))
+    df["produto_id"] = _numero(df["produto_id"])
+    df["qt_movimento"] = _numero(df["qt_movimento"])
+    df["tp_movimento"] = df["tp_movimento"].str.strip()
+    # Sem a coluna data_hora, tudo entra com a hora da importação; com ela, cada linha precisa de uma data válida
+    # (ISO 8601, com ou sem hora), gravada no formato do banco para as comparações de texto em data_hora
+    if "data_hora" in df.columns:
+        bruta = df["data_hora"].str.strip()
+        data_hora = pd.to_datetime(bruta, format="ISO8601", errors="coerce")
+        # Só as datas válidas fora do formato do banco (sem hora, com 'T', com frações) são reescritas
+        reescrever = data_hora.notna() & (bruta.str.len().ne(19) | bruta.str[10].ne(" "))
+        df["data_hora"] = bruta.where(data_hora.notna(), None)
+        df.loc[reescrever, "data_hora"] = data_hora[reescrever].dt.strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        df["data_hora"] = agora
+    df["nm_motivo"] = df["nm_motivo"].str.strip() if "nm_motivo" in df.columns else "Importação"
+    # Custo unitário opcional: vale para as entradas; o das saídas é calculado pelas camadas PEPS
+    df["vr_custo_unitario"] = _numero(df["vr_custo_unitario"]) if "vr_custo_unitario" in df.columns else float("nan")
+
+    regras = [
+        (df["produto_id"].isna() | (df["produto_id"] % 1 != 0), "código do produto inválido"),
+        (~df["tp_movimento"].isin(TIPOS_MOVIMENTO), "tipo de movimento deve ser 'Entrada' ou 'Saida'"),
+        (df["qt_movimento"].isna() | (df["qt_movimento"] <= 0) | (df["qt_movimento"] % 1 != 0), "quantidade inválida"),
+        (df["vr_custo_unitario"] < 0, "custo unitário inválido"),
+        (df["data_hora"].isna(), "data/hora vazia ou inválida (use AAAA-MM-DD HH:MM:SS)"),
+    ]
+    invalidas = pd.Series(False, index=df.index)
+    for mascara, motivo in regras:
+        mascara = mascara & ~invalidas
+        resultado._rejeitar(df.loc[mascara, "nr_linha"].tolist(), motivo)
+        invalidas |= mascara
+    df = df[~invalidas].astype({"produto_id": int, "qt_movimento": int, "vr_custo_unitario": object})
+    df["vr_custo_unitario"] = df["vr_custo_unitario"].where(df["vr_custo_unitario"].notna(), None)
+    return df
+
+
+def importar_produtos(conn, arquivo, tamanho_lote=TAMANHO_LOTE, formato=None):
+    """Importa produtos em lotes; códigos já cadastrados são ignorados.
+
+    Cada lote vai para uma tabela temporária com ``executemany`` e é gravado numa única transação,
+    junto com a movimentação de 'Entrada' do estoque inicial de cada produto novo.
+    """
+    resultado = ResultadoCarga()
+    inicio = time.perf_counter()
+    categorias = {linha[0] for linha in conn.execute("SELECT cd_categoria FROM Categorias")}
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute('''CREATE TEMP TABLE IF NOT EXISTS _carga_produtos (
+                        cd_produto INTEGER PRIMARY KEY, nm_produto TEXT, ds_produto TEXT, categoria_id INTEGER,
+                        vr_custo REAL, vr_venda REAL, vr_estoque_atual INTEGER, vr_estoque_minimo INTEGER)''')
+    for lote in ler_em_lotes(arquivo, tamanho_lote, formato):
+        _validar_colunas(lote, ["cd_produto", "nm_produto", "categoria_id", "vr_custo", "vr_venda"])
+        df = _preparar_produtos(lote, categorias, resultado, resultado.lidas + 2)
+        resultado.lidas += len(lote)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Uma versão nova por lote (e não por linha) para o cache de consultas
+            with _versoes_por_lote(conn):
+                conn.execute("DELETE FROM _carga_produtos")
+                # Códigos repetidos dentro do próprio arquivo: vale a primeira ocorrência
+                conn.executemany("INSERT OR IGNORE INTO _carga_produtos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 df[COLUNAS_PRODUTOS].itertuples(index=False, name=None))
+                movs = conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo,
+                                                                vr_custo_unitario)
+                                       SELECT t.cd_produto, 'Entrada', t.vr_estoque_atual, ?, 'Importação', t.vr_custo
+                                       FROM _carga_produtos t
+                                       WHERE t.vr_estoque_atual > 0
+                                         AND NOT EXISTS (SELECT 1 FROM Produtos p WHERE p.cd_produto = t.cd_produto)''',
+                                    (agora,)).rowcount
+                gravadas = conn.execute(f'''INSERT OR IGNORE INTO Produtos ({", ".join(COLUNAS_PRODUTOS)})
+                                            SELECT {", ".join(COLUNAS_PRODUTOS)} FROM _carga_produtos''').rowcount
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        resultado.gravadas += gravadas
+        resultado.movimentacoes += movs
+        resultado.ignoradas += len(df) - gravadas
+    conn.execute("DROP TABLE IF EXISTS _carga_produtos")
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def importar_movimentacoes(conn, arquivo, tamanho_lote=TAMANHO_LOTE, formato=None):
+    """Importa movimentações em lotes e aplica o saldo de cada lote em ``Produtos.vr_estoque_atual``.
+
+    Linhas de produtos não cadastrados ou com ``data_hora`` vazia ou inválida são rejeitadas (sem a coluna
+    ``data_hora``, vale a hora da importação). Cada lote é uma única transação.
+    """
+    resultado = ResultadoCarga()
+    inicio = time.perf_counter()
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute('''CREATE TEMP TABLE IF NOT EXISTS _carga_movimentacoes (
+                        nr_linha INTEGER, produto_id INTEGER, tp_movimento TEXT, qt_movimento INTEGER,
+                        data_hora TEXT, nm_motivo TEXT, vr_custo_unitario REAL)''')
+    for lote in ler_em_lotes(arquivo, tamanho_lote, formato):
+        _validar_colunas(lote, ["produto_id", "tp_movimento", "qt_movimento"])
+        df = _preparar_movimentacoes(lote, resultado, resultado.lidas + 2, agora)
+        resultado.lidas += len(lote)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            with _versoes_por_lote(conn):
+                conn.execute("DELETE FROM _carga_movimentacoes")
+                conn.executemany("INSERT INTO _carga_movimentacoes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 df[["nr_linha"] + COLUNAS_MOVIMENTACOES].itertuples(index=False, name=None))
+                sem_produto = [linha for (linha,) in conn.execute(
+                    '''SELECT nr_linha FROM _carga_movimentacoes t
+                       WHERE NOT EXISTS (SELECT 1 FROM Produtos p WHERE p.cd_produto = t.produto_id)''')]
+                resultado._rejeitar(sem_produto, "produto não cadastrado")
+                # Em ordem de data: os triggers PEPS consomem as camadas na ordem em que as saídas aconteceram
+                gravadas = conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo,
+                                                                   vr_custo_unitario)
+                                           SELECT t.produto_id, t.tp_movimento, t.qt_movimento, t.data_hora, t.nm_motivo,
+                                                  CASE WHEN t.tp_movimento = 'Entrada' THEN t.vr_custo_unitario END
+                                           FROM _carga_movimentacoes t
+                                           JOIN Produtos p ON p.cd_produto = t.produto_id
+                                           ORDER BY t.data_hora, t.nr_linha''').rowcount
+                conn.execute('''UPDATE Produtos
+                                SET vr_estoque_atual = COALESCE(vr_estoque_atual, 0) + saldo.delta
+                                FROM (SELECT produto_id,
+                                             SUM(CASE WHEN tp_movimento = 'Entrada' THEN qt_movimento ELSE -qt_movimento END) AS delta
+                                      FROM _carga_movimentacoes GROUP BY produto_id) AS saldo
+                                WHERE Produtos.cd_produto = saldo.produto_id''')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        resultado.gravadas += gravadas
+        resultado.movimentacoes += gravadas
+    conn.execute("DROP TABLE IF EXISTS _carga_movimentacoes")
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importação em massa de produtos e movimentações (CSV ou Parquet).")
+    parser.add_argument("tipo", choices=["produtos", "movimentacoes"])
+    parser.add_argument("arquivo", type=Path)
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por lote/transação")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    try:
+        aplicar_migracoes(conn)
+        importar = importar_produtos if args.tipo == "produtos" else importar_movimentacoes
+        resultado = importar(conn, args.arquivo, args.lote)
+    finally:
+        conn.close()
+
+    print(f"Linhas lidas: {resultado.lidas} | gravadas: {resultado.gravadas} | ignoradas: {resultado.ignoradas} "
+          f"| rejeitadas: {resultado.rejeitadas} | movimentações: {resultado.movimentacoes}")
+    print(f"Tempo: {resultado.segundos:.2f}s ({resultado.linhas_por_segundo:,.0f} linhas/s)")
+    for linha, motivo in resultado.erros:
+        print(f"  linha {linha}: {motivo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import contextvars
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sistema_de_Inventario.tempos import percentis
+
+
+LIMITE_LENTA_MS = 250.0
+AMOSTRAS_POR_CONSULTA = 500
+CONSULTAS_LENTAS_GUARDADAS = 100
+
+# Página que está executando (definida pelo app.py a cada execução do script; cada sessão roda na sua thread)
+_pagina_atual = contextvars.ContextVar("pagina_atual", default=None)
+
+
+def definir_pagina(pagina):
+    _pagina_atual.set(pagina)
+
+
+def normalizar_sql(sql):
+    """SQL em uma linha só, para agrupar as execuções da mesma instrução."""
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class RegistroConsultas:
+    """Tempos e linhas de cada instrução SQL executada pelas conexões instrumentadas, por instrução e por página.
+
+    Execuções acima de ``limite_lenta_ms`` entram no log de consultas lentas com o ``EXPLAIN QUERY PLAN``;
+    com ``arquivo_lentas`` informado, cada uma também é acrescentada como uma linha JSON.
+    """
+
+    def __init__(self, limite_lenta_ms=LIMITE_LENTA_MS, arquivo_lentas=None, amostras=AMOSTRAS_POR_CONSULTA):
+        self.limite_lenta_ms = limite_lenta_ms
+        self.arquivo_lentas = arquivo_lentas
+        self.amostras = amostras
+        self._instrucoes = {}
+        self._paginas = {}
+        self._lentas = deque(maxlen=CONSULTAS_LENTAS_GUARDADAS)
+        self._planos = {}
+        self._trava = threading.Lock()
+
+    def registrar(self, conn, sql, params, segundos, linhas):
+        pagina = _pagina_atual.get() or "(sem página)"
+        texto = normalizar_sql(sql)
+        ms = segundos * 1000
+        with self._trava:
+            instrucao = self._instrucoes.get(texto)
+            if instrucao is None:
+                instrucao = self._instrucoes[texto] = {"execucoes": 0, "total_ms": 0.0, "linhas": 0, "contadas": 0,
+                                                       "paginas": set(), "tempos": deque(maxlen=self.amostras)}
+            instrucao["execucoes"] += 1
+            instrucao["total_ms"] += ms
+            # linhas é None quando o resultado foi percorrido por iteração, que não é contada
+            if linhas is not None:
+                instrucao["linhas"] += linhas
+                instrucao["contadas"] += 1
+            instrucao["paginas"].add(pagina)
+            instrucao["tempos"].append(ms)
+            pagina_total = self._paginas.get(pagina)
+            if pagina_total is None:
+                pagina_total = self._paginas[pagina] = {"execucoes": 0, "total_ms": 0.0,
+                                                        "tempos": deque(maxlen=self.amostras)}
+            pagina_total["execucoes"] += 1
+            pagina_total["total_ms"] += ms
+            pagina_total["tempos"].append(ms)
+            plano = self._planos.get(texto)
+        if ms < self.limite_lenta_ms:
+            return
+
+        if plano is None:
+            # O plano é obtido uma vez por instrução e reaproveitado nas execuções lentas seguintes
+            plano = _explicar(conn, sql, params)
+            with self._trava:
+                self._planos[texto] = plano
+        registro = {"dt_execucao": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "pagina": pagina, "ms": round(ms, 2),
+                    "linhas": linhas, "sql": texto, "plano": plano}
+        with self._trava:
+            self._lentas.append(registro)
+        if self.arquivo_lentas:
+            with open(self.arquivo_lentas, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def resumo_instrucoes(self):
+        """Uma linha por instrução, da que mais somou tempo para a que menos somou."""
+        with self._trava:
+            linhas = []
+            for texto, instrucao in self._instrucoes.items():
+                mediana, p95, p99 = percentis(instrucao["tempos"])
+                linhas.append({"sql": texto, "execucoes": instrucao["execucoes"], "total_ms": instrucao["total_ms"],
+                               "mediana_ms": mediana, "p95_ms": p95, "p99_ms": p99,
+                               "linhas_por_execucao": (instrucao["linhas"] / instrucao["contadas"]
+                                                       if instrucao["contadas"] else None),
+                               "paginas": ", ".join(sorted(instrucao["paginas"]))})
+        return sorted(linhas, key=lambda linha: linha["total_ms"], reverse=True)
+
+    def resumo_paginas(self):
+        """Latência das instruções SQL de cada página: execuções, total, mediana, p95 e p99 (ms)."""
+        with self._trava:
+            linhas = []
+            for pagina, totais in self._paginas.items():
+                mediana, p95, p99 = percentis(totais["tempos"])
+                linhas.append({"pagina": pagina, "execucoes": totais["execucoes"], "total_ms": totais["total_ms"],
+                               "mediana_ms": mediana, "p95_ms": p95, "p99_ms": p99})
+        return linhas
+
+    def consultas_lentas(self):
+        with self._trava:
+            return list(reversed(self._lentas))
+
+    def limpar(self):
+        with self._trava:
+            self._instrucoes.clear()
+            self._paginas.clear()
+            self._lentas.clear()
+            self._planos.clear()
+
+
+def _explicar(conn, sql, params):
+    """Linhas do ``EXPLAIN QUERY PLAN`` da instrução, pela conexão sem instrumentação (só consultas e DML)."""
+    if not re.match(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", sql, re.IGNORECASE):
+        return []
+    try:
+        linhas = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except (sqlite3.Error, ValueError) as e:
+        return [f"(plano indisponível: {e})"]
+    return [detalhe for _, _, _, detalhe in linhas]
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mede cada instrução da execução até a última linha lida (ou até ser fechado).
+
+    As linhas são contadas nos ``fetch*`` (pelo tamanho do lote lido) ou pelo ``rowcount`` das escritas. A
+    iteração direta (``for linha in cursor``) fica com a do próprio sqlite3, sem custo por linha em Python:
+    nesse caso o tempo é só o do ``execute`` e as linhas não são contadas. Uma consulta lida só em parte
+    (o ``fetchone()`` de uma linha só, por exemplo) é registrada quando a conexão começa a instrução seguinte.
+    """
+
+    _medicao = None
+
+    def execute(self, sql, params=()):
+        self._finalizar()
+        inicio = time.perf_counter()
+        super().execute(sql, params)
+        self._medicao = [sql, params, time.perf_counter() - inicio, None]
+        if self.description is None:
+            # Sem linhas para ler (INSERT, UPDATE, DDL...): a medição termina aqui
+            self._medicao[3] = max(self.rowcount, 0)
+            self._finalizar()
+        else:
+            _abertos(self.connection).append(self)
+        return self
+
+    def executemany(self, sql, seq_params):
+        self._finalizar()
+        inicio = time.perf_counter()
+        super().executemany(sql, seq_params)
+        # Os parâmetros do primeiro item, quando é uma lista, servem para o EXPLAIN de uma execução lenta
+        params = seq_params[0] if isinstance(seq_params, (list, tuple)) and seq_params else ()
+        self._medicao = [sql, params, time.perf_counter() - inicio, max(self.rowcount, 0)]
+        self._finalizar()
+        return self
+
+    def _ler(self, leitura, *args):
+        inicio = time.perf_counter()
+        resultado = leitura(*args)
+        if self._medicao is not None:
+            self._medicao[2] += time.perf_counter() - inicio
+        return resultado
+
+    def _contar(self, quantidade):
+        if self._medicao is not None:
+            self._medicao[3] = (self._medicao[3] or 0) + quantidade
+
+    def fetchone(self):
+        linha = self._ler(super().fetchone)
+        if linha is None:
+            self._contar(0)
+            self._finalizar()
+        else:
+            self._contar(1)
+        return linha
+
+    def fetchmany(self, size=None):
+        linhas = self._ler(super().fetchmany, self.arraysize if size is None else size)
+        self._contar(len(linhas))
+        if not linhas:
+            self._finalizar()
+        return linhas
+
+    def fetchall(self):
+        linhas = self._ler(super().fetchall)
+        self._contar(len(linhas))
+        self._finalizar()
+        return linhas
+
+    def __iter__(self):
+        # A iteração não passa pelo Python: a medição termina no execute
+        self._finalizar()
+        return super().__iter__()
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+    def _finalizar(self):
+        medicao, self._medicao = self._medicao, None
+        if medicao is not None:
+            abertos = _abertos(self.connection)
+            if self in abertos:
+                abertos.remove(self)
+            registro = getattr(self.connection, "registro", None)
+            if registro is not None:
+                sql, params, segundos, linhas = medicao
+                registro.registrar(self.connection, sql, params, segundos, linhas)
+
+
+def _abertos(conn):
+    """Cursores da conexão com uma consulta ainda não lida até o fim."""
+    return getattr(conn, "_cursores_abertos", [])
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujas instruções (``execute``, ``executemany`` e as consultas do ``pd.read_sql_query``, que usam
+    ``cursor()``) passam pelo ``CursorInstrumentado`` e são registradas em ``self.registro``."""
+
+    registro = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursores_abertos = []
+
+    def finalizar_cursores(self):
+        """Registra as consultas que ficaram sem ser lidas até o fim."""
+        for cursor in list(self._cursores_abertos):
+            cursor._finalizar()
+
+    def cursor(self, factory=CursorInstrumentado):
+        self.finalizar_cursores()
+        return super().cursor(factory)
+
+    def close(self):
+        self.finalizar_cursores()
+        super().close()
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_params):
+        return self.cursor().executemany(sql, seq_params)
@@ -0,0 +1,463 @@
+import sqlite3
+import sys
+from datetime import datetime
+
+from sistema_de_Inventario.db import CAMINHO_DB
+
+
+# Camadas com saldo de um produto, na ordem PEPS, com a quantidade das camadas anteriores (usado nos triggers)
+_CAMADAS_ABERTAS = '''(SELECT id, qt_restante, vr_custo_unitario,
+                                SUM(qt_restante) OVER (ORDER BY dt_entrada, id ROWS UNBOUNDED PRECEDING) - qt_restante AS qt_anterior
+                         FROM Camadas_Custo WHERE produto_id = NEW.produto_id)'''
+
+
+# Lista ordenada de migrações: (versão, descrição, comandos SQL)
+# Uma migração aplicada nunca deve ser editada; mudanças novas entram como uma versão nova no fim da lista.
+MIGRACOES = [
+    (1, "Movimentacoes.produto_id com afinidade INTEGER (mesmo tipo de Produtos.cd_produto)", [
+        '''CREATE TABLE Movimentacoes_nova (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                produto_id INTEGER,
+                tp_movimento TEXT,
+                qt_movimento INTEGER,
+                data_hora DATETIME,
+                nm_motivo TEXT,
+                FOREIGN KEY(produto_id) REFERENCES Produtos(cd_produto)
+            )''',
+        # A afinidade INTEGER da coluna nova converte '4' em 4 durante a cópia
+        '''INSERT INTO Movimentacoes_nova (id, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo)
+           SELECT id, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo FROM Movimentacoes''',
+        "DROP TABLE Movimentacoes",
+        "ALTER TABLE Movimentacoes_nova RENAME TO Movimentacoes",
+    ]),
+    (2, "Índices de cobertura para Giro de Estoque, Perdas, Valoração e Dashboard", [
+        "CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto_tipo ON Movimentacoes (produto_id, tp_movimento, data_hora, qt_movimento)",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacoes_motivo ON Movimentacoes (nm_motivo, produto_id, qt_movimento)",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacoes_data ON Movimentacoes (data_hora, tp_movimento, qt_movimento)",
+        "CREATE INDEX IF NOT EXISTS idx_produtos_categoria ON Produtos (categoria_id, vr_estoque_atual, vr_custo)",
+        "CREATE INDEX IF NOT EXISTS idx_produtos_estoque ON Produtos (vr_estoque_atual)",
+        "ANALYZE",
+    ]),
+    # Tabelas de resumo do Dashboard, mantidas por triggers na mesma transação de cada escrita.
+    # Exclusões em Movimentacoes não descontam os resumos: eles guardam o histórico consolidado.
+    (3, "Tabelas de resumo (estoque por categoria, movimentos diários, saídas por produto)", [
+        '''CREATE TABLE Resumo_Estoque_Categoria (
+                categoria_id INTEGER NOT NULL PRIMARY KEY,
+                vr_estoque REAL NOT NULL DEFAULT 0,
+                qt_produtos INTEGER NOT NULL DEFAULT 0,
+                qt_itens_criticos INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID''',
+        '''CREATE TABLE Resumo_Movimentos_Diarios (
+                dt_dia TEXT NOT NULL,
+                produto_id INTEGER NOT NULL,
+                tp_movimento TEXT NOT NULL,
+                qt_total INTEGER NOT NULL DEFAULT 0,
+                qt_movimentos INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (dt_dia, tp_movimento, produto_id)
+            ) WITHOUT ROWID''',
+        '''CREATE TABLE Resumo_Saidas_Produto (
+                produto_id INTEGER PRIMARY KEY,
+                qt_total INTEGER NOT NULL DEFAULT 0,
+                qt_movimentos INTEGER NOT NULL DEFAULT 0
+            )''',
+        "CREATE INDEX idx_resumo_saidas_total ON Resumo_Saidas_Produto (qt_total)",
+
+        '''INSERT INTO Resumo_Estoque_Categoria (categoria_id, vr_estoque, qt_produtos, qt_itens_criticos)
+           SELECT categoria_id, COALESCE(SUM(vr_estoque_atual * vr_custo), 0), COUNT(*),
+                  SUM(CASE WHEN vr_estoque_atual < vr_estoque_minimo THEN 1 ELSE 0 END)
+           FROM Produtos GROUP BY categoria_id''',
+        '''INSERT INTO Resumo_Movimentos_Diarios (dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos)
+           SELECT SUBSTR(data_hora, 1, 10), produto_id, tp_movimento, COALESCE(SUM(qt_movimento), 0), COUNT(*)
+           FROM Movimentacoes GROUP BY SUBSTR(data_hora, 1, 10), produto_id, tp_movimento''',
+        '''INSERT INTO Resumo_Saidas_Produto (produto_id, qt_total, qt_movimentos)
+           SELECT produto_id, COALESCE(SUM(qt_movimento), 0), COUNT(*)
+           FROM Movimentacoes WHERE tp_movimento = 'Saida' GROUP BY produto_id''',
+
+        '''CREATE TRIGGER trg_produtos_resumo_insert AFTER INSERT ON Produtos
+           BEGIN
+               INSERT INTO Resumo_Estoque_Categoria (categoria_id, vr_estoque, qt_produtos, qt_itens_criticos)
+               VALUES (NEW.categoria_id, COALESCE(NEW.vr_estoque_atual * NEW.vr_custo, 0), 1,
+                       CASE WHEN NEW.vr_estoque_atual < NEW.vr_estoque_minimo THEN 1 ELSE 0 END)
+               ON CONFLICT (categoria_id) DO UPDATE SET
+                   vr_estoque = vr_estoque + excluded.vr_estoque,
+                   qt_produtos = qt_produtos + 1,
+                   qt_itens_criticos = qt_itens_criticos + excluded.qt_itens_criticos;
+           END''',
+        '''CREATE TRIGGER trg_produtos_resumo_delete AFTER DELETE ON Produtos
+           BEGIN
+               UPDATE Resumo_Estoque_Categoria SET
+                   vr_estoque = vr_estoque - COALESCE(OLD.vr_estoque_atual * OLD.vr_custo, 0),
+                   qt_produtos = qt_produtos - 1,
+                   qt_itens_criticos = qt_itens_criticos - (CASE WHEN OLD.vr_estoque_atual < OLD.vr_estoque_minimo THEN 1 ELSE 0 END)
+               WHERE categoria_id = OLD.categoria_id;
+           END''',
+        '''CREATE TRIGGER trg_produtos_resumo_update
+           AFTER UPDATE OF categoria_id, vr_custo, vr_estoque_atual, vr_estoque_minimo ON Produtos
+           BEGIN
+               UPDATE Resumo_Estoque_Categoria SET
+                   vr_estoque = vr_estoque - COALESCE(OLD.vr_estoque_atual * OLD.vr_custo, 0),
+                   qt_produtos = qt_produtos - 1,
+                   qt_itens_criticos = qt_itens_criticos - (CASE WHEN OLD.vr_estoque_atual < OLD.vr_estoque_minimo THEN 1 ELSE 0 END)
+               WHERE categoria_id = OLD.categoria_id;
+               INSERT INTO Resumo_Estoque_Categoria (categoria_id, vr_estoque, qt_produtos, qt_itens_criticos)
+               VALUES (NEW.categoria_id, COALESCE(NEW.vr_estoque_atual * NEW.vr_custo, 0), 1,
+                       CASE WHEN NEW.vr_estoque_atual < NEW.vr_estoque_minimo THEN 1 ELSE 0 END)
+               ON CONFLICT (categoria_id) DO UPDATE SET
+                   vr_estoque = vr_estoque + excluded.vr_estoque,
+                   qt_produtos = qt_produtos + 1,
+                   qt_itens_criticos = qt_itens_criticos + excluded.qt_itens_criticos;
+           END''',
+        '''CREATE TRIGGER trg_movimentacoes_resumo_insert AFTER INSERT ON Movimentacoes
+           BEGIN
+               INSERT INTO Resumo_Movimentos_Diarios (dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos)
+               VALUES (SUBSTR(NEW.data_hora, 1, 10), NEW.produto_id, NEW.tp_movimento, COALESCE(NEW.qt_movimento, 0), 1)
+               ON CONFLICT (dt_dia, tp_movimento, produto_id) DO UPDATE SET
+                   qt_total = qt_total + excluded.qt_total,
+                   qt_movimentos = qt_movimentos + 1;
+           END''',
+        '''CREATE TRIGGER trg_movimentacoes_resumo_saida AFTER INSERT ON Movimentacoes
+           WHEN NEW.tp_movimento = 'Saida'
+           BEGIN
+               INSERT INTO Resumo_Saidas_Produto (produto_id, qt_total, qt_movimentos)
+               VALUES (NEW.produto_id, COALESCE(NEW.qt_movimento, 0), 1)
+               ON CONFLICT (produto_id) DO UPDATE SET
+                   qt_total = qt_total + excluded.qt_total,
+                   qt_movimentos = qt_movimentos + 1;
+           END''',
+    ]),
+    # O Dashboard não agrega mais Movimentacoes por data (usa os resumos); o índice por data passa a
+    # servir à paginação do histórico, que ordena por (data_hora, id) — o rowid já é a última chave do índice.
+    (4, "Índices para o histórico paginado de movimentações", [
+        "DROP INDEX IF EXISTS idx_movimentacoes_data",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacoes_data_id ON Movimentacoes (data_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_movimentacoes_produto_data ON Movimentacoes (produto_id, data_hora)",
+    ]),
+    # Índice FTS5 de conteúdo externo: guarda só os tokens, o texto continua em Produtos
+    (5, "Busca full-text (FTS5) em código, nome e descrição dos produtos", [
+        '''CREATE VIRTUAL TABLE Produtos_fts USING fts5 (
+                cd_produto, nm_produto, ds_produto,
+                content='Produtos', content_rowid='cd_produto',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )''',
+        "INSERT INTO Produtos_fts (Produtos_fts) VALUES ('rebuild')",
+        '''CREATE TRIGGER trg_produtos_fts_insert AFTER INSERT ON Produtos
+           BEGIN
+               INSERT INTO Produtos_fts (rowid, cd_produto, nm_produto, ds_produto)
+               VALUES (NEW.cd_produto, NEW.cd_produto, NEW.nm_produto, NEW.ds_produto);
+           END''',
+        '''CREATE TRIGGER trg_produtos_fts_delete AFTER DELETE ON Produtos
+           BEGIN
+               INSERT INTO Produtos_fts (Produtos_fts, rowid, cd_produto, nm_produto, ds_produto)
+               VALUES ('delete', OLD.cd_produto, OLD.cd_produto, OLD.nm_produto, OLD.ds_produto);
+           END''',
+        '''CREATE TRIGGER trg_produtos_fts_update AFTER UPDATE OF cd_produto, nm_produto, ds_produto ON Produtos
+           BEGIN
+               INSERT INTO Produtos_fts (Produtos_fts, rowid, cd_produto, nm_produto, ds_produto)
+               VALUES ('delete', OLD.cd_produto, OLD.cd_produto, OLD.nm_produto, OLD.ds_produto);
+               INSERT INTO Produtos_fts (rowid, cd_produto, nm_produto, ds_produto)
+               VALUES (NEW.cd_produto, NEW.cd_produto, NEW.nm_produto, NEW.ds_produto);
+           END''',
+    ]),
+    # Contador de versão dos dados: qualquer escrita nas tabelas principais invalida o cache de consultas
+    (6, "Contador de versão dos dados para invalidação do cache de consultas", [
+        '''CREATE TABLE Versoes_Dados (
+                nm_chave TEXT PRIMARY KEY,
+                nr_versao INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID''',
+        "INSERT INTO Versoes_Dados (nm_chave, nr_versao) VALUES ('dados', 0)",
+    ] + [
+        f'''CREATE TRIGGER trg_{tabela.lower()}_versao_{evento.lower()} AFTER {evento} ON {tabela}
+            BEGIN
+                UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'dados';
+            END'''
+        for tabela in ("Produtos", "Movimentacoes", "Categorias") for evento in ("INSERT", "UPDATE", "DELETE")
+    ]),
+    # Curva ABC persistida. Chaves de versão mais finas que 'dados': 'estoque_custo' (estoque ou custo de algum
+    # produto) e 'movimentacoes' (histórico), para recalcular a curva só quando a sua base muda
+    (7, "Classificação ABC persistida por produto", [
+        '''CREATE TABLE Classificacao_ABC (
+                tp_base TEXT NOT NULL,
+                cd_produto INTEGER NOT NULL,
+                cd_classe TEXT NOT NULL,
+                vr_base REAL NOT NULL,
+                pc_individual REAL NOT NULL,
+                pc_acumulado REAL NOT NULL,
+                nr_posicao INTEGER NOT NULL,
+                PRIMARY KEY (tp_base, cd_produto)
+            ) WITHOUT ROWID''',
+        "CREATE INDEX idx_classificacao_abc_posicao ON Classificacao_ABC (tp_base, nr_posicao)",
+        '''CREATE TABLE Calculos_ABC (
+                tp_base TEXT PRIMARY KEY,
+                nr_versao INTEGER NOT NULL,
+                nr_dias INTEGER,
+                dt_calculo DATETIME NOT NULL
+            ) WITHOUT ROWID''',
+        "INSERT INTO Versoes_Dados (nm_chave, nr_versao) VALUES ('estoque_custo', 0), ('movimentacoes', 0)",
+    ] + [
+        f'''CREATE TRIGGER trg_produtos_versao_estoque_custo_{nome} AFTER {evento} ON Produtos
+            BEGIN
+                UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'estoque_custo';
+            END'''
+        for nome, evento in (("insert", "INSERT"), ("delete", "DELETE"),
+                             ("update", "UPDATE OF vr_estoque_atual, vr_custo"))
+    ] + [
+        f'''CREATE TRIGGER trg_movimentacoes_versao_movimentacoes_{evento.lower()} AFTER {evento} ON Movimentacoes
+            BEGIN
+                UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'movimentacoes';
+            END'''
+        for evento in ("INSERT", "UPDATE", "DELETE")
+    ]),
+    (8, "Sugestões de reposição calculadas pela previsão de demanda", [
+        '''CREATE TABLE Sugestoes_Reposicao (
+                cd_produto INTEGER PRIMARY KEY,
+                tp_metodo TEXT NOT NULL,
+                vr_demanda_semanal REAL NOT NULL,
+                vr_desvio_semanal REAL NOT NULL,
+                qt_ponto_pedido INTEGER NOT NULL,
+                qt_pedido_sugerido INTEGER NOT NULL,
+                dt_calculo DATETIME NOT NULL
+            )''',
+        # Série de saídas por produto (cobre a consulta da previsão, que lê faixas de produtos em paralelo)
+        '''CREATE INDEX IF NOT EXISTS idx_resumo_diario_produto
+           ON Resumo_Movimentos_Diarios (tp_movimento, produto_id, dt_dia, qt_total)''',
+    ]),
+    # Camadas PEPS: cada Entrada abre uma camada com o seu custo unitário e cada Saída consome as camadas mais
+    # antigas, tudo por trigger na mesma transação da movimentação. Só as camadas com saldo ficam na tabela.
+    # O histórico anterior não tem custo por movimentação: cada produto começa com uma camada de abertura
+    # (estoque atual × custo atual), e peps.reconstruir_camadas refaz as camadas a partir de Movimentacoes.
+    (9, "Custo unitário nas movimentações e camadas de custo PEPS", [
+        "ALTER TABLE Movimentacoes ADD COLUMN vr_custo_unitario REAL",
+        "ALTER TABLE Resumo_Saidas_Produto ADD COLUMN vr_custo_total REAL NOT NULL DEFAULT 0",
+        '''CREATE TABLE Camadas_Custo (
+                id INTEGER PRIMARY KEY,
+                produto_id INTEGER NOT NULL,
+                movimentacao_id INTEGER,
+                dt_entrada DATETIME NOT NULL,
+                qt_original INTEGER NOT NULL,
+                qt_restante INTEGER NOT NULL,
+                vr_custo_unitario REAL NOT NULL
+            )''',
+        "CREATE INDEX idx_camadas_custo_produto ON Camadas_Custo (produto_id, dt_entrada, id)",
+
+        '''UPDATE Movimentacoes SET vr_custo_unitario = p.vr_custo
+           FROM Produtos p WHERE p.cd_produto = Movimentacoes.produto_id''',
+        '''UPDATE Resumo_Saidas_Produto SET vr_custo_total = qt_total * p.vr_custo
+           FROM Produtos p WHERE p.cd_produto = Resumo_Saidas_Produto.produto_id AND p.vr_custo IS NOT NULL''',
+        '''INSERT INTO Camadas_Custo (produto_id, dt_entrada, qt_original, qt_restante, vr_custo_unitario)
+           SELECT cd_produto, DATETIME('now', 'localtime'), vr_estoque_atual, vr_estoque_atual, COALESCE(vr_custo, 0)
+           FROM Produtos WHERE vr_estoque_atual > 0''',
+
+        '''CREATE TRIGGER trg_movimentacoes_peps_entrada AFTER INSERT ON Movimentacoes
+           WHEN NEW.tp_movimento = 'Entrada' AND NEW.qt_movimento > 0
+           BEGIN
+               UPDATE Movimentacoes SET vr_custo_unitario = (SELECT vr_custo FROM Produtos WHERE cd_produto = NEW.produto_id)
+               WHERE id = NEW.id AND vr_custo_unitario IS NULL;
+               INSERT INTO Camadas_Custo (produto_id, movimentacao_id, dt_entrada, qt_original, qt_restante, vr_custo_unitario)
+               SELECT NEW.produto_id, NEW.id, NEW.data_hora, NEW.qt_movimento, NEW.qt_movimento, COALESCE(vr_custo_unitario, 0)
+               FROM Movimentacoes WHERE id = NEW.id;
+           END''',
+        # A parte da saída que passa do saldo das camadas é custeada pelo custo atual do produto
+        f'''CREATE TRIGGER trg_movimentacoes_peps_saida AFTER INSERT ON Movimentacoes
+           WHEN NEW.tp_movimento = 'Saida' AND NEW.qt_movimento > 0
+           BEGIN
+               UPDATE Movimentacoes SET vr_custo_unitario = (
+                   COALESCE((SELECT SUM(MIN(c.qt_restante, NEW.qt_movimento - c.qt_anterior) * c.vr_custo_unitario)
+                             FROM {_CAMADAS_ABERTAS} c WHERE c.qt_anterior < NEW.qt_movimento), 0)
+                   + MAX(NEW.qt_movimento - COALESCE((SELECT SUM(qt_restante) FROM Camadas_Custo
+                                                      WHERE produto_id = NEW.produto_id), 0), 0)
+                     * COALESCE((SELECT vr_custo FROM Produtos WHERE cd_produto = NEW.produto_id), 0)
+               ) / NEW.qt_movimento
+               WHERE id = NEW.id;
+               INSERT INTO Resumo_Saidas_Produto (produto_id, qt_total, qt_movimentos, vr_custo_total)
+               SELECT NEW.produto_id, 0, 0, vr_custo_unitario * NEW.qt_movimento FROM Movimentacoes WHERE id = NEW.id
+               ON CONFLICT (produto_id) DO UPDATE SET vr_custo_total = vr_custo_total + excluded.vr_custo_total;
+               UPDATE Camadas_Custo SET qt_restante = Camadas_Custo.qt_restante - MIN(c.qt_restante, NEW.qt_movimento - c.qt_anterior)
+               FROM {_CAMADAS_ABERTAS} c
+               WHERE Camadas_Custo.id = c.id AND c.qt_anterior < NEW.qt_movimento;
+               DELETE FROM Camadas_Custo WHERE produto_id = NEW.produto_id AND qt_restante <= 0;
+           END''',
+        '''CREATE TRIGGER trg_produtos_peps_delete AFTER DELETE ON Produtos
+           BEGIN
+               DELETE FROM Camadas_Custo WHERE produto_id = OLD.cd_produto;
+           END''',
+    ]),
+    # Snapshot do ledger: saldo de cada produto pelas movimentações com id até nr_ultima_movimentacao. A conciliação
+    # soma a ele só as movimentações de id maior (faixa do rowid; o AUTOINCREMENT nunca reaproveita ids).
+    # Como nos resumos, exclusões em Movimentacoes não descontam o snapshot: ele guarda o histórico consolidado.
+    (10, "Snapshots de saldo do ledger e divergências com o estoque do cadastro", [
+        '''CREATE TABLE Snapshots_Ledger (
+                id INTEGER PRIMARY KEY,
+                nr_ultima_movimentacao INTEGER NOT NULL,
+                qt_movimentacoes INTEGER NOT NULL,
+                dt_snapshot DATETIME NOT NULL
+            )''',
+        '''CREATE TABLE Saldos_Snapshot (
+                produto_id INTEGER PRIMARY KEY,
+                qt_saldo INTEGER NOT NULL
+            )''',
+        '''CREATE TABLE Divergencias_Estoque (
+                produto_id INTEGER PRIMARY KEY,
+                qt_ledger INTEGER NOT NULL,
+                qt_cadastro INTEGER,
+                dt_deteccao DATETIME NOT NULL
+            )''',
+    ]),
+    # Arquivamento: meses antigos de Movimentacoes vão para um banco SQLite por mês (pasta arquivo/, ao lado do
+    # banco principal). Antes de sair, os totais de giro e perdas de cada produto vão para Resumo_Arquivado_Produto
+    (11, "Movimentações arquivadas por mês e totais por produto do que foi arquivado", [
+        '''CREATE TABLE Arquivos_Movimentacoes (
+                nm_mes TEXT NOT NULL PRIMARY KEY,
+                nm_arquivo TEXT NOT NULL,
+                qt_movimentacoes INTEGER NOT NULL,
+                dt_arquivamento DATETIME NOT NULL
+            ) WITHOUT ROWID''',
+        '''CREATE TABLE Resumo_Arquivado_Produto (
+                produto_id INTEGER PRIMARY KEY,
+                qt_mov_saida INTEGER NOT NULL DEFAULT 0,
+                qt_saida INTEGER NOT NULL DEFAULT 0,
+                qt_mov_perda INTEGER NOT NULL DEFAULT 0,
+                qt_perda INTEGER NOT NULL DEFAULT 0,
+                vr_perda_custeada REAL NOT NULL DEFAULT 0,
+                qt_perda_sem_custo INTEGER NOT NULL DEFAULT 0
+            )''',
+    ]),
+    # Versão própria da curva ABC: regravar a classificação invalida só as leituras e o gráfico da curva,
+    # não o cache inteiro
+    (12, "Chave de versão da classificação ABC", [
+        "INSERT INTO Versoes_Dados (nm_chave, nr_versao) VALUES ('abc', 0)",
+    ]),
+    # Carga em lote: com uma linha em Carga_Em_Lote, os triggers de versão (migrações 6 e 7) não disparam e a
+    # importação incrementa cada chave uma vez por lote. A linha é gravada e apagada dentro da transação do lote,
+    # então nenhuma outra conexão chega a vê-la
+    (13, "Triggers de versão desligados durante as cargas em lote", [
+        '''CREATE TABLE Carga_Em_Lote (
+                id INTEGER PRIMARY KEY CHECK (id = 1)
+            )''',
+    ] + [
+        comando
+        for nome, evento, tabela, chave in (
+            [(f"trg_{tabela.lower()}_versao_{evento.lower()}", evento, tabela, "dados")
+             for tabela in ("Produtos", "Movimentacoes", "Categorias") for evento in ("INSERT", "UPDATE", "DELETE")]
+            + [(f"trg_produtos_versao_estoque_custo_{nome}", evento, "Produtos", "estoque_custo")
+               for nome, evento in (("insert", "INSERT"), ("delete", "DELETE"),
+                                    ("update", "UPDATE OF vr_estoque_atual, vr_custo"))]
+            + [(f"trg_movimentacoes_versao_movimentacoes_{evento.lower()}", evento, "Movimentacoes", "movimentacoes")
+               for evento in ("INSERT", "UPDATE", "DELETE")])
+        for comando in (
+            f"DROP TRIGGER {nome}",
+            f'''CREATE TRIGGER {nome} AFTER {evento} ON {tabela}
+                WHEN NOT EXISTS (SELECT 1 FROM Carga_Em_Lote)
+                BEGIN
+                    UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = '{chave}';
+                END''')
+    ]),
+    # Versão própria das sugestões de reposição: recalculá-las invalida só as leituras de Sugestoes_Reposicao
+    (14, "Chave de versão das sugestões de reposição", [
+        "INSERT INTO Versoes_Dados (nm_chave, nr_versao) VALUES ('sugestoes', 0)",
+    ]),
+    # Correção de uma movimentação (data, produto, tipo ou quantidade): os resumos da migração 3 tiram a versão
+    # antiga e somam a nova. O custo PEPS das saídas corrigidas fica para peps.reconstruir_camadas
+    (15, "Resumos de movimentações acompanham a correção de uma movimentação", [
+        '''CREATE TRIGGER trg_movimentacoes_resumo_update
+           AFTER UPDATE OF data_hora, produto_id, tp_movimento, qt_movimento ON Movimentacoes
+           BEGIN
+               UPDATE Resumo_Movimentos_Diarios SET qt_total = qt_total - COALESCE(OLD.qt_movimento, 0),
+                                                    qt_movimentos = qt_movimentos - 1
+               WHERE dt_dia = SUBSTR(OLD.data_hora, 1, 10) AND tp_movimento = OLD.tp_movimento
+                 AND produto_id = OLD.produto_id;
+               DELETE FROM Resumo_Movimentos_Diarios
+               WHERE dt_dia = SUBSTR(OLD.data_hora, 1, 10) AND tp_movimento = OLD.tp_movimento
+                 AND produto_id = OLD.produto_id AND qt_movimentos <= 0;
+               INSERT INTO Resumo_Movimentos_Diarios (dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos)
+               VALUES (SUBSTR(NEW.data_hora, 1, 10), NEW.produto_id, NEW.tp_movimento, COALESCE(NEW.qt_movimento, 0), 1)
+               ON CONFLICT (dt_dia, tp_movimento, produto_id) DO UPDATE SET
+                   qt_total = qt_total + excluded.qt_total,
+                   qt_movimentos = qt_movimentos + 1;
+
+               UPDATE Resumo_Saidas_Produto SET qt_total = qt_total - COALESCE(OLD.qt_movimento, 0),
+                                                qt_movimentos = qt_movimentos - 1
+               WHERE OLD.tp_movimento = 'Saida' AND produto_id = OLD.produto_id;
+               INSERT INTO Resumo_Saidas_Produto (produto_id, qt_total, qt_movimentos)
+               SELECT NEW.produto_id, COALESCE(NEW.qt_movimento, 0), 1 WHERE NEW.tp_movimento = 'Saida'
+               ON CONFLICT (produto_id) DO UPDATE SET
+                   qt_total = qt_total + excluded.qt_total,
+                   qt_movimentos = qt_movimentos + 1;
+           END''',
+    ]),
+]
+
+
+# Schema original do inventario.db, usado para criar bancos novos (testes de carga, benchmarks)
+ESQUEMA_BASE = [
+    "CREATE TABLE IF NOT EXISTS Categorias (cd_categoria INTEGER PRIMARY KEY, nm_categoria TEXT NOT NULL UNIQUE)",
+    '''CREATE TABLE IF NOT EXISTS Produtos (cd_produto INTEGER PRIMARY KEY, nm_produto TEXT NOT NULL, ds_produto TEXT,
+            categoria_id INTEGER NOT NULL, vr_custo REAL NOT NULL, vr_venda REAL NOT NULL, vr_estoque_atual INTEGER,
+            vr_estoque_minimo INTEGER, FOREIGN KEY (categoria_id) REFERENCES Categorias(cd_categoria))''',
+    '''CREATE TABLE IF NOT EXISTS Movimentacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            produto_id TEXT,
+            tp_movimento TEXT,
+            qt_movimento INTEGER,
+            data_hora DATETIME,
+            nm_motivo TEXT,
+            FOREIGN KEY(produto_id) REFERENCES Produtos(cd_produto)
+        )''',
+    '''CREATE TABLE IF NOT EXISTS Versoes_Schema (
+            cd_versao INTEGER PRIMARY KEY,
+            ds_migracao TEXT NOT NULL,
+            dt_aplicacao DATETIME NOT NULL)''',
+]
+
+CATEGORIAS_PADRAO = [
+    (1, 'Motor'),
+    (2, 'Suspensão'),
+    (3, 'Freios'),
+    (4, 'Elétrica'),
+    (5, 'Acessórios')]
+
+
+def _criar_tabelas_base(conn):
+    for comando in ESQUEMA_BASE:
+        conn.execute(comando)
+    conn.commit()
+
+
+def versoes_aplicadas(conn):
+    _criar_tabelas_base(conn)
+    return {linha[0] for linha in conn.execute("SELECT cd_versao FROM Versoes_Schema")}
+
+
+def aplicar_migracoes(conn, migracoes=MIGRACOES):
+    """Aplica as migrações pendentes, cada uma na sua própria transação, e devolve as versões aplicadas agora."""
+    aplicadas = versoes_aplicadas(conn)
+    novas = []
+    for versao, descricao, comandos in migracoes:
+        if versao in aplicadas:
+            continue
+        # BEGIN IMMEDIATE impede que dois processos apliquem a mesma versão ao mesmo tempo
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM Versoes_Schema WHERE cd_versao = ?", (versao,)).fetchone():
+                conn.rollback()
+                continue
+            for comando in comandos:
+                conn.execute(comando)
+            conn.execute("INSERT INTO Versoes_Schema (cd_versao, ds_migracao, dt_aplicacao) VALUES (?, ?, ?)",
+                         (versao, descricao, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        novas.append(versao)
+    return novas
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else CAMINHO_DB
+    conn = sqlite3.connect(caminho)
+    try:
+        novas = aplicar_migracoes(conn)
+    finally:
+        conn.close()
+    print(f"Migrações aplicadas: {novas}" if novas else "Banco já está na versão mais recente.")
@@ -0,0 +1,26 @@
+import importlib
+import time
+
+
+# Item do menu -> módulo da página. Cada módulo só é importado (com pandas, matplotlib etc.) quando a
+# página é aberta pela primeira vez no processo; depois fica em sys.modules.
+PAGINAS = {
+    "Sobre": "sobre",
+    "Adicionar Produto": "adicionar_produto",
+    "Atualizar/Remover": "atualizar_remover",
+    "Consultar": "consultar",
+    "Movimentações": "movimentacoes",
+    "Dashboard": "dashboard",
+}
+
+# Páginas fora do menu, abertas pela URL (?pagina=diagnostico)
+PAGINAS_OCULTAS = {
+    "Diagnóstico": "diagnostico",
+}
+
+
+def carregar_pagina(nome):
+    """Importa o módulo da página; devolve ``(modulo, segundos gastos na importação)``."""
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(f"{__name__}.{PAGINAS.get(nome) or PAGINAS_OCULTAS[nome]}")
+    return modulo, time.perf_counter() - inicio
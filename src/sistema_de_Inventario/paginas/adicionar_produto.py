@@ -0,0 +1,77 @@
+# Página "Adicionar Produto": cadastro individual e carga/exportação em massa.
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+from sistema_de_Inventario.exportacao import exportar
+from sistema_de_Inventario.importacao import importar_movimentacoes, importar_produtos
+from sistema_de_Inventario.paginas.comum import conectar_db
+
+
+def renderizar():
+    st.subheader("Cadastro de Novo Produto")
+    with st.form("form_adicionar"):
+        col1, col2 = st.columns(2)
+        cod = col1.text_input("Código Único do Produto")
+        nome = col2.text_input("Nome do Produto")
+        desc = st.text_area("Descrição Técnica")
+
+        cat = col1.selectbox("Código da Categoria", ["1 - Motor", "2 - Suspensão", "3 - Freios", "4 - Elétrica", "5 - Acessórios"])
+        custo = col1.number_input("Preço de Custo (R$)", min_value=0.0, format="%.2f")
+        venda = col2.number_input("Preço de Venda (R$)", min_value=0.0, format="%.2f")
+        estoque = col1.number_input("Estoque Atual", min_value=0)
+        minimo = col2.number_input("Estoque Mínimo permitido", min_value=0)
+        
+        btn_cadastrar = st.form_submit_button("Salvar Produto")
+
+    if btn_cadastrar:
+        if cod and nome:
+            try:
+                with conectar_db() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute('INSERT INTO Produtos (cd_produto, nm_produto, ds_produto, categoria_id, vr_custo, vr_venda, vr_estoque_atual, vr_estoque_minimo) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (cod, nome, desc, int(cat.split(" - ")[0]), custo, venda, estoque, minimo))
+                    # O estoque inicial entra como movimentação, abrindo a primeira camada de custo PEPS do produto
+                    if estoque > 0:
+                        cursor.execute("INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario) VALUES (?, 'Entrada', ?, ?, 'Cadastro', ?)", (cod, estoque, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), custo))
+                    conn.commit()
+                st.success(f"Produto {nome} cadastrado com sucesso!")
+            except sqlite3.IntegrityError:
+                st.error("Erro: Este código já existe no sistema.")
+        else:
+            st.warning("Tente novamente, preenchendo todos os campos obrigatórios.")
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    # Carga em massa: arquivo lido em lotes e gravado com executemany, uma transação por lote
+    st.subheader("Importação e Exportação em Massa")
+    tipo_carga = st.radio("Dados", ["produtos", "movimentacoes"], horizontal=True,
+                          format_func={"produtos": "Produtos", "movimentacoes": "Movimentações"}.get)
+    arquivo_carga = st.file_uploader("Arquivo CSV ou Parquet", type=["csv", "parquet"])
+    if arquivo_carga is not None and st.button("Importar Arquivo"):
+        importar = importar_produtos if tipo_carga == "produtos" else importar_movimentacoes
+        try:
+            with conectar_db() as conn:
+                resultado = importar(conn, arquivo_carga)
+            st.success(f"{resultado.gravadas} linhas gravadas de {resultado.lidas} lidas "
+                       f"({resultado.linhas_por_segundo:,.0f} linhas/s). Movimentações registradas: {resultado.movimentacoes}.")
+            if resultado.ignoradas:
+                st.info(f"{resultado.ignoradas} produtos já cadastrados foram ignorados.")
+            if resultado.rejeitadas:
+                st.warning(f"{resultado.rejeitadas} linhas rejeitadas.")
+                st.dataframe(pd.DataFrame(resultado.erros, columns=["Linha", "Motivo"]), use_container_width=True)
+        # Arquivo ilegível (CSV ou Parquet inválido) ou banco ocupado/violação de restrição: o lote em curso é desfeito
+        except (ValueError, ImportError, pd.errors.ParserError, sqlite3.IntegrityError, sqlite3.OperationalError) as e:
+            st.error(f"Erro na importação: {e}")
+
+    if st.button("Gerar Exportação CSV"):
+        # O CSV vai para um arquivo temporário em lotes, em vez de montar o texto inteiro em memória
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / f"{tipo_carga}.csv"
+            with conectar_db() as conn:
+                total = exportar(conn, tipo_carga, caminho, formato="csv")
+            with open(caminho, "rb") as arquivo:
+                st.download_button(f"Baixar {total} linhas", arquivo, file_name=f"{tipo_carga}.csv", mime="text/csv")
@@ -0,0 +1,96 @@
+# Página "Atualizar/Remover": edição campo a campo, ajuste de estoque e exclusão de produtos.
+import sqlite3
+
+import pandas as pd
+import streamlit as st
+
+from sistema_de_Inventario.estoque import ProdutoNaoEncontrado, definir_estoque
+from sistema_de_Inventario.paginas.comum import conectar_db
+
+
+def renderizar():
+    st.subheader("Produtos Existentes")
+    if st.button("Atualizar Tabela", key="atualizar_produtos"):
+        st.rerun()
+    with conectar_db() as conn:
+        query1 = "SELECT * FROM Produtos"
+        df = pd.read_sql_query(query1, conn)
+    st.dataframe(df)
+
+    
+    st.subheader("Gerir Produtos Existentes")
+    with conectar_db() as conn:
+        df_prods = pd.read_sql_query("SELECT cd_produto, nm_produto, vr_venda, vr_estoque_atual FROM Produtos", conn)
+
+    cd_selecionado = st.selectbox("Selecione o produto pelo Código", df_prods['cd_produto'])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        novo_nome = st.text_input("Novo Nome do produto")
+        if st.button("Atualizar Nome"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET nm_produto = ? WHERE cd_produto = ?", (novo_nome, cd_selecionado))
+                conn.commit()
+            st.success("Nome atualizado!")
+
+        nova_descricao = st.text_input("Nova Descrição do produto")
+        if st.button("Atualizar Descrição"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET ds_produto = ? WHERE cd_produto = ?", (nova_descricao, cd_selecionado))
+                conn.commit()
+            st.success("Descrição atualizada!")
+
+        nova_categoria = st.number_input("Nova Categoria do produto", min_value=1, max_value=5)
+        if st.button("Atualizar Categoria"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET categoria_id = ? WHERE cd_produto = ?", (nova_categoria, cd_selecionado))
+                conn.commit()
+            st.success("Categoria atualizada!")
+
+        novo_preco_custo = st.number_input("Novo Custo de produção", min_value=0.0)
+        if st.button("Atualizar Custo"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET vr_custo = ? WHERE cd_produto = ?", (novo_preco_custo, cd_selecionado))
+                conn.commit()
+            st.success("Preço atualizado!")
+
+        novo_preco_vendas = st.number_input("Novo Preço de Venda", min_value=0.0)
+        if st.button("Atualizar Preço"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET vr_venda = ? WHERE cd_produto = ?", (novo_preco_vendas, cd_selecionado))
+                conn.commit()
+            st.success("Preço atualizado!")
+
+        novo_estoque_atual = st.number_input("Novo Estoque Atual", min_value=0)
+
+        nm_motivo = st.text_input("Motivo da alteração (Venda, Devolução, Perda, Ajuste)", "Ajuste")
+
+        if st.button("Atualizar Estoque"):
+            # Leitura e ajuste na mesma transação BEGIN IMMEDIATE: dois operadores no mesmo SKU não perdem atualizações
+            # (o produto pode ter sido removido por outra sessão, e o banco pode seguir ocupado depois das retentativas)
+            try:
+                with conectar_db() as conn:
+                    movimento = definir_estoque(conn, int(cd_selecionado), int(novo_estoque_atual), nm_motivo)
+            except (ProdutoNaoEncontrado, sqlite3.OperationalError) as e:
+                st.error(f"Erro ao atualizar estoque: {e}")
+            else:
+                if movimento:
+                    st.success(f"Estoque atualizado! Movimentação de {movimento[0]} registrada.")
+                else:
+                    st.info("O novo valor é igual ao atual. Nenhuma movimentação registrada.")
+
+        novo_estoque_minimo = st.number_input("Novo Estoque Mínimo", min_value=0.0)
+        if st.button("Atualizar Estoque Mínimo"):
+            with conectar_db() as conn:
+                conn.execute("UPDATE Produtos SET vr_estoque_minimo = ? WHERE cd_produto = ?", (novo_estoque_minimo, cd_selecionado))
+                conn.commit()
+            st.success("Estoque atualizado!")
+
+    with col2:
+        st.write("Cuidado ao remover produtos!")
+        if st.button("Remover Produto Permanentemente"):
+            with conectar_db() as conn:
+                conn.execute("DELETE FROM Produtos WHERE cd_produto = ?", (cd_selecionado,))
+                conn.commit()
+            st.warning("Produto removido.")
+            st.rerun()
@@ -0,0 +1,74 @@
+# Recursos compartilhados pelas páginas: pool de conexões, caches de consultas e de gráficos e registros de tempos.
+import os
+import sqlite3
+
+import streamlit as st
+
+from sistema_de_Inventario.db import CAMINHO_DB, PoolConexoes
+from sistema_de_Inventario.estoque import movimentar_estoque
+from sistema_de_Inventario.instrumentacao import LIMITE_LENTA_MS, RegistroConsultas
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+from sistema_de_Inventario.tempos import RegistroTempos
+
+
+# Pool de conexões do SQLite, criado uma vez por processo e compartilhado entre as sessões.
+# As migrações de schema e as categorias padrão rodam aqui, antes da primeira consulta do processo,
+# e não a cada rerun. Toda instrução SQL das conexões do pool é medida (ver obter_registro_consultas).
+@st.cache_resource
+def obter_pool():
+    pool = PoolConexoes(CAMINHO_DB, registro=obter_registro_consultas())
+    with pool.conexao() as conn:
+        aplicar_migracoes(conn)
+        conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+        conn.commit()
+    return pool
+
+
+# Criando uma função para conexão do banco de dados do SQLite (devolve a conexão ao pool no fim do "with")
+def conectar_db():
+    return obter_pool().conexao()
+
+
+# Cache de consultas dos relatórios, compartilhado entre as sessões e invalidado a cada escrita no banco.
+# Importado aqui dentro porque puxa o pandas, que a página "Sobre" não usa.
+@st.cache_resource
+def obter_cache():
+    from sistema_de_Inventario.cache import CacheConsultas
+    return CacheConsultas()
+
+
+def ler_consulta(conn, query, params=(), chaves=()):
+    return obter_cache().ler(conn, query, params, chaves)
+
+
+# Gráficos do Dashboard já rasterizados, também por processo e pela mesma versão dos dados
+@st.cache_resource
+def obter_cache_graficos():
+    from sistema_de_Inventario.graficos import CacheGraficos
+    return CacheGraficos()
+
+
+# Tempos de partida e de cada rerun; INVENTARIO_LOG_TEMPOS=arquivo.jsonl grava também em arquivo
+@st.cache_resource
+def obter_registro_tempos():
+    return RegistroTempos(os.environ.get("INVENTARIO_LOG_TEMPOS"))
+
+
+# Tempo e linhas de cada instrução SQL, por página. Consultas acima de INVENTARIO_LIMITE_LENTA_MS (padrão 250 ms)
+# vão para o log de lentas com o EXPLAIN QUERY PLAN; INVENTARIO_LOG_LENTAS=arquivo.jsonl grava também em arquivo
+@st.cache_resource
+def obter_registro_consultas():
+    return RegistroConsultas(float(os.environ.get("INVENTARIO_LIMITE_LENTA_MS", LIMITE_LENTA_MS)),
+                             os.environ.get("INVENTARIO_LOG_LENTAS"))
+
+
+# Função para registrar movimentações de estoque (atualiza o saldo e grava a movimentação na mesma transação)
+def registrar_movimentacao(produto_id, tp_movimento, qt_movimento, nm_motivo):
+    try:
+        with conectar_db() as conn:
+            return movimentar_estoque(conn, produto_id, tp_movimento, qt_movimento, nm_motivo)
+    except (ValueError, LookupError) as e:
+        st.error(f"Erro ao registrar movimentação: {e}")
+    # Banco ocupado por outra escrita mesmo depois das retentativas de movimentar_estoque
+    except sqlite3.OperationalError as e:
+        st.error(f"Banco de dados ocupado, a movimentação não foi registrada. Tente novamente. ({e})")
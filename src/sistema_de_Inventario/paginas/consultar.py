@@ -0,0 +1,43 @@
+# Página "Consultar": busca full-text e consultas predeterminadas.
+import streamlit as st
+
+from sistema_de_Inventario.busca import buscar_produtos
+from sistema_de_Inventario.paginas.comum import conectar_db, ler_consulta
+from sistema_de_Inventario.peps import CONSULTA_VALORACAO_PEPS
+from sistema_de_Inventario.relatorios import CONSULTA_CATEGORIAS, CONSULTA_PRODUTOS, relatorios_produtos
+
+
+def renderizar():
+
+    st.subheader("Consulta de Inventário")
+    busca = st.text_input("Procurar pelo nome ou código")
+
+    if st.button("Atualizar Tabela", key="atualizar_produtos"):
+        st.rerun()
+    with conectar_db() as conn:
+        # Uma leitura de Produtos alimenta a tabela e as consultas predeterminadas (ver relatorios.py)
+        relatorios = relatorios_produtos(ler_consulta(conn, CONSULTA_PRODUTOS), ler_consulta(conn, CONSULTA_CATEGORIAS))
+        if busca:
+            # Busca indexada (FTS5) e parametrizada, com resultados ordenados por relevância
+            df = buscar_produtos(conn, busca)
+        else:
+            df = relatorios["produtos"]
+        df_peps = ler_consulta(conn, CONSULTA_VALORACAO_PEPS)
+
+    st.dataframe(df, use_container_width=True)
+
+    st.markdown("<hr>", unsafe_allow_html=True)
+
+    st.subheader("Consultas prédeterminadas")
+
+    st.write("Produtos com estoque abaixo do mínimo:")
+    st.dataframe(relatorios["abaixo_minimo"], use_container_width=True)
+
+    st.write("Produtos com muito estoque")
+    st.dataframe(relatorios["excesso"], use_container_width=True)
+
+    st.write("Cálculo PEPS (camadas de custo abertas e CMV)")
+    st.dataframe(df_peps, use_container_width=True)
+
+    st.write("Quantidade de Produtos por Categoria")
+    st.dataframe(relatorios["por_categoria"], use_container_width=True)
@@ -0,0 +1,130 @@
+# Página "Dashboard": KPIs, gráficos, curva ABC e sugestões de reposição.
+import streamlit as st
+
+from sistema_de_Inventario import graficos
+from sistema_de_Inventario.curva_abc import (JANELAS, atualizar_curva_abc, consulta_curva_abc, consulta_resumo_classes,
+                                             ultimo_calculo)
+from sistema_de_Inventario.paginas.comum import conectar_db, ler_consulta, obter_cache_graficos
+from sistema_de_Inventario.previsao import CONSULTA_REPOSICAO, aplicar_como_estoque_minimo, atualizar_sugestoes
+
+
+# Mostra um gráfico: nativo (Vega-Lite, desenhado no navegador) ou a imagem matplotlib em cache, que só é
+# redesenhada quando os dados mudam
+def mostrar_grafico(conn, nativo, chave, df, espec_vega, desenhar, chaves=()):
+    if nativo:
+        st.vega_lite_chart(df, espec_vega, use_container_width=True)
+    else:
+        st.image(obter_cache_graficos().png(conn, chave, desenhar, chaves), use_container_width=True)
+
+
+def renderizar():
+    st.subheader("Dashboard Estratégico")
+    nativo = st.toggle("Gráficos interativos (nativos do Streamlit)", key="graficos_nativos")
+    with conectar_db() as conn:
+
+        # Os KPIs leem as tabelas de resumo mantidas por triggers (ver migracoes.py, versão 3)
+        col1, col2, col3, col4 = st.columns(4)
+        valor_total = ler_consulta(conn, "SELECT SUM(vr_estoque) FROM Resumo_Estoque_Categoria").iloc[0,0] or 0
+        col1.metric("Valor em Estoque", f"R$ {valor_total:,.2f}")
+        itens_criticos = ler_consulta(conn, "SELECT COALESCE(SUM(qt_itens_criticos), 0) FROM Resumo_Estoque_Categoria").iloc[0,0]
+        col2.metric("Itens Críticos", itens_criticos, delta="Abaixo do Mínimo", delta_color="inverse")
+        total_saidas = ler_consulta(conn, "SELECT SUM(qt_total) FROM Resumo_Saidas_Produto").iloc[0,0] or 0
+        col3.metric("Volume de Saídas", int(total_saidas))
+        try:
+            top_sku = ler_consulta(conn, "SELECT p.nm_produto FROM Resumo_Saidas_Produto r JOIN Produtos p ON p.cd_produto = r.produto_id ORDER BY r.qt_total DESC LIMIT 1").iloc[0,0]
+            col4.metric("Produto Estrela", top_sku)
+        except:
+            col4.metric("Produto Estrela", "N/A")
+
+        st.markdown("---")
+
+        c1, c2 = st.columns(2)
+
+        with c1:
+            st.markdown("### 💰 Valor de Estoque por Categoria")
+            query_cat = "SELECT c.nm_categoria, r.vr_estoque as valor FROM Resumo_Estoque_Categoria r JOIN Categorias c ON r.categoria_id = c.cd_categoria WHERE r.qt_produtos > 0 ORDER BY c.nm_categoria"
+            df_cat = ler_consulta(conn, query_cat)
+
+            if not df_cat.empty:
+                mostrar_grafico(conn, nativo, "valor_categoria", df_cat, graficos.VEGA_VALOR_CATEGORIA,
+                                lambda: graficos.figura_valor_categoria(df_cat))
+            else:
+                st.info("Sem dados de categorias.")
+
+        with c2:
+            st.markdown("### 📦 Top 5 Produtos - Nível de Estoque")
+            df_estoque = ler_consulta(conn, "SELECT nm_produto, vr_estoque_atual FROM Produtos ORDER BY vr_estoque_atual DESC LIMIT 5")
+
+            if not df_estoque.empty:
+                mostrar_grafico(conn, nativo, "top_estoque", df_estoque, graficos.VEGA_TOP_ESTOQUE,
+                                lambda: graficos.figura_top_estoque(df_estoque))
+            else:
+                st.info("Sem produtos cadastrados.")
+
+        st.markdown("---")
+
+        st.markdown("### 📉 Histórico de Movimentações (Entradas vs Saídas)")
+        query_temporal = "SELECT dt_dia as data, tp_movimento, SUM(qt_total) as total FROM Resumo_Movimentos_Diarios GROUP BY dt_dia, tp_movimento"
+        df_temp = ler_consulta(conn, query_temporal)
+
+        if not df_temp.empty:
+            df_pivot = df_temp.pivot(index='data', columns='tp_movimento', values='total').fillna(0)
+            df_longo = df_pivot.reset_index().melt(id_vars='data', var_name='tp_movimento', value_name='total')
+            mostrar_grafico(conn, nativo, "evolucao", df_longo, graficos.VEGA_EVOLUCAO,
+                            lambda: graficos.figura_evolucao(df_pivot))
+        else:
+            st.info("Sem histórico temporal.")
+
+        st.markdown("---")
+
+        st.markdown("### 📊 Análise de Pareto (Curva ABC)")
+        base_abc = st.radio("Base da classificação", ["estoque", "saidas"], horizontal=True,
+                            format_func={"estoque": "Valor em estoque", "saidas": "Valor das saídas (90 dias)"}.get)
+        # Incremental: sem escrita desde o último cálculo, só compara as versões; depois de uma escrita,
+        # recalcula e regrava só os produtos que mudaram. O botão força o cálculo
+        col_calc1, col_calc2 = st.columns([1, 3])
+        if col_calc1.button("Recalcular Curva ABC"):
+            regravadas = atualizar_curva_abc(conn, base_abc, JANELAS[base_abc], forcar=True)
+            col_calc2.success(f"Curva recalculada: {regravadas} produtos regravados.")
+        else:
+            atualizar_curva_abc(conn, base_abc, JANELAS[base_abc])
+        dt_calculo = ultimo_calculo(conn, base_abc)
+        col_calc2.caption(f"Último cálculo: {dt_calculo}" if dt_calculo else "Curva ainda não calculada para esta base.")
+        df_abc = ler_consulta(conn, *consulta_curva_abc(base_abc, limite=10), chaves=("abc",))
+
+        if not df_abc.empty:
+
+            col_abc1, col_abc2 = st.columns([2, 1])
+
+            with col_abc1:
+                mostrar_grafico(conn, nativo, ("curva_abc", base_abc), df_abc[['nm_produto', 'percent_individual', 'percent_acumulado']],
+                                graficos.VEGA_CURVA_ABC, lambda: graficos.figura_curva_abc(df_abc), chaves=("abc",))
+
+            with col_abc2:
+                st.write("**Top 10 - Classificação:**")
+                st.dataframe(df_abc[['nm_produto', 'Classe']], use_container_width=True)
+                st.write("**Catálogo completo por classe:**")
+                st.dataframe(ler_consulta(conn, *consulta_resumo_classes(base_abc), chaves=("abc",)),
+                             use_container_width=True)
+
+        st.markdown("---")
+
+        st.markdown("### 🔮 Sugestões de Reposição")
+        st.caption("Previsão semanal das saídas (suavização exponencial ou Croston para peças de giro intermitente), "
+                   "com estoque de segurança pela classe ABC do produto.")
+        col_prev1, col_prev2 = st.columns(2)
+        with col_prev1:
+            if st.button("Recalcular Previsões"):
+                # O nível de serviço de cada produto vem da classificação ABC por valor em estoque
+                atualizar_curva_abc(conn, "estoque", JANELAS["estoque"])
+                total, segundos = atualizar_sugestoes(conn)
+                st.success(f"{total} produtos previstos em {segundos:.2f}s.")
+        with col_prev2:
+            if st.button("Usar Ponto de Pedido como Estoque Mínimo"):
+                st.success(f"Estoque mínimo atualizado em {aplicar_como_estoque_minimo(conn)} produtos.")
+
+        df_reposicao = ler_consulta(conn, CONSULTA_REPOSICAO, chaves=("sugestoes",))
+        if not df_reposicao.empty:
+            st.dataframe(df_reposicao, use_container_width=True)
+        else:
+            st.info("Nenhum produto abaixo do ponto de pedido sugerido.")
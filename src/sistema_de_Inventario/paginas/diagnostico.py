@@ -0,0 +1,47 @@
+# Página "Diagnóstico" (fora do menu, aberta com ?pagina=diagnostico): latência por página e por instrução SQL,
+# consultas lentas com o plano de execução e o estado do pool e dos caches.
+import pandas as pd
+import streamlit as st
+
+from sistema_de_Inventario.paginas.comum import (obter_cache, obter_cache_graficos, obter_pool, obter_registro_consultas,
+                                                 obter_registro_tempos)
+
+
+def renderizar():
+    st.subheader("Diagnóstico de Desempenho")
+    registro = obter_registro_consultas()
+
+    c1, c2 = st.columns([1, 3])
+    registro.limite_lenta_ms = c1.number_input("Consulta lenta a partir de (ms)", min_value=0.0,
+                                               value=float(registro.limite_lenta_ms), step=50.0)
+    if c2.button("Limpar medições das consultas"):
+        registro.limpar()
+
+    st.markdown("### ⏱️ Latência por página")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Execução completa do script (ms):**")
+        st.dataframe(pd.DataFrame(obter_registro_tempos().resumo()), use_container_width=True)
+    with col2:
+        st.write("**Instruções SQL disparadas pela página (ms):**")
+        st.dataframe(pd.DataFrame(registro.resumo_paginas()), use_container_width=True)
+
+    st.markdown("### 🧮 Instruções SQL por tempo total")
+    st.dataframe(pd.DataFrame(registro.resumo_instrucoes()), use_container_width=True)
+
+    st.markdown("### 🐢 Consultas lentas")
+    lentas = registro.consultas_lentas()
+    if not lentas:
+        st.info(f"Nenhuma consulta acima de {registro.limite_lenta_ms:.0f} ms.")
+    for lenta in lentas:
+        # Resultados lidos por iteração não têm as linhas contadas
+        linhas = "linhas não contadas" if lenta["linhas"] is None else f"{lenta['linhas']} linhas"
+        with st.expander(f"{lenta['dt_execucao']} · {lenta['pagina']} · {lenta['ms']:.1f} ms · {linhas}"):
+            st.code(lenta["sql"], language="sql")
+            st.code("\n".join(lenta["plano"]), language="text")
+
+    st.markdown("### 🔌 Pool de conexões e caches")
+    col1, col2, col3 = st.columns(3)
+    col1.json(obter_pool().estatisticas())
+    col2.json(obter_cache().estatisticas())
+    col3.json(obter_cache_graficos().estatisticas())
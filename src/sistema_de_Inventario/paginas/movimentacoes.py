@@ -0,0 +1,90 @@
+# Página "Movimentações": histórico paginado (inclusive meses arquivados), relatórios de giro, perdas e
+# valoração e conciliação do estoque.
+from datetime import datetime, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from sistema_de_Inventario.arquivamento import meses_arquivados
+from sistema_de_Inventario.conciliacao import (CONSULTA_DIVERGENCIAS, CONSULTA_VALORACAO_LEDGER, MOVIMENTACOES_POR_SNAPSHOT,
+                                               conciliar, movimentacoes_pendentes, ultimo_snapshot)
+from sistema_de_Inventario.historico import listar_movimentacoes
+from sistema_de_Inventario.paginas.comum import conectar_db, ler_consulta
+from sistema_de_Inventario.relatorios import CONSULTA_MOVIMENTOS_POR_PRODUTO, relatorios_movimentacoes
+
+
+def renderizar():
+    st.subheader("Histórico de Movimentações")
+
+    # Filtros aplicados direto no SQL; só a página atual do histórico é carregada
+    f1, f2, f3, f4 = st.columns(4)
+    hoje = datetime.now().date()
+    periodo = f1.date_input("Período", (hoje - timedelta(days=30), hoje))
+    filtro_produto = f2.text_input("Código do produto (opcional)")
+    filtro_tipo = f3.selectbox("Tipo de movimento", ["Todos", "Entrada", "Saida"])
+    tamanho_pagina = f4.selectbox("Linhas por página", [25, 50, 100, 250], index=1)
+
+    dt_inicio, dt_fim = (periodo[0], periodo[-1]) if periodo else (None, None)
+    produto_id = int(filtro_produto) if filtro_produto.strip().isdigit() else None
+    tp_movimento = None if filtro_tipo == "Todos" else filtro_tipo
+
+    # A pilha de cursores guarda o início de cada página já visitada; muda de filtro, volta para a primeira
+    filtros = (dt_inicio, dt_fim, produto_id, tp_movimento, tamanho_pagina)
+    if st.session_state.get("filtros_mov") != filtros:
+        st.session_state["filtros_mov"] = filtros
+        st.session_state["cursores_mov"] = [None]
+
+    with conectar_db() as conn:
+        df_mov, proximo = listar_movimentacoes(conn, dt_inicio, dt_fim, produto_id, tp_movimento,
+                                               apos=st.session_state["cursores_mov"][-1], limite=tamanho_pagina)
+        arquivados = meses_arquivados(conn)
+    st.dataframe(df_mov, use_container_width=True)
+    if arquivados:
+        st.caption(f"Movimentações de {arquivados[-1][0]} a {arquivados[0][0]} estão arquivadas ({len(arquivados)} meses) "
+                   "e só são lidas quando o período chega nelas.")
+
+    n1, n2, n3 = st.columns([1, 1, 4])
+    if n1.button("⬅️ Página anterior", disabled=len(st.session_state["cursores_mov"]) == 1):
+        st.session_state["cursores_mov"].pop()
+        st.rerun()
+    if n2.button("Carregar mais ➡️", disabled=proximo is None):
+        st.session_state["cursores_mov"].append(proximo)
+        st.rerun()
+    n3.caption(f"Página {len(st.session_state['cursores_mov'])}")
+
+    # Giro e perdas saem de uma consulta só, agrupada por produto (ver relatorios.py)
+    with conectar_db() as conn:
+        relatorios = relatorios_movimentacoes(ler_consulta(conn, CONSULTA_MOVIMENTOS_POR_PRODUTO))
+
+    st.write("Giro de Estoque (Frequência de Saídas)")
+    st.dataframe(relatorios["giro"], use_container_width=True)
+
+    st.write("Histórico de Perdas")
+    st.dataframe(relatorios["perdas"], use_container_width=True)
+
+    # Estoque pelo histórico = saldo do último snapshot + movimentações posteriores a ele. A página só lê: quem
+    # grava os snapshots é o job de conciliação (ou o botão "Conciliar agora")
+    with conectar_db() as conn:
+        valoracao = ler_consulta(conn, CONSULTA_VALORACAO_LEDGER)
+        ultima_movimentacao, dt_snapshot = ultimo_snapshot(conn)
+        pendentes = movimentacoes_pendentes(conn)
+
+    st.write("Valoração de Inventário")
+    st.dataframe(valoracao, use_container_width=True)
+    if dt_snapshot:
+        st.caption(f"Histórico consolidado até a movimentação {ultima_movimentacao} (snapshot de {dt_snapshot}); "
+                   f"{pendentes} movimentações posteriores somadas na leitura.")
+    if pendentes >= MOVIMENTACOES_POR_SNAPSHOT:
+        st.warning(f"{pendentes} movimentações ainda não consolidadas: o job de conciliação "
+                   "(python -m sistema_de_Inventario.conciliacao) não está rodando. Use \"Conciliar agora\" ou inicie o job.")
+
+    st.write("Divergências entre o Cadastro e o Ledger")
+    if st.button("Conciliar agora"):
+        with conectar_db() as conn:
+            resultado = conciliar(conn)
+        st.success(f"{resultado.produtos} produtos conciliados em {resultado.segundos * 1000:.0f} ms: "
+                   f"{resultado.divergencias} divergências.")
+    # Gravadas pelo job de conciliação sem mudar a versão dos dados: lidas sem passar pelo cache
+    with conectar_db() as conn:
+        divergencias = pd.read_sql_query(CONSULTA_DIVERGENCIAS, conn)
+    st.dataframe(divergencias, use_container_width=True)
@@ -0,0 +1,68 @@
+# Página "Sobre": apresentação do sistema.
+import streamlit as st
+
+
+def renderizar():
+    st.subheader("👋 Bem-vindo ao ASIPS")
+    st.caption("Automotive Smart Inventory & Predictive System")
+    
+    st.markdown("""
+    Este sistema é uma solução de **ERP Inteligente** projetada para transformar a gestão de inventário no setor de autopeças. 
+    Mais do que um simples registro de entradas e saídas, o sistema utiliza **Ciência de Dados** para garantir que o estoque 
+    trabalhe a favor da rentabilidade do negócio.
+    """)
+
+
+    col_a, col_b = st.columns(2)
+    with col_a:
+        st.markdown("### 🏛️ Integridade")
+        st.write("Gestão transacional via SQLite, garantindo que cada parafuso seja contabilizado sem redundâncias.")
+    with col_b:
+        st.markdown("### 📊 Analytics")
+        st.write("Dashboards dinâmicos que traduzem números em insights visuais sobre o giro de estoque.")
+
+    st.markdown("---")
+
+    st.subheader("🛠️ Arquitetura Técnica")
+    
+    tab1, tab2, tab3 = st.tabs(["Linguagem & Interface", "Dados & Gráficos", "DevOps & Ferramentas"])
+    
+    with tab1:
+        st.markdown("""
+        * **Python 3.x**: Core do sistema.
+        * **Streamlit**: Interface web reativa e moderna.
+        * **Pandas*: Processamento de dados de alta performance.
+        """)
+    
+    with tab2:
+        st.markdown("""
+        * **SQLite**: Banco de dados relacional robusto e local.
+        * **SQL**: Queries complexas para cálculos de PEPS e Giro de Estoque.
+        * **Matplotlib**: Visualizações customizadas para análises estratégicas.
+        """)
+        
+    with tab3:
+        st.markdown("""
+        * **Poetry**: Gestão rigorosa de dependências e ambientes virtuais.
+        * **VS Code**: Ambiente de desenvolvimento principal.
+        * **Git**: Controle de versão e histórico do projeto.
+        """)
+
+    st.markdown("---")
+
+    col_foto, col_info = st.columns([1, 3])
+    with col_info:
+        st.subheader("👤 Sobre o Desenvolvedor")
+        st.markdown(f"""
+        **Aram Bohmann Leite Da Luz** *Técnico em Ciência de Dados (CEDUP Timbó)*
+        
+        Especialista em transformar dados brutos em decisões estratégicas. Minha abordagem une o rigor técnico da análise 
+        com a clareza do **storytelling**, permitindo que insights complexos sejam compreendidos por qualquer stakeholder.
+        """)
+
+        st.markdown("""
+        [LinkedIn](https://www.linkedin.com/in/aram-luz-1b0ab1321/) | 
+        [GitHub](https://www.github.com/Aram-Bohmann) | 
+        [Portfólio](https://aram-bohmann.github.io/Site-Portfolio/) | 
+        [Email](mailto:arambohmannleitedaluz@gmail.com)
+        """)
@@ -0,0 +1,191 @@
+import argparse
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from sistema_de_Inventario.arquivamento import meses_arquivados
+from sistema_de_Inventario.db import CAMINHO_DB
+
+
+PRODUTOS_POR_LOTE = 1_000
+TOLERANCIA_CUSTO = 1e-9
+
+
+@dataclass
+class ResultadoReconstrucao:
+    movimentacoes: int = 0
+    produtos: int = 0
+    camadas: int = 0
+    custos_alterados: int = 0
+    segundos: float = 0.0
+
+    @property
+    def movimentacoes_por_segundo(self):
+        return self.movimentacoes / self.segundos if self.segundos else 0.0
+
+
+def _custear_produto(movimentos, custo_atual, abertura, custos, camadas):
+    """Aplica o PEPS às movimentações de um produto (já em ordem); devolve o custo total das saídas.
+
+    ``abertura`` são as camadas de saldo inicial do produto: as movimentações anteriores a elas já estão
+    refletidas no saldo e não são refeitas.
+    """
+    abertas = deque([qt_original, custo, None, dt_entrada, qt_original] for dt_entrada, qt_original, custo in abertura)
+    dt_abertura = abertura[0][0] if abertura else None
+    custo_saidas = 0.0
+    for id_mov, tp_movimento, qt_movimento, data_hora, vr_custo_unitario in movimentos:
+        if not qt_movimento or qt_movimento <= 0:
+            continue
+        if dt_abertura and data_hora < dt_abertura:
+            # Anterior ao saldo de abertura: o custo já gravado na saída continua valendo
+            if tp_movimento == "Saida" and vr_custo_unitario is not None:
+                custo_saidas += qt_movimento * vr_custo_unitario
+            continue
+        if tp_movimento == "Entrada":
+            custo = custo_atual if vr_custo_unitario is None else vr_custo_unitario
+            custos.append((id_mov, custo, vr_custo_unitario))
+            abertas.append([qt_movimento, custo, id_mov, data_hora, qt_movimento])
+        elif tp_movimento == "Saida":
+            falta, custo = qt_movimento, 0.0
+            while falta and abertas:
+                camada = abertas[0]
+                consumido = min(camada[0], falta)
+                custo += consumido * camada[1]
+                camada[0] -= consumido
+                falta -= consumido
+                if not camada[0]:
+                    abertas.popleft()
+            # Saída além do saldo das camadas: custo atual do produto, como nos triggers
+            custo += falta * custo_atual
+            custos.append((id_mov, custo / qt_movimento, vr_custo_unitario))
+            custo_saidas += custo
+    camadas.extend(abertas)
+    return custo_saidas
+
+
+def reconstruir_camadas(conn, produtos_por_lote=PRODUTOS_POR_LOTE):
+    """Refaz ``Camadas_Custo``, o custo unitário das movimentações e o custo das saídas a partir do histórico.
+
+    As movimentações são lidas em lotes de produtos, cada produto em ordem de ``(data_hora, id)`` pelo
+    índice ``idx_movimentacoes_produto_data``, e custeadas em memória uma única vez. Tudo roda numa única
+    transação ``BEGIN IMMEDIATE``: os triggers não intercalam movimentações novas durante a reconstrução.
+    Os meses arquivados entram no histórico por conexões próprias (não dá para anexar dentro da transação),
+    e os custos alterados neles são gravados no arquivo de cada mês.
+    """
+    resultado = ResultadoReconstrucao()
+    inicio = time.perf_counter()
+    arquivos = [sqlite3.connect(caminho) for _, caminho in meses_arquivados(conn)]
+    try:
+        _reconstruir(conn, arquivos, produtos_por_lote, resultado)
+    finally:
+        for arquivo in arquivos:
+            arquivo.close()
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+
+def _reconstruir(conn, arquivos, produtos_por_lote, resultado):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        custo_atual = dict(conn.execute("SELECT cd_produto, COALESCE(vr_custo, 0) FROM Produtos"))
+        abertura = {}
+        for cd_produto, dt_entrada, qt_original, custo in conn.execute(
+                '''SELECT produto_id, dt_entrada, qt_original, vr_custo_unitario FROM Camadas_Custo
+                   WHERE movimentacao_id IS NULL ORDER BY produto_id, dt_entrada, id'''):
+            abertura.setdefault(cd_produto, []).append((dt_entrada, qt_original, custo))
+        conn.execute("DELETE FROM Camadas_Custo")
+
+        origens = [conn] + arquivos
+        codigos = sorted({cd for origem in origens for (cd,) in origem.execute("SELECT DISTINCT produto_id FROM Movimentacoes")}
+                         | abertura.keys())
+        for i in range(0, len(codigos), produtos_por_lote):
+            lote = codigos[i:i + produtos_por_lote]
+            movimentos, arquivo_do_id = {}, {}
+            for origem in origens:
+                for linha in origem.execute('''SELECT produto_id, id, tp_movimento, qt_movimento, data_hora, vr_custo_unitario
+                                               FROM Movimentacoes WHERE produto_id BETWEEN ? AND ?
+                                               ORDER BY produto_id, data_hora, id''', (lote[0], lote[-1])):
+                    movimentos.setdefault(linha[0], []).append(linha[1:])
+                    if origem is not conn:
+                        arquivo_do_id[linha[1]] = origem
+                    resultado.movimentacoes += 1
+            if arquivos:
+                # Cada origem já vem em ordem; juntas, precisam ser reordenadas por (data_hora, id)
+                for lista in movimentos.values():
+                    lista.sort(key=lambda movimento: (movimento[3], movimento[0]))
+
+            custos, camadas, custo_saidas = [], [], []
+            for cd_produto in lote:
+                camadas_produto = []
+                total = _custear_produto(movimentos.get(cd_produto, ()), custo_atual.get(cd_produto, 0.0),
+                                         abertura.get(cd_produto, []), custos, camadas_produto)
+                # Produtos excluídos mantêm o custo das saídas, mas não têm mais camadas
+                if cd_produto in custo_atual:
+                    camadas.extend((cd_produto, *camada) for camada in camadas_produto)
+                custo_saidas.append((total, cd_produto))
+            resultado.produtos += len(lote)
+
+            alterados = [(custo, id_mov) for id_mov, custo, anterior in custos
+                         if anterior is None or abs(custo - anterior) > TOLERANCIA_CUSTO]
+            por_origem = {}
+            for custo, id_mov in alterados:
+                por_origem.setdefault(arquivo_do_id.get(id_mov, conn), []).append((custo, id_mov))
+            for origem, lista in por_origem.items():
+                origem.executemany("UPDATE Movimentacoes SET vr_custo_unitario = ? WHERE id = ?", lista)
+            conn.executemany('''INSERT INTO Camadas_Custo (produto_id, qt_restante, vr_custo_unitario, movimentacao_id,
+                                                           dt_entrada, qt_original)
+                                VALUES (?, ?, ?, ?, ?, ?)''', camadas)
+            conn.executemany("UPDATE Resumo_Saidas_Produto SET vr_custo_total = ? WHERE produto_id = ?", custo_saidas)
+            resultado.custos_alterados += len(alterados)
+            resultado.camadas += len(camadas)
+        # Camadas e CMV refeitos: as leituras de valoração em cache saem junto, na mesma transação
+        conn.execute("UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'estoque_custo'")
+        for arquivo in arquivos:
+            arquivo.commit()
+        conn.commit()
+    except BaseException:
+        for arquivo in arquivos:
+            arquivo.rollback()
+        conn.rollback()
+        raise
+
+
+# Valoração do estoque pelas camadas abertas e custo das mercadorias vendidas (CMV) acumulado por produto
+CONSULTA_VALORACAO_PEPS = '''SELECT p.cd_produto AS 'Código', p.nm_produto AS 'Produto', p.vr_estoque_atual AS 'Estoque',
+                                    COALESCE(c.qt_camadas, 0) AS 'Qtd em Camadas',
+                                    ROUND(COALESCE(c.vr_estoque, 0), 2) AS 'Custo total PEPS (R$)',
+                                    ROUND(COALESCE(c.vr_estoque / NULLIF(c.qt_camadas, 0), 0), 2) AS 'Custo Médio (R$)',
+                                    ROUND(COALESCE(r.vr_custo_total, 0), 2) AS 'CMV (R$)'
+                             FROM Produtos p
+                             LEFT JOIN (SELECT produto_id, SUM(qt_restante) AS qt_camadas,
+                                               SUM(qt_restante * vr_custo_unitario) AS vr_estoque
+                                        FROM Camadas_Custo GROUP BY produto_id) c ON c.produto_id = p.cd_produto
+                             LEFT JOIN Resumo_Saidas_Produto r ON r.produto_id = p.cd_produto
+                             ORDER BY p.cd_produto'''
+
+
+def valor_estoque_peps(conn):
+    """Valor total do estoque pelas camadas PEPS abertas."""
+    return conn.execute("SELECT COALESCE(SUM(qt_restante * vr_custo_unitario), 0) FROM Camadas_Custo").fetchone()[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstrói as camadas de custo PEPS a partir das movimentações.")
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--produtos-por-lote", type=int, default=PRODUTOS_POR_LOTE)
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        resultado = reconstruir_camadas(conn, args.produtos_por_lote)
+        print(f"{resultado.movimentacoes} movimentações de {resultado.produtos} produtos em {resultado.segundos:.2f}s "
+              f"({resultado.movimentacoes_por_segundo:,.0f}/s); {resultado.camadas} camadas abertas, "
+              f"{resultado.custos_alterados} custos atualizados")
+        print(f"Valor do estoque (PEPS): R$ {valor_estoque_peps(conn):,.2f}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import math
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sistema_de_Inventario.curva_abc import classes_por_produto
+from sistema_de_Inventario.db import CAMINHO_DB
+from sistema_de_Inventario.estoque import _com_retentativa
+
+
+ALFA = 0.2                    # suavização exponencial (nível, tamanho e intervalo da demanda)
+SEMANAS_HISTORICO = 52
+PRAZO_ENTREGA_SEMANAS = 2
+SEMANAS_COBERTURA = 4         # quantidade sugerida cobre esse número de semanas de demanda
+LIMITE_INTERMITENTE = 1.32    # intervalo médio entre demandas (ADI) a partir do qual usa Croston
+PRODUTOS_POR_FAIXA = 2_000
+
+# Fator z do estoque de segurança por classe ABC (nível de serviço ~98%, ~95% e ~90%)
+Z_POR_CLASSE = {"A": 2.05, "B": 1.65, "C": 1.28}
+Z_PADRAO = 1.65
+
+
+def carregar_serie_semanal(conn, semanas=SEMANAS_HISTORICO, hoje=None, faixa=None):
+    """Monta a matriz (produtos × semanas) de saídas, a semana mais recente na última coluna.
+
+    Lê os totais diários de Resumo_Movimentos_Diarios (mantidos por trigger a partir de Movimentacoes) já
+    somados por semana no SQLite. ``faixa`` limita a leitura a um intervalo ``(cd_inicio, cd_fim)`` de produtos.
+    Devolve ``(produtos, matriz)``.
+    """
+    hoje = str(hoje or datetime.now().date())
+    condicao, parametros = "", []
+    if faixa is not None:
+        condicao = "AND cd_produto BETWEEN ? AND ?"
+        parametros = list(faixa)
+    produtos = np.array([cd for (cd,) in conn.execute(f"SELECT cd_produto FROM Produtos WHERE 1 = 1 {condicao} ORDER BY cd_produto",
+                                                       parametros)], dtype=np.int64)
+    linhas = conn.execute(f'''SELECT produto_id, ? - CAST(julianday(?) - julianday(dt_dia) AS INTEGER) / 7 AS semana,
+                                       SUM(qt_total)
+                                FROM Resumo_Movimentos_Diarios
+                                WHERE tp_movimento = 'Saida' AND dt_dia BETWEEN DATE(?, ?) AND ?
+                                      {condicao.replace("cd_produto", "produto_id")}
+                                GROUP BY produto_id, semana''',
+                          [semanas - 1, hoje, hoje, f"-{semanas * 7 - 1} days", hoje] + parametros).fetchall()
+    matriz = np.zeros((len(produtos), semanas))
+    if not linhas or not len(produtos):
+        return produtos, matriz
+
+    ids, colunas, quantidades = (np.array(valores) for valores in zip(*linhas))
+    posicoes = np.minimum(np.searchsorted(produtos, ids), len(produtos) - 1)
+    cadastrado = produtos[posicoes] == ids
+    np.add.at(matriz, (posicoes[cadastrado], colunas[cadastrado].astype(np.int64)), quantidades[cadastrado])
+    return produtos, matriz
+
+
+def prever_demanda(matriz, alfa=ALFA):
+    """Previsão de demanda por período para todas as linhas da matriz de uma vez.
+
+    Séries regulares usam suavização exponencial simples; séries intermitentes (ADI >= 1.32) usam
+    Croston com a correção de Syntetos-Boylan. O desvio é estimado como 1,25 × o erro absoluto médio
+    das previsões um passo à frente. Devolve ``(demanda, desvio, intermitente)``.
+    """
+    n_linhas, n_periodos = matriz.shape
+    positivos = matriz > 0
+    n_demandas = positivos.sum(axis=1)
+    com_demanda = n_demandas > 0
+    adi = np.where(com_demanda, n_periodos / np.maximum(n_demandas, 1), np.inf)
+    intermitente = com_demanda & (adi >= LIMITE_INTERMITENTE)
+
+    # Estado inicial: nível na média do histórico; Croston com o tamanho médio e o intervalo médio
+    nivel = matriz.mean(axis=1)
+    tamanho = np.where(com_demanda, matriz.sum(axis=1) / np.maximum(n_demandas, 1), 0.0)
+    intervalo_medio = np.where(com_demanda, adi, 1.0)
+    desde_ultima = np.zeros(n_linhas)
+    erro_absoluto = np.zeros(n_linhas)
+
+    for periodo in range(n_periodos):
+        demanda = matriz[:, periodo]
+        previsto = np.where(intermitente, tamanho / intervalo_medio, nivel)
+        erro_absoluto += np.abs(demanda - previsto)
+
+        nivel = alfa * demanda + (1 - alfa) * nivel
+        desde_ultima += 1
+        houve = demanda > 0
+        tamanho = np.where(houve, alfa * demanda + (1 - alfa) * tamanho, tamanho)
+        intervalo_medio = np.where(houve, alfa * desde_ultima + (1 - alfa) * intervalo_medio, intervalo_medio)
+        desde_ultima = np.where(houve, 0, desde_ultima)
+
+    croston = (1 - alfa / 2) * tamanho / intervalo_medio
+    demanda = np.where(intermitente, croston, nivel)
+    desvio = 1.25 * erro_absoluto / max(n_periodos, 1)
+    return demanda, desvio, intermitente
+
+
+def _prever_faixa(conn, faixa, semanas, alfa):
+    produtos, matriz = carregar_serie_semanal(conn, semanas, faixa=faixa)
+    return (produtos, *prever_demanda(matriz, alfa))
+
+
+def _prever_faixa_em_processo(caminho, faixa, semanas, alfa):
+    # Cada processo do pool abre a sua própria conexão, somente leitura; a URI é absoluta e com escape, então
+    # espaços, "?" ou "#" no caminho não quebram o parâmetro mode=ro
+    conn = sqlite3.connect(Path(caminho).resolve().as_uri() + "?mode=ro", uri=True)
+    try:
+        return _prever_faixa(conn, faixa, semanas, alfa)
+    finally:
+        conn.close()
+
+
+def _faixas(conn, tamanho=PRODUTOS_POR_FAIXA):
+    codigos = [cd for (cd,) in conn.execute("SELECT cd_produto FROM Produtos ORDER BY cd_produto")]
+    return [(codigos[i], codigos[min(i + tamanho, len(codigos)) - 1]) for i in range(0, len(codigos), tamanho)]
+
+
+def calcular_sugestoes(conn, processos=1, alfa=ALFA, semanas=SEMANAS_HISTORICO,
+                       prazo_entrega=PRAZO_ENTREGA_SEMANAS, cobertura=SEMANAS_COBERTURA):
+    """Calcula ponto de pedido e quantidade sugerida para todos os produtos.
+
+    O catálogo é lido e previsto em faixas de códigos (consultas estreitas no índice da série); com
+    ``processos > 1`` as faixas são distribuídas num pool de processos.
+    """
+    faixas = _faixas(conn)
+    caminho = conn.execute("PRAGMA database_list").fetchone()[2]
+    if processos > 1 and len(faixas) > 1 and caminho:
+        with ProcessPoolExecutor(processos) as executor:
+            partes = list(executor.map(_prever_faixa_em_processo, repeat(caminho), faixas, repeat(semanas), repeat(alfa)))
+    else:
+        partes = [_prever_faixa(conn, faixa, semanas, alfa) for faixa in faixas]
+    if not partes:
+        return pd.DataFrame(columns=["cd_produto", "tp_metodo", "vr_demanda_semanal", "vr_desvio_semanal",
+                                     "qt_ponto_pedido", "qt_pedido_sugerido"])
+    produtos, demanda, desvio, intermitente = (np.concatenate(valores) for valores in zip(*partes))
+
+    classes = classes_por_produto(conn, "estoque")
+    z = np.array([Z_POR_CLASSE.get(classes.get(int(cd)), Z_PADRAO) for cd in produtos])
+    ponto_pedido = np.ceil(demanda * prazo_entrega + z * desvio * math.sqrt(prazo_entrega))
+    pedido = np.where(demanda > 0, np.maximum(np.ceil(demanda * cobertura), 1), 0)
+    return pd.DataFrame({
+        "cd_produto": produtos,
+        "tp_metodo": np.where(intermitente, "Croston", "Suavização exponencial"),
+        "vr_demanda_semanal": demanda,
+        "vr_desvio_semanal": desvio,
+        "qt_ponto_pedido": ponto_pedido.astype(int),
+        "qt_pedido_sugerido": pedido.astype(int),
+    })
+
+
+def gravar_sugestoes(conn, df):
+    agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM Sugestoes_Reposicao")
+        conn.executemany('''INSERT INTO Sugestoes_Reposicao (cd_produto, tp_metodo, vr_demanda_semanal, vr_desvio_semanal,
+                                                             qt_ponto_pedido, qt_pedido_sugerido, dt_calculo)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                         ((int(cd), metodo, float(demanda), float(desvio), int(ponto), int(pedido), agora)
+                          for cd, metodo, demanda, desvio, ponto, pedido in df.itertuples(index=False, name=None)))
+        # Invalida só as leituras das sugestões no cache de consultas (lidas com chaves=("sugestoes",))
+        conn.execute("UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'sugestoes'")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def atualizar_sugestoes(conn, processos=1, **parametros):
+    """Recalcula e grava as sugestões; devolve ``(quantidade de produtos, segundos)``."""
+    inicio = time.perf_counter()
+    df = calcular_sugestoes(conn, processos, **parametros)
+    gravar_sugestoes(conn, df)
+    return len(df), time.perf_counter() - inicio
+
+
+def aplicar_como_estoque_minimo(conn):
+    """Copia o ponto de pedido sugerido para ``Produtos.vr_estoque_minimo``; devolve os produtos alterados.
+
+    Produtos sem saídas no histórico mantêm o estoque mínimo digitado. Como os outros escritores de Produtos,
+    roda sob ``BEGIN IMMEDIATE`` e repete a transação enquanto o banco estiver ocupado.
+    """
+    def operacao():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            alterados = conn.execute('''UPDATE Produtos SET vr_estoque_minimo = s.qt_ponto_pedido
+                                        FROM Sugestoes_Reposicao s
+                                        WHERE Produtos.cd_produto = s.cd_produto AND s.vr_demanda_semanal > 0
+                                          AND Produtos.vr_estoque_minimo IS NOT s.qt_ponto_pedido''').rowcount
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return alterados
+
+    return _com_retentativa(operacao)
+
+
+# Produtos que já atingiram o ponto de pedido, os mais abaixo primeiro
+CONSULTA_REPOSICAO = '''SELECT p.cd_produto AS 'Código', p.nm_produto AS 'Produto', p.vr_estoque_atual AS 'Estoque',
+                               p.vr_estoque_minimo AS 'Estoque Mínimo', s.qt_ponto_pedido AS 'Ponto de Pedido',
+                               s.qt_pedido_sugerido AS 'Pedido Sugerido', ROUND(s.vr_demanda_semanal, 2) AS 'Demanda Semanal',
+                               s.tp_metodo AS 'Método'
+                        FROM Sugestoes_Reposicao s
+                        JOIN Produtos p ON p.cd_produto = s.cd_produto
+                        WHERE s.qt_pedido_sugerido > 0 AND COALESCE(p.vr_estoque_atual, 0) <= s.qt_ponto_pedido
+                        ORDER BY s.qt_ponto_pedido - COALESCE(p.vr_estoque_atual, 0) DESC'''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Previsão de demanda e sugestões de reposição.")
+    parser.add_argument("--db", default=str(CAMINHO_DB), help="caminho do banco SQLite")
+    parser.add_argument("--processos", type=int, default=1, help="processos para catálogos grandes")
+    parser.add_argument("--aplicar", action="store_true", help="grava o ponto de pedido como estoque mínimo")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        total, segundos = atualizar_sugestoes(conn, args.processos)
+        print(f"{total} produtos previstos em {segundos:.2f}s ({total / segundos if segundos else 0:,.0f} SKUs/s)")
+        if args.aplicar:
+            print(f"Estoque mínimo atualizado em {aplicar_como_estoque_minimo(conn)} produtos.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import pandas as pd
+
+
+# Relatórios das páginas Consultar e Movimentações. Cada página faz uma consulta só: Produtos vem com as
+# marcações (abaixo do mínimo, excesso) e Movimentacoes com os totais por produto de todos os relatórios;
+# os recortes saem dessa leitura com pandas, em vez de uma varredura por relatório.
+
+COLUNAS_PRODUTO = ["Código", "Produto", "Descrição", "Categoria", "Custo", "Valor de Venda", "Estoque", "Estoque Mínimo"]
+
+CONSULTA_PRODUTOS = '''SELECT cd_produto AS 'Código', nm_produto AS 'Produto', ds_produto AS 'Descrição',
+                              categoria_id AS 'Categoria', vr_custo AS 'Custo', vr_venda AS 'Valor de Venda',
+                              vr_estoque_atual AS 'Estoque', vr_estoque_minimo AS 'Estoque Mínimo',
+                              vr_estoque_atual < vr_estoque_minimo AS fl_abaixo_minimo,
+                              vr_estoque_atual > vr_estoque_minimo * 3 AS fl_excesso
+                       FROM Produtos'''
+
+CONSULTA_CATEGORIAS = "SELECT cd_categoria, nm_categoria FROM Categorias"
+
+# Uma passada em Movimentacoes pelo índice de cobertura (produto_id, tp_movimento, ..., qt_movimento), agrupada
+# por produto e tipo, dá o giro; as perdas vêm só das linhas 'Perda', pelo índice de motivo. A valoração
+# (estoque pelo histórico) não relê tudo: vem do snapshot do ledger (ver conciliacao.py). Os meses arquivados
+# entram pelos totais gravados em Resumo_Arquivado_Produto no arquivamento, sem abrir os arquivos.
+# Perdas sem custo na movimentação são custeadas pelo custo atual do produto (como no relatório original).
+CONSULTA_MOVIMENTOS_POR_PRODUTO = '''SELECT p.cd_produto, p.nm_produto, p.vr_custo,
+                                            COALESCE(t.qt_mov_saida, 0) + COALESCE(a.qt_mov_saida, 0) AS qt_mov_saida,
+                                            COALESCE(t.qt_saida, 0) + COALESCE(a.qt_saida, 0) AS qt_saida,
+                                            COALESCE(d.qt_mov_perda, 0) + COALESCE(a.qt_mov_perda, 0) AS qt_mov_perda,
+                                            COALESCE(d.qt_perda, 0) + COALESCE(a.qt_perda, 0) AS qt_perda,
+                                            COALESCE(d.vr_perda_custeada, 0) + COALESCE(a.vr_perda_custeada, 0)
+                                            + (COALESCE(d.qt_perda_sem_custo, 0) + COALESCE(a.qt_perda_sem_custo, 0)) * p.vr_custo AS vr_perda
+                                     FROM Produtos p
+                                     LEFT JOIN (SELECT produto_id,
+                                                       SUM(CASE WHEN tp_movimento = 'Saida' THEN qt_movimentos ELSE 0 END) AS qt_mov_saida,
+                                                       SUM(CASE WHEN tp_movimento = 'Saida' THEN qt_total ELSE 0 END) AS qt_saida
+                                                FROM (SELECT produto_id, tp_movimento, COUNT(*) AS qt_movimentos, SUM(qt_movimento) AS qt_total
+                                                      FROM Movimentacoes GROUP BY produto_id, tp_movimento)
+                                                GROUP BY produto_id) t ON t.produto_id = p.cd_produto
+                                     LEFT JOIN (SELECT produto_id, COUNT(*) AS qt_mov_perda, SUM(qt_movimento) AS qt_perda,
+                                                       TOTAL(qt_movimento * vr_custo_unitario) AS vr_perda_custeada,
+                                                       SUM(CASE WHEN vr_custo_unitario IS NULL THEN qt_movimento ELSE 0 END) AS qt_perda_sem_custo
+                                                FROM Movimentacoes WHERE nm_motivo = 'Perda' GROUP BY produto_id) d ON d.produto_id = p.cd_produto
+                                     LEFT JOIN Resumo_Arquivado_Produto a ON a.produto_id = p.cd_produto
+                                     ORDER BY p.cd_produto'''
+
+
+def relatorios_produtos(df_produtos, df_categorias):
+    """Tabela de produtos, abaixo do mínimo, excesso de estoque e produtos por categoria, da mesma leitura."""
+    abaixo_minimo = df_produtos["fl_abaixo_minimo"] == 1
+    excesso = df_produtos["fl_excesso"] == 1
+    produtos = df_produtos[COLUNAS_PRODUTO]
+    contagem = produtos["Categoria"].value_counts()
+    por_categoria = pd.DataFrame({
+        "Categoria": df_categorias["nm_categoria"],
+        "Quantidade de Produtos": df_categorias["cd_categoria"].map(contagem).fillna(0).astype(int),
+    }).sort_values("Categoria").reset_index(drop=True)
+    return {
+        "produtos": produtos,
+        "abaixo_minimo": produtos[abaixo_minimo].reset_index(drop=True),
+        "excesso": produtos[excesso].reset_index(drop=True),
+        "por_categoria": por_categoria,
+    }
+
+
+def relatorios_movimentacoes(df):
+    """Giro de estoque e histórico de perdas, a partir de ``CONSULTA_MOVIMENTOS_POR_PRODUTO``."""
+    giro = (df[df["qt_mov_saida"] > 0]
+            .sort_values("qt_saida", ascending=False, kind="stable")
+            [["nm_produto", "qt_mov_saida", "qt_saida"]]
+            .set_axis(["Produto", "Qtd Movimentos de Venda", "Total de Itens Saidos"], axis=1)
+            .reset_index(drop=True))
+    # Custo unitário efetivo (o PEPS gravado em cada perda, não o custo atual do produto), coerente com o prejuízo
+    perdas = df[df["qt_mov_perda"] > 0]
+    perdas = (perdas.assign(vr_custo_efetivo=perdas["vr_perda"] / perdas["qt_perda"].where(perdas["qt_perda"] != 0))
+              [["nm_produto", "qt_perda", "vr_custo_efetivo", "vr_perda"]]
+              .set_axis(["Produto", "Qtd Perdida", "Custo Unitário", "Prejuizo Total"], axis=1)
+              .reset_index(drop=True))
+    return {"giro": giro, "perdas": perdas}
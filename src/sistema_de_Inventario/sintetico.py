@@ -0,0 +1,221 @@
+import argparse
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+from sistema_de_Inventario.peps import reconstruir_camadas
+
+
+SEMENTE = 42
+DIAS_HISTORICO = 730
+TAMANHO_LOTE = 100_000
+INFLACAO_ANUAL = 0.06
+HORA_ABERTURA, HORAS_EXPEDIENTE = 8, 10
+
+# (motivo, tipo, participação nas movimentações, quantidade mínima, quantidade máxima)
+# As compras repõem um pouco menos do que sai: o saldo de abertura de cada produto cobre a maior queda do histórico.
+PERFIL_MOVIMENTOS = [
+    ("Venda", "Saida", 0.71, 1, 6),
+    ("Compra", "Entrada", 0.09, 10, 40),
+    ("Devolução", "Entrada", 0.07, 1, 3),
+    ("Perda", "Saida", 0.04, 1, 4),
+    ("Ajuste", "Entrada", 0.045, 1, 5),
+    ("Ajuste", "Saida", 0.045, 1, 5),
+]
+
+PECAS_POR_CATEGORIA = {
+    1: ["Pistão", "Junta do Cabeçote", "Bomba d'Água", "Correia Dentada", "Vela de Ignição", "Filtro de Óleo"],
+    2: ["Amortecedor", "Mola Helicoidal", "Bandeja", "Pivô", "Bucha da Barra", "Terminal de Direção"],
+    3: ["Pastilha de Freio", "Disco de Freio", "Tambor de Freio", "Cilindro Mestre", "Fluido de Freio", "Sapata"],
+    4: ["Bateria", "Alternador", "Motor de Partida", "Lâmpada", "Relé", "Sensor de Rotação"],
+    5: ["Tapete", "Calota", "Palheta", "Capa de Banco", "Antena", "Engate"],
+}
+MARCAS = ["Bosch", "Cofap", "Fras-le", "Mahle", "Nakata", "Monroe", "NGK", "Valeo", "Moura", "Sabó"]
+
+
+@dataclass
+class ResultadoGeracao:
+    produtos: int = 0
+    movimentacoes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def movimentacoes_por_segundo(self):
+        return self.movimentacoes / self.segundos if self.segundos else 0.0
+
+
+def gerar_produtos(n_produtos, semente=SEMENTE):
+    """Catálogo sintético: custos log-normais, margens de 30% a 120% e popularidade de cauda longa (curva ABC)."""
+    rng = np.random.default_rng([semente, 0])
+    codigos = np.arange(1, n_produtos + 1)
+    categorias = rng.integers(1, len(CATEGORIAS_PADRAO) + 1, n_produtos)
+    pecas = [PECAS_POR_CATEGORIA[c][i] for c, i in zip(categorias.tolist(), rng.integers(0, 6, n_produtos).tolist())]
+    marcas = rng.choice(MARCAS, n_produtos)
+    custos = np.clip(np.exp(rng.normal(np.log(60), 0.9, n_produtos)), 2, 5_000).round(2)
+    popularidade = rng.lognormal(0, 1.2, n_produtos)
+    return pd.DataFrame({
+        "cd_produto": codigos,
+        "nm_produto": [f"{peca} {marca} {cd:06d}" for peca, marca, cd in zip(pecas, marcas.tolist(), codigos.tolist())],
+        "ds_produto": [f"{peca} linha {marca}" for peca, marca in zip(pecas, marcas.tolist())],
+        "categoria_id": categorias,
+        "vr_custo": custos,
+        "vr_venda": (custos * rng.uniform(1.3, 2.2, n_produtos)).round(2),
+        "popularidade": popularidade / popularidade.sum(),
+    })
+
+
+def gerar_movimentacoes(produtos, n_movimentacoes, inicio, dias=DIAS_HISTORICO, semente=SEMENTE, tamanho_lote=TAMANHO_LOTE):
+    """Movimentações sintéticas em ordem de data, em lotes (DataFrames), no horário de expediente.
+
+    O mesmo ``semente`` gera sempre os mesmos lotes. Os produtos são sorteados pela popularidade e o custo das
+    entradas acompanha a inflação ao longo do histórico.
+    """
+    rng = np.random.default_rng([semente, 1])
+    motivos = np.array([motivo for motivo, *_ in PERFIL_MOVIMENTOS])
+    tipos = np.array([tipo for _, tipo, *_ in PERFIL_MOVIMENTOS])
+    pesos = np.array([peso for _, _, peso, *_ in PERFIL_MOVIMENTOS])
+    minimos = np.array([minimo for *_, minimo, _ in PERFIL_MOVIMENTOS])
+    maximos = np.array([maximo for *_, maximo in PERFIL_MOVIMENTOS])
+    custos = produtos["vr_custo"].to_numpy()
+    acumulada = np.cumsum(produtos["popularidade"].to_numpy())
+    segundos_expediente = HORAS_EXPEDIENTE * 3600
+    total_segundos = dias * segundos_expediente
+
+    for primeira in range(0, n_movimentacoes, tamanho_lote):
+        n = min(tamanho_lote, n_movimentacoes - primeira)
+        # Cada lote cobre a sua fatia do histórico, então os lotes já saem em ordem de data
+        de, ate = total_segundos * primeira // n_movimentacoes, total_segundos * (primeira + n) // n_movimentacoes
+        instantes = np.sort(rng.integers(de, max(ate, de + 1), n))
+        indices = np.minimum(np.searchsorted(acumulada, rng.random(n) * acumulada[-1]), len(custos) - 1)
+        perfil = rng.choice(len(PERFIL_MOVIMENTOS), n, p=pesos)
+        quantidades = rng.integers(minimos[perfil], maximos[perfil] + 1)
+        entrada = tipos[perfil] == "Entrada"
+        fracao = instantes / total_segundos
+        custo = custos[indices] * (1 + INFLACAO_ANUAL * fracao * dias / 365) * rng.uniform(0.95, 1.05, n)
+        data_hora = (pd.Timestamp(inicio) + pd.to_timedelta(instantes // segundos_expediente, unit="D")
+                     + pd.to_timedelta(HORA_ABERTURA * 3600 + instantes % segundos_expediente, unit="s"))
+        yield pd.DataFrame({
+            "produto_id": produtos["cd_produto"].to_numpy()[indices],
+            "tp_movimento": tipos[perfil],
+            "qt_movimento": quantidades,
+            "data_hora": data_hora.strftime("%Y-%m-%d %H:%M:%S"),
+            "nm_motivo": motivos[perfil],
+            "vr_custo_unitario": np.where(entrada, custo.round(2), np.nan),
+        })
+
+
+def _saldos_de_abertura(produtos, lotes):
+    """Saldo inicial de cada produto que evita estoque negativo em qualquer ponto do histórico, e o saldo final."""
+    n = len(produtos)
+    saldo = np.zeros(n + 1, dtype=np.int64)
+    menor = np.zeros(n + 1, dtype=np.int64)
+    for lote in lotes:
+        codigos = lote["produto_id"].to_numpy()
+        delta = np.where(lote["tp_movimento"].to_numpy() == "Entrada", 1, -1) * lote["qt_movimento"].to_numpy()
+        corrente = pd.Series(delta).groupby(codigos).cumsum().to_numpy() + saldo[codigos]
+        np.minimum.at(menor, codigos, corrente)
+        np.add.at(saldo, codigos, delta)
+    abertura = np.maximum(-menor, 0) + 5
+    return abertura[1:], (abertura + saldo)[1:]
+
+
+def gerar_banco(caminho, n_produtos, n_movimentacoes, semente=SEMENTE, dias=DIAS_HISTORICO, fim=None,
+                tamanho_lote=TAMANHO_LOTE):
+    """Cria um banco novo em ``caminho`` com o catálogo e o histórico sintéticos, já com schema, resumos e camadas PEPS.
+
+    As movimentações entram com os triggers de resumo e de versão ligados; os triggers PEPS ficam desligados durante
+    a carga e as camadas são calculadas no fim por ``reconstruir_camadas`` (bem mais rápido que movimentação a
+    movimentação). Cada produto começa com uma entrada "Cadastro" que cobre as saídas do histórico.
+    """
+    resultado = ResultadoGeracao()
+    inicio_carga = time.perf_counter()
+    fim = fim or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    inicio = fim - timedelta(days=dias)
+    produtos = gerar_produtos(n_produtos, semente)
+    abertura, final = _saldos_de_abertura(produtos, gerar_movimentacoes(produtos, n_movimentacoes, inicio, dias, semente,
+                                                                        tamanho_lote))
+    semanas = dias / 7
+    saidas_semanais = produtos["popularidade"].to_numpy() * n_movimentacoes * 0.8 * 3.5 / semanas
+
+    conn = sqlite3.connect(caminho)
+    try:
+        for pragma, valor in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        aplicar_migracoes(conn)
+        conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+        conn.executemany('''INSERT INTO Produtos (cd_produto, nm_produto, ds_produto, categoria_id, vr_custo, vr_venda,
+                                                  vr_estoque_atual, vr_estoque_minimo) VALUES (?, ?, ?, ?, ?, ?, 0, ?)''',
+                         zip(produtos["cd_produto"].tolist(), produtos["nm_produto"], produtos["ds_produto"],
+                             produtos["categoria_id"].tolist(), produtos["vr_custo"].tolist(), produtos["vr_venda"].tolist(),
+                             np.ceil(2 * saidas_semanais).astype(int).tolist()))
+        triggers_peps = dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_movimentacoes_peps_%'"))
+        try:
+            for nome in triggers_peps:
+                conn.execute(f"DROP TRIGGER {nome}")
+            conn.executemany('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                                VALUES (?, 'Entrada', ?, ?, 'Cadastro', ?)''',
+                             zip(produtos["cd_produto"].tolist(), abertura.tolist(), [inicio.strftime("%Y-%m-%d %H:%M:%S")] * n_produtos,
+                                 produtos["vr_custo"].tolist()))
+            conn.commit()
+
+            for lote in gerar_movimentacoes(produtos, n_movimentacoes, inicio, dias, semente, tamanho_lote):
+                custos = lote["vr_custo_unitario"].astype(object).where(lote["vr_custo_unitario"].notna(), None)
+                conn.executemany('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                                    VALUES (?, ?, ?, ?, ?, ?)''',
+                                 zip(lote["produto_id"].tolist(), lote["tp_movimento"].tolist(), lote["qt_movimento"].tolist(),
+                                     lote["data_hora"].tolist(), lote["nm_motivo"].tolist(), custos.tolist()))
+                conn.commit()
+
+            # Saldo final e custo atual (com a inflação do período) no cadastro
+            conn.executemany("UPDATE Produtos SET vr_estoque_atual = ?, vr_custo = ROUND(vr_custo * ?, 2) WHERE cd_produto = ?",
+                             zip(final.tolist(), [1 + INFLACAO_ANUAL * dias / 365] * n_produtos, produtos["cd_produto"].tolist()))
+            conn.commit()
+            reconstruir_camadas(conn)
+        finally:
+            # Os triggers PEPS voltam mesmo quando a carga falha no meio
+            if conn.in_transaction:
+                conn.rollback()
+            existentes = {nome for (nome,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+            for nome, sql in triggers_peps.items():
+                if nome not in existentes:
+                    conn.execute(sql)
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    resultado.produtos = n_produtos
+    resultado.movimentacoes = n_movimentacoes + n_produtos
+    resultado.segundos = time.perf_counter() - inicio_carga
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera um banco de inventário sintético e reprodutível (mesma semente, mesmo banco).")
+    parser.add_argument("--db", required=True, type=Path, help="caminho do banco novo")
+    parser.add_argument("--produtos", type=int, default=10_000)
+    parser.add_argument("--movimentacoes", type=int, default=500_000)
+    parser.add_argument("--dias", type=int, default=DIAS_HISTORICO, help="dias de histórico até hoje")
+    parser.add_argument("--semente", type=int, default=SEMENTE)
+    parser.add_argument("--substituir", action="store_true", help="apaga o banco se ele já existir")
+    args = parser.parse_args(argv)
+
+    if args.db.exists():
+        if not args.substituir:
+            parser.error(f"{args.db} já existe (use --substituir para apagar)")
+        for sufixo in ("", "-wal", "-shm"):
+            Path(f"{args.db}{sufixo}").unlink(missing_ok=True)
+    resultado = gerar_banco(args.db, args.produtos, args.movimentacoes, args.semente, args.dias)
+    print(f"{resultado.produtos:,} produtos e {resultado.movimentacoes:,} movimentações em {resultado.segundos:.1f}s "
+          f"({resultado.movimentacoes_por_segundo:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import json
+import math
+import statistics
+import threading
+from collections import deque
+from datetime import datetime
+
+
+AMOSTRAS_POR_PAGINA = 200
+
+
+def percentis(tempos):
+    """Mediana, p95 e p99 de uma lista de tempos (mesma unidade da entrada); p95 e p99 pelo posto mais próximo."""
+    ordenados = sorted(tempos)
+    if not ordenados:
+        return 0.0, 0.0, 0.0
+    def posicao(p):
+        return ordenados[max(0, math.ceil(len(ordenados) * p) - 1)]
+    return statistics.median(ordenados), posicao(0.95), posicao(0.99)
+
+
+class RegistroTempos:
+    """Tempos de execução do app por página: partida a frio, primeira carga de cada página e reruns.
+
+    Com ``arquivo`` informado, cada execução também é acrescentada como uma linha JSON, para acompanhar
+    a latência ao longo do tempo.
+    """
+
+    def __init__(self, arquivo=None, amostras=AMOSTRAS_POR_PAGINA):
+        self.arquivo = arquivo
+        self.amostras = amostras
+        self.partida_a_frio = None
+        self._carga_paginas = {}
+        self._execucoes = {}
+        self._total_execucoes = {}
+        self._trava = threading.Lock()
+
+    def registrar_carga(self, pagina, segundos):
+        """Tempo de importação do módulo da página (só acontece na primeira visita do processo)."""
+        with self._trava:
+            self._carga_paginas[pagina] = segundos
+
+    def registrar(self, pagina, segundos):
+        with self._trava:
+            primeira = self.partida_a_frio is None
+            if primeira:
+                self.partida_a_frio = (pagina, segundos)
+            self._execucoes.setdefault(pagina, deque(maxlen=self.amostras)).append(segundos)
+            # As amostras guardam só as últimas execuções; a contagem é de todas
+            self._total_execucoes[pagina] = self._total_execucoes.get(pagina, 0) + 1
+        if self.arquivo:
+            registro = {"dt_execucao": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "pagina": pagina,
+                        "ms": round(segundos * 1000, 2), "partida_a_frio": primeira}
+            with open(self.arquivo, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def resumo(self):
+        """Uma linha por página: execuções, última, mediana e p95 (ms) e a carga do módulo (ms)."""
+        with self._trava:
+            linhas = []
+            for pagina, tempos in self._execucoes.items():
+                mediana, p95, _ = percentis(tempos)
+                linhas.append({
+                    "pagina": pagina,
+                    "execucoes": self._total_execucoes[pagina],
+                    "ultima_ms": tempos[-1] * 1000,
+                    "mediana_ms": mediana * 1000,
+                    "p95_ms": p95 * 1000,
+                    "carga_ms": self._carga_paginas.get(pagina, 0.0) * 1000,
+                })
+            return linhas
+
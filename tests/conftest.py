@@ -0,0 +1,51 @@
+import sqlite3
+
+import pytest
+
+from sistema_de_Inventario.db import PRAGMAS
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, aplicar_migracoes
+
+
+def conectar(caminho, timeout=30):
+    conn = sqlite3.connect(caminho, timeout=timeout)
+    for pragma, valor in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+    return conn
+
+
+def inserir_produto(conn, cd_produto, vr_estoque_atual=0, vr_custo=10.0, vr_venda=20.0):
+    conn.execute('''INSERT INTO Produtos (cd_produto, nm_produto, categoria_id, vr_custo, vr_venda, vr_estoque_atual,
+                                          vr_estoque_minimo)
+                    VALUES (?, ?, 1, ?, ?, ?, 0)''', (cd_produto, f"Peça {cd_produto}", vr_custo, vr_venda, vr_estoque_atual))
+    conn.commit()
+
+
+def inserir_movimentacao(conn, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo="Venda",
+                         vr_custo_unitario=None):
+    """Movimentação com data escolhida (as de ``estoque.movimentar_estoque`` são sempre de agora), com o estoque
+    do produto ajustado junto, como faz a importação."""
+    delta = qt_movimento if tp_movimento == "Entrada" else -qt_movimento
+    conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario)
+                    VALUES (?, ?, ?, ?, ?, ?)''', (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo, vr_custo_unitario))
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = COALESCE(vr_estoque_atual, 0) + ? WHERE cd_produto = ?",
+                 (delta, produto_id))
+    conn.commit()
+
+
+@pytest.fixture
+def caminho_db(tmp_path):
+    """Banco novo em arquivo (WAL precisa de arquivo), com todas as migrações e as categorias padrão."""
+    caminho = tmp_path / "inventario.db"
+    conn = conectar(caminho)
+    aplicar_migracoes(conn)
+    conn.executemany("INSERT OR IGNORE INTO Categorias (cd_categoria, nm_categoria) VALUES (?, ?)", CATEGORIAS_PADRAO)
+    conn.commit()
+    conn.close()
+    return caminho
+
+
+@pytest.fixture
+def conn(caminho_db):
+    conn = conectar(caminho_db)
+    yield conn
+    conn.close()
@@ -0,0 +1,144 @@
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from sistema_de_Inventario.arquivamento import arquivar_mes, arquivar_movimentacoes, pasta_arquivo
+from sistema_de_Inventario.conciliacao import CONSULTA_VALORACAO_LEDGER
+from sistema_de_Inventario.historico import iterar_movimentacoes
+from sistema_de_Inventario.relatorios import CONSULTA_MOVIMENTOS_POR_PRODUTO
+
+from .conftest import inserir_movimentacao, inserir_produto
+
+
+AGORA = "2023-12-15 08:00:00"
+# Com 180 dias de retenção a partir de 15/12/2023, o corte é 01/06/2023: janeiro a maio vão para os arquivos
+HOJE, RETENCAO_DIAS = date(2023, 12, 15), 180
+MESES_ARQUIVADOS = ["2023-01", "2023-02", "2023-03", "2023-04", "2023-05"]
+
+
+def _historico(conn):
+    # Três produtos, seis meses, movimentos com a mesma data_hora e uma perda sem custo (histórico anterior ao PEPS)
+    for cd_produto in (1, 2, 3):
+        inserir_produto(conn, cd_produto, vr_custo=10.0 * cd_produto)
+    for mes in range(1, 7):
+        for cd_produto in (1, 2, 3):
+            inserir_movimentacao(conn, cd_produto, "Entrada", 20, f"2023-{mes:02d}-03 09:00:00", "Compra",
+                                 vr_custo_unitario=10.0 * cd_produto + mes)
+            inserir_movimentacao(conn, cd_produto, "Saida", 3 + cd_produto, f"2023-{mes:02d}-10 14:00:00")
+            inserir_movimentacao(conn, cd_produto, "Saida", 2, f"2023-{mes:02d}-10 14:00:00")
+        inserir_movimentacao(conn, mes % 3 + 1, "Saida", 1, f"2023-{mes:02d}-21 17:30:00", "Perda")
+    conn.execute("UPDATE Movimentacoes SET vr_custo_unitario = NULL WHERE id = (SELECT MIN(id) FROM Movimentacoes "
+                 "WHERE nm_motivo = 'Perda')")
+    conn.commit()
+
+
+def _paginas(conn, **filtros):
+    paginas = list(iterar_movimentacoes(conn, limite=4, **filtros))
+    return pd.concat(paginas, ignore_index=True) if paginas else pd.DataFrame()
+
+
+FILTROS = [
+    {},
+    {"produto_id": 2},
+    {"tp_movimento": "Saida"},
+    {"dt_inicio": date(2023, 4, 5), "dt_fim": date(2023, 6, 3), "produto_id": 1},
+]
+
+
+def _arquivo(conn, mes):
+    return sqlite3.connect(pasta_arquivo(conn) / f"movimentacoes_{mes}.db")
+
+
+def test_historico_e_relatorios_iguais_antes_e_depois(conn):
+    _historico(conn)
+    paginas = [_paginas(conn, **filtros) for filtros in FILTROS]
+    movimentos = pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn)
+    valoracao = pd.read_sql_query(CONSULTA_VALORACAO_LEDGER, conn)
+
+    resultado = arquivar_movimentacoes(conn, RETENCAO_DIAS, hoje=HOJE)
+
+    assert resultado.meses == len(MESES_ARQUIVADOS)
+    assert conn.execute("SELECT MIN(data_hora) FROM Movimentacoes").fetchone()[0] >= "2023-06-01"
+    for filtros, esperado in zip(FILTROS, paginas):
+        pd.testing.assert_frame_equal(_paginas(conn, **filtros), esperado, obj=str(filtros))
+    pd.testing.assert_frame_equal(pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn), movimentos)
+    pd.testing.assert_frame_equal(pd.read_sql_query(CONSULTA_VALORACAO_LEDGER, conn), valoracao)
+
+
+def test_ledger_e_resumo_consolidados_antes_de_apagar(conn):
+    _historico(conn)
+    saldos = dict(conn.execute('''SELECT produto_id, SUM(CASE tp_movimento WHEN 'Entrada' THEN qt_movimento
+                                                                            ELSE -qt_movimento END)
+                                  FROM Movimentacoes GROUP BY produto_id'''))
+    totais = conn.execute('''SELECT produto_id, SUM(tp_movimento = 'Saida'),
+                                    TOTAL(CASE WHEN tp_movimento = 'Saida' THEN qt_movimento END),
+                                    SUM(nm_motivo = 'Perda'), TOTAL(CASE WHEN nm_motivo = 'Perda' THEN qt_movimento END),
+                                    TOTAL(CASE WHEN nm_motivo = 'Perda' THEN qt_movimento * vr_custo_unitario END),
+                                    TOTAL(CASE WHEN nm_motivo = 'Perda' AND vr_custo_unitario IS NULL THEN qt_movimento END)
+                             FROM Movimentacoes WHERE data_hora < '2023-06-01'
+                             GROUP BY produto_id ORDER BY produto_id''').fetchall()
+
+    arquivar_movimentacoes(conn, RETENCAO_DIAS, hoje=HOJE)
+
+    # O snapshot cobre todo o histórico gravado até o arquivamento, inclusive o que ficou no banco principal
+    assert dict(conn.execute("SELECT produto_id, qt_saldo FROM Saldos_Snapshot")) == saldos
+    assert conn.execute("SELECT * FROM Resumo_Arquivado_Produto ORDER BY produto_id").fetchall() == pytest.approx(totais)
+    assert [mes for (mes,) in conn.execute("SELECT nm_mes FROM Arquivos_Movimentacoes ORDER BY nm_mes")] == MESES_ARQUIVADOS
+
+
+def test_copia_incompleta_nao_apaga_nada(conn):
+    _historico(conn)
+    ids = [id_mov for (id_mov,) in conn.execute("SELECT id FROM Movimentacoes WHERE data_hora LIKE '2023-01-%'")]
+    # Arquivo do mês preparado para descartar uma das linhas na cópia
+    pasta_arquivo(conn).mkdir()
+    with _arquivo(conn, "2023-01") as arquivo:
+        arquivo.execute('''CREATE TABLE Movimentacoes (id INTEGER PRIMARY KEY, produto_id INTEGER, tp_movimento TEXT,
+                                                       qt_movimento INTEGER, data_hora DATETIME, nm_motivo TEXT,
+                                                       vr_custo_unitario REAL)''')
+        arquivo.execute(f'''CREATE TRIGGER descartar BEFORE INSERT ON Movimentacoes WHEN NEW.id = {ids[-1]}
+                            BEGIN SELECT RAISE(IGNORE); END''')
+    arquivo.close()
+
+    with pytest.raises(RuntimeError, match="incompleto"):
+        arquivar_mes(conn, "2023-01", AGORA)
+
+    assert not conn.in_transaction
+    assert [id_mov for (id_mov,) in conn.execute("SELECT id FROM Movimentacoes WHERE data_hora LIKE '2023-01-%'")] == ids
+    assert conn.execute("SELECT COUNT(*) FROM Arquivos_Movimentacoes").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM Resumo_Arquivado_Produto").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM Snapshots_Ledger").fetchone()[0] == 0
+
+
+def test_arquivar_o_mesmo_mes_de_novo_nao_muda_nada(conn):
+    _historico(conn)
+    quantidade = arquivar_mes(conn, "2023-02", AGORA)
+    resumo = conn.execute("SELECT * FROM Resumo_Arquivado_Produto ORDER BY produto_id").fetchall()
+
+    assert quantidade == 10
+    assert arquivar_mes(conn, "2023-02", AGORA) == 0
+
+    assert conn.execute("SELECT * FROM Resumo_Arquivado_Produto ORDER BY produto_id").fetchall() == resumo
+    assert conn.execute("SELECT qt_movimentacoes FROM Arquivos_Movimentacoes WHERE nm_mes = '2023-02'").fetchone()[0] == 10
+    with _arquivo(conn, "2023-02") as arquivo:
+        assert arquivo.execute("SELECT COUNT(*) FROM Movimentacoes").fetchone()[0] == 10
+    arquivo.close()
+
+
+def test_movimentacao_retroativa_em_mes_ja_arquivado(conn):
+    _historico(conn)
+    arquivar_mes(conn, "2023-03", AGORA)
+    perdas = conn.execute("SELECT qt_mov_perda, qt_perda FROM Resumo_Arquivado_Produto WHERE produto_id = 2").fetchone()
+    # Importada depois do arquivamento, com data de março
+    inserir_movimentacao(conn, 2, "Saida", 4, "2023-03-28 11:00:00", "Perda")
+
+    assert arquivar_mes(conn, "2023-03", "2023-12-16 08:00:00") == 1
+
+    assert conn.execute('''SELECT qt_movimentacoes, dt_arquivamento FROM Arquivos_Movimentacoes
+                           WHERE nm_mes = '2023-03' ''').fetchone() == (11, "2023-12-16 08:00:00")
+    assert conn.execute("SELECT qt_mov_perda, qt_perda FROM Resumo_Arquivado_Produto WHERE produto_id = 2").fetchone() == (
+        perdas[0] + 1, perdas[1] + 4)
+    with _arquivo(conn, "2023-03") as arquivo:
+        assert arquivo.execute("SELECT COUNT(*), MAX(data_hora) FROM Movimentacoes").fetchone() == (11, "2023-03-28 11:00:00")
+    arquivo.close()
@@ -0,0 +1,90 @@
+import pytest
+
+from sistema_de_Inventario.busca import buscar_produtos, montar_consulta_fts
+
+from .conftest import inserir_produto
+
+
+def _codigos(conn, texto):
+    return buscar_produtos(conn, texto)["Código"].tolist()
+
+
+def _verificar_indice(conn):
+    # Confere o índice de conteúdo externo contra Produtos (levanta erro se estiver dessincronizado)
+    conn.execute("INSERT INTO Produtos_fts (Produtos_fts, rank) VALUES ('integrity-check', 1)")
+
+
+@pytest.fixture
+def catalogo(conn):
+    for cd_produto, nome, descricao in [(101, "Bomba de Água", "Bomba d'água para motor 1.0"),
+                                        (102, "Radiador de Água", "Radiador com reservatório"),
+                                        (103, "Pastilha de Freio", "Jogo dianteiro, near de cerâmica"),
+                                        (104, "Vela de Ignição", "Eletrodo de irídio")]:
+        inserir_produto(conn, cd_produto)
+        conn.execute("UPDATE Produtos SET nm_produto = ?, ds_produto = ? WHERE cd_produto = ?", (nome, descricao, cd_produto))
+    conn.commit()
+    return conn
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("bomba agua", '"bomba"* "agua"*'),
+    ('bomba" OR "1"="1', '"bomba"* "OR"* "1"* "1"*'),
+    ("agua NEAR/2 bomba", '"agua"* "NEAR"* "2"* "bomba"*'),
+    ("freio* -dianteiro", '"freio"* "dianteiro"*'),
+    ("AND", '"AND"*'),
+    ("(vela) ^ignição:", '"vela"* "ignição"*'),
+])
+def test_operadores_viram_texto(texto, esperado):
+    assert montar_consulta_fts(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [None, "", "   ", "\t\n", '"" * - ^ :'])
+def test_texto_sem_palavras(catalogo, texto):
+    assert montar_consulta_fts(texto) is None
+    resultado = buscar_produtos(catalogo, texto)
+    assert resultado.empty
+    assert list(resultado.columns)[:2] == ["Código", "Produto"]
+
+
+@pytest.mark.parametrize("texto", ['bomba" OR 1=1 --', "NEAR(agua bomba)", "agua AND", "*", "-motor", '"', "OR", "NOT agua"])
+def test_entrada_com_operadores_nao_quebra_a_busca(catalogo, texto):
+    # Nenhuma entrada vira erro de sintaxe do MATCH
+    buscar_produtos(catalogo, texto)
+
+
+def test_busca_por_prefixo_acento_e_codigo(catalogo):
+    assert sorted(_codigos(catalogo, "agua")) == [101, 102]
+    assert _codigos(catalogo, "past") == [103]
+    assert _codigos(catalogo, "ceramica") == [103]
+    assert _codigos(catalogo, "near") == [103]
+    assert _codigos(catalogo, "104") == [104]
+    assert _codigos(catalogo, "bomba motor") == [101]
+
+
+def test_indice_acompanha_insert_update_e_delete(catalogo):
+    inserir_produto(catalogo, 105)
+    catalogo.execute("UPDATE Produtos SET nm_produto = 'Amortecedor Traseiro', ds_produto = 'Par' WHERE cd_produto = 105")
+    catalogo.commit()
+    _verificar_indice(catalogo)
+    assert _codigos(catalogo, "amortecedor") == [105]
+
+    # Renomeado: o nome antigo sai do índice
+    catalogo.execute("UPDATE Produtos SET nm_produto = 'Bomba de Combustível', ds_produto = NULL WHERE cd_produto = 101")
+    catalogo.commit()
+    _verificar_indice(catalogo)
+    assert _codigos(catalogo, "combustivel") == [101]
+    assert _codigos(catalogo, "agua") == [102]
+    assert _codigos(catalogo, "motor") == []
+
+    # Troca de código: o rowid do índice é o cd_produto
+    catalogo.execute("UPDATE Produtos SET cd_produto = 201 WHERE cd_produto = 105")
+    catalogo.commit()
+    _verificar_indice(catalogo)
+    assert _codigos(catalogo, "amortecedor") == [201]
+
+    catalogo.execute("DELETE FROM Produtos WHERE cd_produto IN (102, 201)")
+    catalogo.commit()
+    _verificar_indice(catalogo)
+    assert _codigos(catalogo, "agua") == []
+    assert _codigos(catalogo, "amortecedor") == []
+    assert sorted(_codigos(catalogo, "de")) == [101, 103, 104]
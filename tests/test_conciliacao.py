@@ -0,0 +1,122 @@
+import sqlite3
+
+import pytest
+
+from sistema_de_Inventario import conciliacao
+from sistema_de_Inventario.conciliacao import CONSULTA_SALDOS_LEDGER, conciliar, movimentacoes_pendentes, ultimo_snapshot
+from sistema_de_Inventario.estoque import movimentar_estoque
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, ESQUEMA_BASE
+
+from .conftest import inserir_movimentacao, inserir_produto
+
+
+def _saldos_pelo_historico(conn):
+    return dict(conn.execute('''SELECT p.cd_produto, COALESCE(SUM(CASE m.tp_movimento WHEN 'Entrada' THEN m.qt_movimento
+                                                                                      WHEN 'Saida' THEN -m.qt_movimento END), 0)
+                                FROM Produtos p LEFT JOIN Movimentacoes m ON m.produto_id = p.cd_produto
+                                GROUP BY p.cd_produto'''))
+
+
+def _saldos_pelo_ledger(conn):
+    return {cd_produto: qt_ledger for cd_produto, _, _, qt_ledger in conn.execute(CONSULTA_SALDOS_LEDGER)}
+
+
+def _divergencias(conn):
+    return conn.execute("SELECT produto_id, qt_ledger, qt_cadastro, dt_deteccao FROM Divergencias_Estoque").fetchall()
+
+
+def _movimentar(conn):
+    for cd_produto in (1, 2, 3):
+        inserir_produto(conn, cd_produto)
+        movimentar_estoque(conn, cd_produto, "Entrada", 10 * cd_produto, "Compra")
+        movimentar_estoque(conn, cd_produto, "Saida", cd_produto, "Venda")
+
+
+def test_saldo_do_ledger_igual_a_soma_do_historico(conn):
+    _movimentar(conn)
+    assert _saldos_pelo_ledger(conn) == _saldos_pelo_historico(conn)
+
+    # Várias rodadas: cada uma consolida só o que entrou depois do snapshot anterior
+    resultado = conciliar(conn)
+    assert (resultado.produtos, resultado.divergencias, resultado.movimentacoes_consolidadas) == (3, 0, 6)
+    movimentar_estoque(conn, 2, "Saida", 5, "Venda")
+    inserir_produto(conn, 4)
+    movimentar_estoque(conn, 4, "Entrada", 7, "Compra")
+    assert movimentacoes_pendentes(conn) == 2
+    assert _saldos_pelo_ledger(conn) == _saldos_pelo_historico(conn)
+
+    resultado = conciliar(conn)
+
+    assert resultado.movimentacoes_consolidadas == 2
+    assert resultado.ultima_movimentacao == ultimo_snapshot(conn)[0]
+    assert movimentacoes_pendentes(conn) == 0
+    assert dict(conn.execute("SELECT produto_id, qt_saldo FROM Saldos_Snapshot")) == _saldos_pelo_historico(conn)
+    assert _saldos_pelo_ledger(conn) == _saldos_pelo_historico(conn)
+    assert conn.execute("SELECT SUM(qt_movimentacoes) FROM Snapshots_Ledger").fetchone()[0] == 8
+
+
+def test_sem_snapshot_so_compara(conn):
+    _movimentar(conn)
+
+    resultado = conciliar(conn, snapshot=False)
+
+    assert (resultado.divergencias, resultado.movimentacoes_consolidadas, resultado.ultima_movimentacao) == (0, 0, 0)
+    assert conn.execute("SELECT COUNT(*) FROM Snapshots_Ledger").fetchone()[0] == 0
+
+
+def test_divergencia_forcada_e_registrada_e_some_quando_corrigida(conn):
+    _movimentar(conn)
+    conciliar(conn)
+    # Estoque alterado direto no cadastro, sem movimentação
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = vr_estoque_atual + 4 WHERE cd_produto = 2")
+    conn.commit()
+
+    assert conciliar(conn).divergencias == 1
+    [(produto_id, qt_ledger, qt_cadastro, dt_deteccao)] = _divergencias(conn)
+    assert (produto_id, qt_ledger, qt_cadastro) == (2, 18, 22)
+
+    # Continua divergente: a data da primeira detecção é mantida
+    conn.execute("UPDATE Divergencias_Estoque SET dt_deteccao = '2024-01-01 00:00:00'")
+    conn.commit()
+    inserir_movimentacao(conn, 3, "Entrada", 1, "2024-06-01 10:00:00", "Compra")
+    assert conciliar(conn).divergencias == 1
+    assert _divergencias(conn) == [(2, 18, 22, "2024-01-01 00:00:00")]
+
+    # Corrigida com a movimentação que faltava
+    conn.execute('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo)
+                    VALUES (2, 'Entrada', 4, '2024-06-02 10:00:00', 'Ajuste')''')
+    conn.commit()
+
+    assert conciliar(conn).divergencias == 0
+    assert _divergencias(conn) == []
+
+
+def test_main_migra_banco_sem_migracoes(tmp_path, capsys):
+    # Banco no schema original (produto_id TEXT, sem Snapshots_Ledger)
+    caminho = tmp_path / "inventario.db"
+    conn = sqlite3.connect(caminho)
+    for comando in ESQUEMA_BASE:
+        conn.execute(comando)
+    conn.executemany("INSERT INTO Categorias VALUES (?, ?)", CATEGORIAS_PADRAO)
+    conn.execute("INSERT INTO Produtos VALUES (1, 'Vela', NULL, 1, 5, 9, 3, 1)")
+    conn.execute("INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo) "
+                 "VALUES ('1', 'Entrada', 3, '2024-01-01 10:00:00', 'Compra')")
+    conn.commit()
+    conn.close()
+
+    conciliacao.main(["--db", str(caminho)])
+
+    assert "1 produtos conciliados" in capsys.readouterr().out
+    conn = sqlite3.connect(caminho)
+    assert conn.execute("SELECT nr_ultima_movimentacao FROM Snapshots_Ledger").fetchall() == [(1,)]
+    conn.close()
+
+
+def test_main_sai_com_erro_quando_ha_divergencia(caminho_db):
+    conn = sqlite3.connect(caminho_db)
+    inserir_produto(conn, 1, vr_estoque_atual=5)
+    conn.close()
+
+    with pytest.raises(SystemExit) as saida:
+        conciliacao.main(["--db", str(caminho_db), "--sem-curva-abc"])
+    assert saida.value.code == 1
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sistema_de_Inventario.curva_abc import (TOLERANCIA_VALOR, _diferencas, atualizar_curva_abc, calcular_curva_abc,
+                                             classificar, ler_curva_abc)
+
+from .conftest import inserir_produto
+
+
+def _classes(valores):
+    ordem, _, _, classes = classificar(valores)
+    return ordem.tolist(), classes.tolist()
+
+
+@pytest.mark.parametrize("valores, classes", [
+    # Exatamente 80% e 95% acumulados ainda ficam na classe de cima
+    ([80, 15, 5], ["A", "B", "C"]),
+    ([40, 40, 15, 5], ["A", "A", "B", "C"]),
+    # Um pouco acima do limite já passa para a classe seguinte
+    ([80.5, 14.5, 5], ["B", "B", "C"]),
+    ([81, 15, 4], ["B", "C", "C"]),
+    # Um produto só: 100% acumulado
+    ([10], ["C"]),
+])
+def test_limites_das_classes(valores, classes):
+    assert _classes(valores)[1] == classes
+
+
+def test_percentuais_em_ordem_decrescente():
+    ordem, individual, acumulado, _ = classificar([5, 50, 20, 25])
+
+    assert ordem.tolist() == [1, 3, 2, 0]
+    assert individual.tolist() == pytest.approx([50, 25, 20, 5])
+    assert acumulado.tolist() == pytest.approx([50, 75, 95, 100])
+
+
+def test_empates_mantem_a_ordem_do_catalogo():
+    # Valores iguais saem na ordem original (argsort estável), inclusive quando o empate cruza o limite de 80%
+    ordem, classes = _classes([10, 30, 30, 30])
+
+    assert ordem == [1, 2, 3, 0]
+    assert classes == ["A", "A", "B", "C"]
+
+
+@pytest.mark.parametrize("valores", [[0, 0, 0], [np.nan, 0, np.nan], []])
+def test_valores_todos_zero(valores):
+    ordem, individual, acumulado, classes = classificar(valores)
+
+    assert sorted(ordem.tolist()) == list(range(len(valores)))
+    assert individual.tolist() == [0] * len(valores)
+    assert acumulado.tolist() == [0] * len(valores)
+    assert classes.tolist() == ["C"] * len(valores)
+
+
+def test_nan_conta_como_zero():
+    ordem, classes = _classes([np.nan, 70, 30])
+
+    assert ordem == [1, 2, 0]
+    assert classes == ["A", "C", "C"]
+
+
+def _gravada(linhas):
+    return pd.DataFrame(linhas, columns=["cd_produto", "cd_classe", "vr_base", "pc_individual", "pc_acumulado", "nr_posicao"])
+
+
+GRAVADA = [(1, "A", 800.0, 80.0, 80.0, 1), (2, "B", 150.0, 15.0, 95.0, 2), (3, "C", 50.0, 5.0, 100.0, 3)]
+
+
+def test_diferencas_nada_mudou_dentro_da_tolerancia():
+    nova = _gravada([(1, "A", 800.0 + TOLERANCIA_VALOR / 2, 80.001, 80.001, 1), *GRAVADA[1:]])
+
+    mudadas, removidos = _diferencas(_gravada(GRAVADA), nova)
+
+    assert mudadas.empty and removidos.empty
+
+
+@pytest.mark.parametrize("linha_nova", [
+    (2, "C", 150.0, 15.0, 95.0, 2),    # classe
+    (2, "B", 150.0, 15.0, 95.0, 4),    # posição
+    (2, "B", 150.02, 15.0, 95.0, 2),   # valor
+    (2, "B", 150.0, 15.5, 95.0, 2),    # percentual individual
+    (2, "B", 150.0, 15.0, 95.02, 2),   # percentual acumulado
+])
+def test_diferencas_encontra_o_que_mudou(linha_nova):
+    nova = _gravada([GRAVADA[0], linha_nova, GRAVADA[2]])
+
+    mudadas, removidos = _diferencas(_gravada(GRAVADA), nova)
+
+    assert mudadas["cd_produto"].tolist() == [2]
+    assert removidos.empty
+
+
+def test_diferencas_produtos_novos_e_removidos():
+    nova = _gravada([GRAVADA[0], GRAVADA[1], (4, "C", 0.0, 0.0, 100.0, 3)])
+
+    mudadas, removidos = _diferencas(_gravada(GRAVADA), nova)
+
+    assert mudadas["cd_produto"].tolist() == [4]
+    assert removidos.tolist() == [3]
+    # Primeiro cálculo: tudo é novo
+    assert len(_diferencas(_gravada([]), nova)[0]) == 3
+
+
+def _versao_abc(conn):
+    return conn.execute("SELECT nr_versao FROM Versoes_Dados WHERE nm_chave = 'abc'").fetchone()[0]
+
+
+def test_atualizar_so_recalcula_depois_de_escrita(conn):
+    for cd_produto, estoque in [(1, 80), (2, 15), (3, 5)]:
+        inserir_produto(conn, cd_produto, vr_estoque_atual=estoque)
+
+    assert atualizar_curva_abc(conn) == 3
+    versao = _versao_abc(conn)
+    # Sem escrita nas bases: nada é recalculado nem regravado
+    assert atualizar_curva_abc(conn) == 0
+    assert _versao_abc(conn) == versao
+
+    # Escrita que não muda a classificação: recalcula, mas não regrava nem invalida o cache da curva
+    conn.execute("UPDATE Produtos SET vr_estoque_minimo = 2 WHERE cd_produto = 3")
+    conn.execute("UPDATE Produtos SET vr_custo = vr_custo WHERE cd_produto = 3")
+    conn.commit()
+    calculo = conn.execute("SELECT nr_versao FROM Calculos_ABC WHERE tp_base = 'estoque'").fetchone()[0]
+    assert atualizar_curva_abc(conn) == 0
+    assert conn.execute("SELECT nr_versao FROM Calculos_ABC WHERE tp_base = 'estoque'").fetchone()[0] > calculo
+    assert _versao_abc(conn) == versao
+
+    # O produto 3 passa a valer mais que o 2: só as duas linhas trocadas são regravadas
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = 14 WHERE cd_produto = 3")
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = 6 WHERE cd_produto = 2")
+    conn.commit()
+    assert atualizar_curva_abc(conn) == 2
+    assert _versao_abc(conn) == versao + 1
+    gravada = ler_curva_abc(conn)
+    esperada = calcular_curva_abc(conn)
+    assert gravada["cd_produto"].tolist() == esperada["cd_produto"].tolist() == [1, 3, 2]
+    assert gravada["Classe"].tolist() == esperada["cd_classe"].tolist()
+
+
+def test_atualizar_remove_produtos_excluidos(conn):
+    for cd_produto in (1, 2):
+        inserir_produto(conn, cd_produto, vr_estoque_atual=cd_produto)
+    atualizar_curva_abc(conn)
+
+    conn.execute("DELETE FROM Produtos WHERE cd_produto = 2")
+    conn.commit()
+
+    assert atualizar_curva_abc(conn) == 2   # 1 sobe para 100%, 2 sai
+    assert conn.execute("SELECT cd_produto, cd_classe FROM Classificacao_ABC").fetchall() == [(1, "C")]
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+
+from sistema_de_Inventario.db import PoolConexoes
+from sistema_de_Inventario.instrumentacao import ConexaoInstrumentada, RegistroConsultas
+
+from .conftest import inserir_produto
+
+
+@pytest.fixture
+def pool(caminho_db):
+    pool = PoolConexoes(caminho_db, tamanho=2, timeout=0.2)
+    yield pool
+    pool.fechar()
+
+
+def test_conexao_reaproveitada(pool):
+    with pool.conexao() as primeira:
+        pass
+    with pool.conexao() as segunda:
+        pass
+
+    assert segunda is primeira
+    estatisticas = pool.estatisticas()
+    assert (estatisticas["conexoes_abertas"], estatisticas["conexoes_livres"], estatisticas["checkouts"]) == (1, 1, 2)
+
+
+def test_abre_ate_o_tamanho_do_pool(pool):
+    with pool.conexao() as primeira, pool.conexao() as segunda:
+        assert segunda is not primeira
+    with pool.conexao() as terceira:
+        assert terceira in (primeira, segunda)
+    assert pool.estatisticas()["conexoes_abertas"] == 2
+
+
+def test_pool_esgotado_gera_timeout(pool):
+    with pool.conexao(), pool.conexao():
+        with pytest.raises(TimeoutError, match="Nenhuma conexão livre"):
+            with pool.conexao():
+                pass
+    # As conexões voltaram: a próxima retirada não espera
+    with pool.conexao():
+        pass
+    assert pool.estatisticas()["conexoes_livres"] == 2
+
+
+def test_espera_conexao_devolvida_por_outra_thread(pool):
+    pool.timeout = 5
+    retirada = []
+
+    def retirar():
+        with pool.conexao() as conn:
+            retirada.append(conn)
+
+    with pool.conexao() as primeira, pool.conexao() as segunda:
+        espera = threading.Thread(target=retirar)
+        espera.start()
+        espera.join(0.05)
+        assert not retirada
+    espera.join()
+
+    assert retirada[0] in (primeira, segunda)
+    assert pool.estatisticas()["checkouts_com_espera"] == 1
+
+
+def test_transacao_aberta_e_desfeita_na_devolucao(pool):
+    with pool.conexao() as conn:
+        conn.execute("INSERT INTO Categorias (cd_categoria, nm_categoria) VALUES (99, 'Esquecida')")
+        assert conn.in_transaction
+
+    with pool.conexao() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM Categorias WHERE cd_categoria = 99").fetchone()[0] == 0
+
+
+def test_erro_no_bloco_desfaz_a_transacao(pool):
+    with pytest.raises(RuntimeError):
+        with pool.conexao() as conn:
+            inserir_produto(conn, 1)
+            conn.execute("UPDATE Produtos SET vr_estoque_atual = 5 WHERE cd_produto = 1")
+            raise RuntimeError("falha no meio")
+
+    with pool.conexao() as conn:
+        assert conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0] == 0
+
+
+def test_pragmas_aplicados(pool):
+    with pool.conexao() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1      # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2       # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 200   # timeout do pool, em ms
+
+
+def test_registro_instrumenta_as_conexoes(caminho_db):
+    registro = RegistroConsultas(limite_lenta_ms=float("inf"))
+    pool = PoolConexoes(caminho_db, registro=registro)
+    try:
+        with pool.conexao() as conn:
+            assert isinstance(conn, ConexaoInstrumentada)
+            conn.execute("SELECT COUNT(*) FROM Produtos").fetchall()
+    finally:
+        pool.fechar()
+
+    assert "SELECT COUNT(*) FROM Produtos" in [linha["sql"] for linha in registro.resumo_instrucoes()]
@@ -0,0 +1,172 @@
+import random
+import sqlite3
+import threading
+
+import pytest
+
+from sistema_de_Inventario import estoque
+from sistema_de_Inventario.estoque import (EstoqueInsuficiente, ProdutoNaoEncontrado, definir_estoque,
+                                           movimentar_estoque)
+
+from .conftest import conectar, inserir_produto
+
+
+def _ocupado():
+    erro = sqlite3.OperationalError("database is locked")
+    erro.sqlite_errorcode = sqlite3.SQLITE_BUSY
+    return erro
+
+
+def _movimentacoes(conn, cd_produto):
+    return conn.execute('''SELECT tp_movimento, qt_movimento, nm_motivo FROM Movimentacoes
+                           WHERE produto_id = ? ORDER BY id''', (cd_produto,)).fetchall()
+
+
+def test_movimentar_devolve_o_estoque_do_update_returning(conn):
+    inserir_produto(conn, 1, vr_estoque_atual=10)
+
+    assert movimentar_estoque(conn, 1, "Entrada", 5, "Compra") == 15
+    assert movimentar_estoque(conn, 1, "Saida", 12, "Venda") == 3
+
+    assert conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0] == 3
+    assert _movimentacoes(conn, 1) == [("Entrada", 5, "Compra"), ("Saida", 12, "Venda")]
+
+
+def test_movimentar_trata_estoque_nulo_como_zero(conn):
+    inserir_produto(conn, 1, vr_estoque_atual=None)
+
+    assert movimentar_estoque(conn, 1, "Entrada", 4, "Compra") == 4
+
+
+def test_saida_maior_que_o_estoque_e_recusada_sem_gravar_nada(conn):
+    inserir_produto(conn, 1, vr_estoque_atual=3)
+
+    with pytest.raises(EstoqueInsuficiente):
+        movimentar_estoque(conn, 1, "Saida", 4, "Venda")
+
+    assert not conn.in_transaction
+    assert conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0] == 3
+    assert _movimentacoes(conn, 1) == []
+
+
+def test_saida_negativa_permitida_quando_pedido(conn):
+    inserir_produto(conn, 1, vr_estoque_atual=3)
+
+    assert movimentar_estoque(conn, 1, "Saida", 4, "Ajuste", permitir_negativo=True) == -1
+
+
+def test_produto_inexistente(conn):
+    with pytest.raises(ProdutoNaoEncontrado):
+        movimentar_estoque(conn, 99, "Entrada", 1, "Compra")
+    with pytest.raises(ProdutoNaoEncontrado):
+        definir_estoque(conn, 99, 10, "Ajuste")
+
+
+@pytest.mark.parametrize("tp_movimento, qt_movimento", [("Transferencia", 1), ("Entrada", 0), ("Saida", -2)])
+def test_movimento_invalido(conn, tp_movimento, qt_movimento):
+    inserir_produto(conn, 1, vr_estoque_atual=3)
+
+    with pytest.raises(ValueError):
+        movimentar_estoque(conn, 1, tp_movimento, qt_movimento, "Ajuste")
+
+
+def test_definir_estoque_registra_a_diferenca(conn):
+    inserir_produto(conn, 1, vr_estoque_atual=10)
+
+    assert definir_estoque(conn, 1, 7, "Perda") == ("Saida", 3)
+    assert definir_estoque(conn, 1, 12, "Ajuste") == ("Entrada", 5)
+    assert definir_estoque(conn, 1, 12, "Ajuste") is None
+
+    assert conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0] == 12
+    assert _movimentacoes(conn, 1) == [("Saida", 3, "Perda"), ("Entrada", 5, "Ajuste")]
+
+
+def test_retentativa_com_backoff_exponencial(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(estoque.time, "sleep", esperas.append)
+    monkeypatch.setattr(estoque.random, "random", lambda: 0.0)
+    chamadas = []
+
+    def operacao():
+        chamadas.append(None)
+        if len(chamadas) < 4:
+            raise _ocupado()
+        return "ok"
+
+    assert estoque._com_retentativa(operacao, tentativas=5, espera_inicial=0.01) == "ok"
+    assert esperas == pytest.approx([0.01, 0.02, 0.04])
+
+
+def test_retentativa_desiste_depois_da_ultima_tentativa(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(estoque.time, "sleep", esperas.append)
+
+    def operacao():
+        raise _ocupado()
+
+    with pytest.raises(sqlite3.OperationalError):
+        estoque._com_retentativa(operacao, tentativas=3)
+    assert len(esperas) == 2
+
+
+def test_retentativa_nao_repete_outros_erros(monkeypatch):
+    monkeypatch.setattr(estoque.time, "sleep", lambda segundos: pytest.fail("não deveria esperar"))
+    chamadas = []
+
+    def operacao():
+        chamadas.append(None)
+        raise sqlite3.OperationalError("no such table: Produtos")
+
+    with pytest.raises(sqlite3.OperationalError):
+        estoque._com_retentativa(operacao)
+    assert len(chamadas) == 1
+
+
+def test_movimentar_espera_o_banco_ser_liberado(caminho_db):
+    # Sem busy timeout, a conexão do teste recebe SQLITE_BUSY na hora e depende só das retentativas
+    outra = sqlite3.connect(caminho_db, check_same_thread=False)   # o commit vem da thread do Timer
+    inserir_produto(outra, 1, vr_estoque_atual=10)
+    conn = conectar(caminho_db, timeout=0)
+    outra.execute("BEGIN IMMEDIATE")
+    liberar = threading.Timer(0.1, outra.commit)
+    liberar.start()
+    try:
+        assert movimentar_estoque(conn, 1, "Saida", 2, "Venda") == 8
+    finally:
+        liberar.join()
+        conn.close()
+        outra.close()
+
+
+def test_ajustes_concorrentes_nao_perdem_atualizacoes(caminho_db):
+    # Várias threads, cada uma com a sua conexão, no mesmo produto: o saldo final tem que bater com o ledger
+    estoque_inicial, n_threads, n_operacoes = 10_000, 4, 100
+    conn = conectar(caminho_db)
+    inserir_produto(conn, 1, vr_estoque_atual=estoque_inicial)
+    erros = []
+
+    def trabalhador(semente):
+        rng = random.Random(semente)
+        conn_thread = conectar(caminho_db)
+        try:
+            for _ in range(n_operacoes):
+                movimentar_estoque(conn_thread, 1, rng.choice(["Entrada", "Saida"]), rng.randint(1, 10), "Estresse")
+        except Exception as erro:
+            erros.append(erro)
+        finally:
+            conn_thread.close()
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert erros == []
+    estoque_final = conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0]
+    saldo, quantidade = conn.execute('''SELECT SUM(CASE tp_movimento WHEN 'Entrada' THEN qt_movimento ELSE -qt_movimento END),
+                                               COUNT(*)
+                                        FROM Movimentacoes WHERE produto_id = 1''').fetchone()
+    conn.close()
+    assert quantidade == n_threads * n_operacoes
+    assert estoque_final == estoque_inicial + saldo
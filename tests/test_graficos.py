@@ -0,0 +1,58 @@
+from matplotlib.figure import Figure
+
+from sistema_de_Inventario.graficos import CacheGraficos
+
+from .conftest import inserir_produto
+
+
+def _desenho(desenhadas):
+    def desenhar():
+        desenhadas.append(None)
+        fig = Figure(figsize=(1, 1))
+        fig.subplots().plot([0, 1], [len(desenhadas), 0])
+        return fig
+    return desenhar
+
+
+def test_imagem_reaproveitada_ate_a_versao_dos_dados_mudar(conn):
+    cache, desenhadas = CacheGraficos(), []
+    desenhar = _desenho(desenhadas)
+
+    primeira = cache.png(conn, "valor_categoria", desenhar)
+    assert primeira.startswith(b"\x89PNG")
+    assert cache.png(conn, "valor_categoria", desenhar) is primeira
+    assert (cache.acertos, cache.falhas, len(desenhadas)) == (1, 1, 1)
+
+    # Qualquer escrita nas bases sobe a versão 'dados': todas as imagens são descartadas
+    inserir_produto(conn, 1)
+    assert cache.png(conn, "valor_categoria", desenhar) != primeira
+    assert (cache.acertos, cache.falhas, len(desenhadas)) == (1, 2, 2)
+    assert cache.estatisticas()["imagens"] == 1
+
+
+def test_chaves_extras_invalidam_so_o_proprio_grafico(conn):
+    cache, desenhadas = CacheGraficos(), []
+    desenhar = _desenho(desenhadas)
+    cache.png(conn, "top_estoque", desenhar)
+    cache.png(conn, "curva_abc", desenhar, chaves=("abc",))
+
+    conn.execute("UPDATE Versoes_Dados SET nr_versao = nr_versao + 1 WHERE nm_chave = 'abc'")
+    conn.commit()
+    cache.png(conn, "top_estoque", desenhar)
+    cache.png(conn, "curva_abc", desenhar, chaves=("abc",))
+
+    assert (cache.acertos, len(desenhadas)) == (1, 3)
+
+
+def test_lru_descarta_o_menos_usado(conn):
+    cache, desenhadas = CacheGraficos(tamanho_maximo=2), []
+    desenhar = _desenho(desenhadas)
+    for chave in ("a", "b"):
+        cache.png(conn, chave, desenhar)
+    cache.png(conn, "a", desenhar)
+    cache.png(conn, "c", desenhar)
+
+    cache.png(conn, "a", desenhar)
+    assert len(desenhadas) == 3
+    cache.png(conn, "b", desenhar)
+    assert len(desenhadas) == 4
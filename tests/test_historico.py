@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from sistema_de_Inventario.arquivamento import arquivar_movimentacoes
+from sistema_de_Inventario.historico import _filtros_sql, listar_movimentacoes
+
+from .conftest import inserir_movimentacao, inserir_produto
+
+
+def _historico(conn):
+    # Várias movimentações por data_hora (o id desempata) em três meses e dois produtos
+    for cd_produto in (1, 2):
+        inserir_produto(conn, cd_produto, vr_estoque_atual=1000)
+    for dia in range(0, 90, 3):
+        data_hora = f"{date(2024, 1, 1) + timedelta(days=dia)} 10:00:00"
+        for i in range(dia % 4 + 1):
+            inserir_movimentacao(conn, i % 2 + 1, "Saida" if i % 3 else "Entrada", i + 1, data_hora)
+
+
+def _todas_as_paginas(conn, limite, **filtros):
+    paginas, apos = [], None
+    while True:
+        df, apos = listar_movimentacoes(conn, apos=apos, limite=limite, **filtros)
+        assert len(df) <= limite
+        paginas.append(df)
+        if apos is None:
+            return paginas
+
+
+def _consulta_completa(conn, tabela="Movimentacoes", **filtros):
+    condicoes, parametros = _filtros_sql(**filtros)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return pd.read_sql_query(f'''SELECT id, produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo
+                                 FROM {tabela} {where} ORDER BY data_hora DESC, id DESC''', conn, params=parametros)
+
+
+FILTROS = [
+    {},
+    {"produto_id": 1},
+    {"tp_movimento": "Saida"},
+    {"dt_inicio": date(2024, 1, 20), "dt_fim": date(2024, 2, 20)},
+    {"dt_inicio": date(2024, 1, 10), "dt_fim": date(2024, 3, 1), "produto_id": 2, "tp_movimento": "Entrada"},
+]
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+@pytest.mark.parametrize("limite", [1, 3, 7])
+def test_paginas_emendadas_iguais_a_consulta_completa(conn, filtros, limite):
+    _historico(conn)
+
+    paginas = _todas_as_paginas(conn, limite, **filtros)
+
+    esperado = _consulta_completa(conn, **filtros)
+    assert not esperado.empty
+    pd.testing.assert_frame_equal(pd.concat(paginas, ignore_index=True), esperado)
+
+
+def test_id_desempata_a_mesma_data_hora(conn):
+    _historico(conn)
+    # 2024-01-04 tem quatro movimentações no mesmo segundo: páginas de uma linha passam por todas, do maior id ao menor
+    ids = [id_mov for (id_mov,) in conn.execute('''SELECT id FROM Movimentacoes WHERE data_hora = '2024-01-04 10:00:00'
+                                                    ORDER BY id DESC''')]
+    assert len(ids) == 4
+
+    paginas = _todas_as_paginas(conn, 1, dt_inicio=date(2024, 1, 4), dt_fim=date(2024, 1, 4))
+
+    assert [int(df["id"].iloc[0]) for df in paginas] == ids
+
+
+def test_ultima_pagina(conn):
+    _historico(conn)
+    total = len(_consulta_completa(conn))
+
+    # Com o total exato em páginas cheias, a última página cheia já não tem cursor (nada de uma página vazia a mais)
+    df, proximo = listar_movimentacoes(conn, limite=total)
+    assert (len(df), proximo) == (total, None)
+
+    df, proximo = listar_movimentacoes(conn, limite=total - 1)
+    df, proximo = listar_movimentacoes(conn, apos=proximo, limite=total - 1)
+    assert (len(df), proximo) == (1, None)
+
+    df, proximo = listar_movimentacoes(conn, produto_id=99)
+    assert df.empty and proximo is None
+
+
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_paginas_juntam_os_meses_arquivados(conn, filtros):
+    _historico(conn)
+    esperado = _consulta_completa(conn, **filtros)
+    # Janeiro e fevereiro vão para os arquivos mensais
+    arquivar_movimentacoes(conn, retencao_dias=45, hoje=date(2024, 4, 15))
+    assert conn.execute("SELECT MIN(data_hora) FROM Movimentacoes").fetchone()[0] >= "2024-03-01"
+
+    for limite in (2, 5):
+        paginas = _todas_as_paginas(conn, limite, **filtros)
+        pd.testing.assert_frame_equal(pd.concat(paginas, ignore_index=True), esperado)
@@ -0,0 +1,125 @@
+import io
+import sqlite3
+
+import pytest
+
+from sistema_de_Inventario.importacao import CHAVES_VERSAO_CARGA, importar_movimentacoes, importar_produtos
+
+from .conftest import inserir_produto
+
+
+def _csv(texto):
+    return io.BytesIO(texto.encode())
+
+
+def test_data_hora_vazia_ou_invalida_e_rejeitada(conn):
+    inserir_produto(conn, 1)
+    arquivo = _csv("produto_id,tp_movimento,qt_movimento,data_hora\n"
+                   "1,Entrada,5,2024-01-05 10:00:00\n"
+                   "1,Entrada,5,\n"
+                   "1,Entrada,5,05/01/2024\n"
+                   "1,Entrada,5,2024-02-30 08:00:00\n"
+                   "1,Saida,2,2024-01-06T09:30:00\n"
+                   "1,Saida,1,2024-01-07\n")
+
+    resultado = importar_movimentacoes(conn, arquivo)
+
+    assert (resultado.lidas, resultado.gravadas, resultado.rejeitadas) == (6, 3, 3)
+    assert [linha for linha, _ in resultado.erros] == [3, 4, 5]
+    # As datas aceitas ficam no formato do banco
+    assert [data for (data,) in conn.execute("SELECT data_hora FROM Movimentacoes ORDER BY id")] == [
+        "2024-01-05 10:00:00", "2024-01-06 09:30:00", "2024-01-07 00:00:00"]
+    assert conn.execute("SELECT vr_estoque_atual FROM Produtos WHERE cd_produto = 1").fetchone()[0] == 2
+
+
+def test_sem_coluna_data_hora_vale_a_hora_da_importacao(conn):
+    inserir_produto(conn, 1)
+
+    resultado = importar_movimentacoes(conn, _csv("produto_id,tp_movimento,qt_movimento\n1,Entrada,5\n"))
+
+    assert (resultado.gravadas, resultado.rejeitadas) == (1, 0)
+    assert conn.execute("SELECT data_hora FROM Movimentacoes").fetchone()[0] is not None
+
+
+def test_parquet_invalido_vira_value_error(conn):
+    pytest.importorskip("pyarrow")
+
+    with pytest.raises(ValueError, match="Parquet inválido"):
+        importar_movimentacoes(conn, io.BytesIO(b"isto nao e parquet"), formato="parquet")
+    assert not conn.in_transaction
+
+
+def test_precos_e_estoques_negativos_sao_rejeitados(conn):
+    arquivo = _csv("cd_produto,nm_produto,categoria_id,vr_custo,vr_venda,vr_estoque_atual,vr_estoque_minimo\n"
+                   "1,Filtro,1,10,20,5,2\n"
+                   "2,Vela,1,-10,20,5,2\n"
+                   "3,Pastilha,3,10,-0.5,5,2\n"
+                   "4,Disco,3,10,20,-1,2\n"
+                   "5,Bateria,4,10,20,2.5,2\n"
+                   "6,Farol,4,10,20,5,-3\n"
+                   "7,Tapete,5,0,0,0,\n")
+
+    resultado = importar_produtos(conn, arquivo)
+
+    assert (resultado.lidas, resultado.gravadas, resultado.rejeitadas) == (7, 2, 5)
+    assert resultado.erros == [(3, "preço de custo ou venda inválido"), (4, "preço de custo ou venda inválido"),
+                               (5, "estoque atual inválido"), (6, "estoque atual inválido"),
+                               (7, "estoque mínimo inválido")]
+    assert conn.execute("SELECT cd_produto, vr_estoque_atual, vr_estoque_minimo FROM Produtos ORDER BY 1").fetchall() == [
+        (1, 5, 2), (7, 0, 0)]
+
+
+def _versoes(conn):
+    return dict(conn.execute("SELECT nm_chave, nr_versao FROM Versoes_Dados"))
+
+
+def test_versoes_sobem_uma_vez_por_lote(conn):
+    inserir_produto(conn, 1)
+    triggers = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall()
+    versoes = _versoes(conn)
+    linhas = "".join(f"1,Entrada,1,2024-01-{dia:02d} 10:00:00\n" for dia in range(1, 11))
+
+    resultado = importar_movimentacoes(conn, _csv("produto_id,tp_movimento,qt_movimento,data_hora\n" + linhas), tamanho_lote=4)
+
+    assert resultado.gravadas == 10
+    depois = _versoes(conn)
+    assert {chave: depois[chave] - versoes[chave] for chave in depois} == {
+        chave: 3 if chave in CHAVES_VERSAO_CARGA else 0 for chave in depois}   # 3 lotes
+    # O schema não muda durante a carga e o modo de carga não fica ligado
+    assert conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name").fetchall() == triggers
+    assert conn.execute("SELECT COUNT(*) FROM Carga_Em_Lote").fetchone()[0] == 0
+
+    # Escritas fora da carga continuam incrementando a versão pelos triggers
+    conn.execute("UPDATE Produtos SET vr_custo = 11 WHERE cd_produto = 1")
+    conn.commit()
+    assert _versoes(conn)["estoque_custo"] == depois["estoque_custo"] + 1
+
+
+def test_importar_produtos_sobe_cada_chave_uma_vez(conn):
+    versoes = _versoes(conn)
+
+    resultado = importar_produtos(conn, _csv("cd_produto,nm_produto,categoria_id,vr_custo,vr_venda,vr_estoque_atual\n"
+                                             "1,Vela,1,5,9,10\n2,Pastilha,3,20,35,4\n3,Cabo,4,2,4,0\n"))
+
+    assert (resultado.gravadas, resultado.movimentacoes) == (3, 2)
+    depois = _versoes(conn)
+    assert {chave: depois[chave] - versoes[chave] for chave in depois} == {
+        chave: 1 if chave in CHAVES_VERSAO_CARGA else 0 for chave in depois}
+
+
+def test_lote_com_erro_desfaz_o_modo_de_carga(conn):
+    inserir_produto(conn, 1)
+    versoes = _versoes(conn)
+    conn.execute('''CREATE TEMP TRIGGER falhar AFTER INSERT ON main.Movimentacoes
+                    BEGIN SELECT RAISE(ABORT, 'falha no lote'); END''')
+
+    with pytest.raises(sqlite3.IntegrityError):
+        importar_movimentacoes(conn, _csv("produto_id,tp_movimento,qt_movimento\n1,Entrada,5\n"))
+
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM Carga_Em_Lote").fetchone()[0] == 0
+    assert _versoes(conn) == versoes
+    conn.execute("DROP TRIGGER falhar")
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = 3 WHERE cd_produto = 1")
+    conn.commit()
+    assert _versoes(conn)["dados"] == versoes["dados"] + 1
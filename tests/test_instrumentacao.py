@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+from sistema_de_Inventario.instrumentacao import ConexaoInstrumentada, RegistroConsultas
+from sistema_de_Inventario.tempos import RegistroTempos, percentis
+
+
+@pytest.fixture
+def conexao():
+    conn = sqlite3.connect(":memory:", factory=ConexaoInstrumentada)
+    conn.registro = RegistroConsultas(limite_lenta_ms=float("inf"))
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+    yield conn
+    conn.close()
+
+
+def _linhas_por_execucao(registro, sql):
+    return next(linha["linhas_por_execucao"] for linha in registro.resumo_instrucoes() if linha["sql"] == sql)
+
+
+def test_linhas_contadas_no_fetch(conexao):
+    conexao.execute("SELECT x FROM t").fetchall()
+    cursor = conexao.execute("SELECT x FROM t WHERE x < 5")
+    while cursor.fetchmany(2):
+        pass
+
+    assert _linhas_por_execucao(conexao.registro, "SELECT x FROM t") == 10
+    assert _linhas_por_execucao(conexao.registro, "SELECT x FROM t WHERE x < 5") == 5
+    assert _linhas_por_execucao(conexao.registro, "INSERT INTO t VALUES (?)") == 10
+
+
+def test_iteracao_nao_e_contada(conexao):
+    # A iteração é a do sqlite3 (sem custo por linha em Python): a instrução é registrada, sem contagem de linhas
+    assert sum(x for (x,) in conexao.execute("SELECT x FROM t WHERE x > 6")) == 24
+
+    assert _linhas_por_execucao(conexao.registro, "SELECT x FROM t WHERE x > 6") is None
+
+
+def _execucoes(registro, sql):
+    return next((linha["execucoes"] for linha in registro.resumo_instrucoes() if linha["sql"] == sql), 0)
+
+
+def test_consulta_lida_em_parte_e_registrada_na_instrucao_seguinte(conexao):
+    assert conexao.execute("SELECT COUNT(*) FROM t").fetchone() == (10,)
+    assert _execucoes(conexao.registro, "SELECT COUNT(*) FROM t") == 0
+
+    conexao.execute("SELECT 1").fetchall()
+
+    assert _execucoes(conexao.registro, "SELECT COUNT(*) FROM t") == 1
+    assert _linhas_por_execucao(conexao.registro, "SELECT COUNT(*) FROM t") == 1
+    assert not conexao._cursores_abertos
+
+
+def test_cursor_fechado_e_registrado(conexao):
+    cursor = conexao.execute("SELECT x FROM t")
+    cursor.fetchmany(3)
+    cursor.close()
+
+    assert _linhas_por_execucao(conexao.registro, "SELECT x FROM t") == 3
+    assert not conexao._cursores_abertos
+
+
+def test_fechar_a_conexao_registra_o_que_ficou_aberto():
+    conn = sqlite3.connect(":memory:", factory=ConexaoInstrumentada)
+    conn.registro = registro = RegistroConsultas(limite_lenta_ms=float("inf"))
+    conn.execute("SELECT 1").fetchone()
+    conn.close()
+
+    assert _execucoes(registro, "SELECT 1") == 1
+
+
+def test_paginas_contam_todas_as_execucoes():
+    conn = sqlite3.connect(":memory:", factory=ConexaoInstrumentada)
+    conn.registro = RegistroConsultas(limite_lenta_ms=float("inf"), amostras=3)
+    for _ in range(10):
+        conn.execute("SELECT 1").fetchall()
+    conn.close()
+
+    (pagina,) = conn.registro.resumo_paginas()
+    assert pagina["execucoes"] == 10
+    assert pagina["total_ms"] > sum(conn.registro._paginas["(sem página)"]["tempos"])
+
+
+def test_percentis():
+    assert percentis([]) == (0.0, 0.0, 0.0)
+    # Posto mais próximo: p95 de 1..100 é o 95º valor
+    assert percentis(range(1, 101)) == (50.5, 95, 99)
+    assert percentis(range(1, 21)) == (10.5, 19, 20)
+    assert percentis([7]) == (7, 7, 7)
+
+
+def test_execucoes_contadas_alem_das_amostras():
+    registro = RegistroTempos(amostras=5)
+    for i in range(12):
+        registro.registrar("Dashboard", i / 1000)
+    registro.registrar("Consultar", 0.002)
+
+    resumo = {linha["pagina"]: linha for linha in registro.resumo()}
+    assert resumo["Dashboard"]["execucoes"] == 12
+    assert resumo["Dashboard"]["ultima_ms"] == pytest.approx(11)
+    # Mediana das 5 últimas amostras (7..11 ms)
+    assert resumo["Dashboard"]["mediana_ms"] == pytest.approx(9)
+    assert resumo["Consultar"]["execucoes"] == 1
@@ -0,0 +1,126 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from sistema_de_Inventario.busca import buscar_produtos
+from sistema_de_Inventario.migracoes import CATEGORIAS_PADRAO, ESQUEMA_BASE, MIGRACOES, aplicar_migracoes
+from sistema_de_Inventario.peps import valor_estoque_peps
+
+
+VERSOES = [versao for versao, _, _ in MIGRACOES]
+BANCO_DISTRIBUIDO = Path(__file__).resolve().parents[1] / "SQLite" / "inventario.db"
+
+
+def _banco_original(caminho):
+    """Banco no schema de antes das migrações: produto_id TEXT em Movimentacoes, sem resumos nem índices."""
+    conn = sqlite3.connect(caminho)
+    for comando in ESQUEMA_BASE:
+        conn.execute(comando)
+    conn.executemany("INSERT INTO Categorias VALUES (?, ?)", CATEGORIAS_PADRAO)
+    conn.executemany("INSERT INTO Produtos VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (1, "Vela de ignição", "Vela iridium", 1, 5.0, 9.0, 8, 10),
+        (2, "Pastilha de freio", "Jogo dianteiro", 3, 40.0, 70.0, 3, 2),
+        (3, "Farol", None, 4, 120.0, 200.0, 0, 1),
+    ])
+    conn.executemany('''INSERT INTO Movimentacoes (produto_id, tp_movimento, qt_movimento, data_hora, nm_motivo)
+                        VALUES (?, ?, ?, ?, ?)''', [
+        ("1", "Entrada", 10, "2024-01-02 09:00:00", "Compra"),
+        ("1", "Saida", 2, "2024-01-03 15:00:00", "Venda"),
+        ("2", "Entrada", 5, "2024-01-02 09:30:00", "Compra"),
+        ("2", "Saida", 2, "2024-01-05 11:00:00", "Perda"),
+        ("3", "Entrada", 1, "2024-01-06 10:00:00", "Compra"),
+        ("3", "Saida", 1, "2024-01-06 16:00:00", "Venda"),
+    ])
+    conn.commit()
+    return conn
+
+
+def _schema(conn):
+    return conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+
+
+def _dados(conn):
+    return {tabela: conn.execute(f"SELECT * FROM {tabela} ORDER BY 1").fetchall()
+            for tabela in ("Produtos", "Movimentacoes", "Resumo_Estoque_Categoria", "Resumo_Movimentos_Diarios",
+                           "Resumo_Saidas_Produto", "Camadas_Custo", "Versoes_Dados")}
+
+
+def test_schema_original_migrado_ate_a_ultima_versao(tmp_path):
+    conn = _banco_original(tmp_path / "inventario.db")
+
+    assert aplicar_migracoes(conn) == VERSOES
+    assert [versao for (versao,) in conn.execute("SELECT cd_versao FROM Versoes_Schema ORDER BY 1")] == VERSOES
+
+    # Migração 1: produto_id passa a ser INTEGER, ids e dados preservados
+    assert conn.execute("SELECT DISTINCT typeof(produto_id) FROM Movimentacoes").fetchall() == [("integer",)]
+    assert conn.execute("SELECT id, produto_id, qt_movimento FROM Movimentacoes ORDER BY id").fetchall() == [
+        (1, 1, 10), (2, 1, 2), (3, 2, 5), (4, 2, 2), (5, 3, 1), (6, 3, 1)]
+    assert conn.execute("SELECT type FROM pragma_table_info('Movimentacoes') WHERE name = 'produto_id'").fetchone() == (
+        "INTEGER",)
+    # Resumos carregados com o histórico existente
+    assert conn.execute("SELECT produto_id, qt_total, qt_movimentos FROM Resumo_Saidas_Produto ORDER BY 1").fetchall() == [
+        (1, 2, 1), (2, 2, 1), (3, 1, 1)]
+    assert conn.execute('''SELECT categoria_id, vr_estoque, qt_produtos, qt_itens_criticos
+                           FROM Resumo_Estoque_Categoria ORDER BY 1''').fetchall() == [
+        (1, 40.0, 1, 1), (3, 120.0, 1, 0), (4, 0.0, 1, 1)]
+    # Índice de busca com os produtos já cadastrados
+    assert buscar_produtos(conn, "pastilha")["Código"].tolist() == [2]
+    # Camadas PEPS abertas pelo estoque atual, ao custo do cadastro
+    assert valor_estoque_peps(conn) == pytest.approx(8 * 5.0 + 3 * 40.0)
+    assert dict(conn.execute("SELECT nm_chave, nr_versao FROM Versoes_Dados")).keys() == {
+        "dados", "estoque_custo", "movimentacoes", "abc", "sugestoes"}
+    assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    conn.close()
+
+
+def test_segunda_execucao_nao_muda_nada(tmp_path):
+    conn = _banco_original(tmp_path / "inventario.db")
+    aplicar_migracoes(conn)
+    schema, dados = _schema(conn), _dados(conn)
+    aplicadas = conn.execute("SELECT * FROM Versoes_Schema ORDER BY 1").fetchall()
+
+    assert aplicar_migracoes(conn) == []
+
+    assert _schema(conn) == schema
+    assert _dados(conn) == dados
+    assert conn.execute("SELECT * FROM Versoes_Schema ORDER BY 1").fetchall() == aplicadas
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_migracao_com_erro_e_desfeita(tmp_path):
+    conn = _banco_original(tmp_path / "inventario.db")
+    ultima = VERSOES[-1]
+    quebrada = MIGRACOES + [(ultima + 1, "Migração com erro", [
+        "CREATE TABLE Temporaria (id INTEGER)",
+        "INSERT INTO Tabela_Inexistente VALUES (1)",
+    ])]
+
+    with pytest.raises(sqlite3.OperationalError):
+        aplicar_migracoes(conn, quebrada)
+
+    # As versões anteriores ficam aplicadas; a que falhou não deixa nada para trás
+    assert conn.execute("SELECT MAX(cd_versao) FROM Versoes_Schema").fetchone()[0] == ultima
+    assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'Temporaria'").fetchone() is None
+    conn.close()
+
+
+@pytest.mark.skipif(not BANCO_DISTRIBUIDO.exists(), reason="banco de exemplo não encontrado")
+def test_banco_distribuido_migrado(tmp_path):
+    caminho = tmp_path / "inventario.db"
+    shutil.copy(BANCO_DISTRIBUIDO, caminho)
+    conn = sqlite3.connect(caminho)
+    produtos, movimentacoes = (conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                               for tabela in ("Produtos", "Movimentacoes"))
+
+    aplicar_migracoes(conn)
+    assert [versao for (versao,) in conn.execute("SELECT cd_versao FROM Versoes_Schema ORDER BY 1")] == VERSOES
+    assert aplicar_migracoes(conn) == []
+
+    assert conn.execute("SELECT COUNT(*) FROM Produtos").fetchone()[0] == produtos
+    assert conn.execute("SELECT COUNT(*) FROM Movimentacoes").fetchone()[0] == movimentacoes
+    assert conn.execute("SELECT COUNT(*) FROM Movimentacoes WHERE typeof(produto_id) != 'integer'").fetchone()[0] == 0
+    assert conn.execute("PRAGMA integrity_check").fetchone() == ("ok",)
+    conn.close()
@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+from sistema_de_Inventario import peps
+from sistema_de_Inventario.cache import CacheConsultas, versao_dados
+from sistema_de_Inventario.estoque import movimentar_estoque
+from sistema_de_Inventario.peps import CONSULTA_VALORACAO_PEPS, reconstruir_camadas, valor_estoque_peps
+from sistema_de_Inventario.relatorios import CONSULTA_MOVIMENTOS_POR_PRODUTO, relatorios_movimentacoes
+
+from .conftest import inserir_produto
+
+
+def _camadas(conn):
+    return conn.execute('''SELECT produto_id, movimentacao_id, qt_original, qt_restante, vr_custo_unitario
+                           FROM Camadas_Custo ORDER BY produto_id, dt_entrada, movimentacao_id''').fetchall()
+
+
+def _custos(conn):
+    return conn.execute("SELECT id, vr_custo_unitario FROM Movimentacoes ORDER BY id").fetchall()
+
+
+def _comprar_e_vender(conn):
+    # Compra 5 a R$ 10 e 5 a R$ 20, vende 7: 5 x 10 + 2 x 20 = 90, ou 12,857 por unidade; sobram 3 a R$ 20
+    inserir_produto(conn, 1, vr_custo=15.0)
+    movimentar_estoque(conn, 1, "Entrada", 5, "Compra", vr_custo_unitario=10.0)
+    movimentar_estoque(conn, 1, "Entrada", 5, "Compra", vr_custo_unitario=20.0)
+    movimentar_estoque(conn, 1, "Saida", 7, "Venda")
+
+
+def test_saida_custeada_pelas_camadas_mais_antigas(conn):
+    _comprar_e_vender(conn)
+
+    custo_saida = conn.execute("SELECT vr_custo_unitario FROM Movimentacoes WHERE tp_movimento = 'Saida'").fetchone()[0]
+    assert custo_saida == pytest.approx(90 / 7)
+    assert [(qt_restante, custo) for _, _, _, qt_restante, custo in _camadas(conn)] == [(3, 20.0)]
+    assert valor_estoque_peps(conn) == pytest.approx(60.0)
+    cmv = conn.execute("SELECT vr_custo_total FROM Resumo_Saidas_Produto WHERE produto_id = 1").fetchone()[0]
+    assert cmv == pytest.approx(90.0)
+
+
+def test_reconstrucao_igual_aos_triggers(conn):
+    _comprar_e_vender(conn)
+    # Outro produto: entrada sem custo informado (vale o custo atual), saídas que esgotam as camadas e passam do saldo
+    inserir_produto(conn, 2, vr_custo=8.0)
+    movimentar_estoque(conn, 2, "Entrada", 4, "Compra")
+    movimentar_estoque(conn, 2, "Entrada", 6, "Compra", vr_custo_unitario=9.5)
+    movimentar_estoque(conn, 2, "Saida", 4, "Venda")
+    movimentar_estoque(conn, 2, "Saida", 3, "Perda")
+    movimentar_estoque(conn, 2, "Saida", 5, "Ajuste", permitir_negativo=True)
+    movimentar_estoque(conn, 1, "Saida", 1, "Perda")
+
+    camadas, custos = _camadas(conn), _custos(conn)
+    resumo = conn.execute("SELECT produto_id, vr_custo_total FROM Resumo_Saidas_Produto ORDER BY produto_id").fetchall()
+
+    resultado = reconstruir_camadas(conn)
+
+    assert resultado.custos_alterados == 0
+    assert _camadas(conn) == camadas
+    reconstruidos = _custos(conn)
+    assert [id_mov for id_mov, _ in reconstruidos] == [id_mov for id_mov, _ in custos]
+    assert [custo for _, custo in reconstruidos] == pytest.approx([custo for _, custo in custos])
+    assert dict(conn.execute("SELECT produto_id, vr_custo_total FROM Resumo_Saidas_Produto")) == pytest.approx(dict(resumo))
+
+
+def test_perdas_mostram_o_custo_unitario_efetivo(conn):
+    _comprar_e_vender(conn)
+    # A perda sai da camada de R$ 20, embora o custo atual do produto seja R$ 15
+    movimentar_estoque(conn, 1, "Saida", 2, "Perda")
+
+    perdas = relatorios_movimentacoes(pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn))["perdas"]
+
+    assert perdas.loc[0, "Qtd Perdida"] == 2
+    assert perdas.loc[0, "Custo Unitário"] == pytest.approx(20.0)
+    assert perdas.loc[0, "Prejuizo Total"] == pytest.approx(40.0)
+
+
+def test_reconstrucao_invalida_a_valoracao_em_cache(conn):
+    _comprar_e_vender(conn)
+    movimentar_estoque(conn, 1, "Entrada", 4, "Compra", vr_custo_unitario=30.0)
+    # Custo de uma compra ainda não consumida corrigido no histórico: a reconstrução muda só as camadas
+    conn.execute("UPDATE Movimentacoes SET vr_custo_unitario = 40 WHERE id = 4")
+    conn.commit()
+    cache = CacheConsultas()
+    coluna = "Custo total PEPS (R$)"
+    assert cache.ler(conn, CONSULTA_VALORACAO_PEPS, chaves=("estoque_custo",))[coluna].tolist() == [180.0]
+    versao = versao_dados(conn, "estoque_custo")
+
+    reconstruir_camadas(conn)
+
+    assert versao_dados(conn, "estoque_custo") == versao + 1
+    assert cache.ler(conn, CONSULTA_VALORACAO_PEPS, chaves=("estoque_custo",))[coluna].tolist() == [220.0]
+    assert cache.acertos == 0
+
+
+def test_reconstrucao_desfeita_nao_sobe_a_versao(conn, monkeypatch):
+    _comprar_e_vender(conn)
+    versao = versao_dados(conn, "estoque_custo")
+
+    def falhar(*args):
+        raise RuntimeError("falha no custeio")
+
+    monkeypatch.setattr(peps, "_custear_produto", falhar)
+    with pytest.raises(RuntimeError):
+        reconstruir_camadas(conn)
+
+    assert versao_dados(conn, "estoque_custo") == versao
+    assert len(_camadas(conn)) == 1
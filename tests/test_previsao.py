@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+
+import numpy as np
+import pytest
+
+from sistema_de_Inventario import previsao
+from sistema_de_Inventario.cache import CacheConsultas, versao_dados
+from sistema_de_Inventario.previsao import (ALFA, CONSULTA_REPOSICAO, LIMITE_INTERMITENTE, aplicar_como_estoque_minimo,
+                                            calcular_sugestoes, gravar_sugestoes, prever_demanda)
+
+from .conftest import conectar, inserir_produto
+
+
+def _prever_serie(serie, alfa=ALFA):
+    """Versão de referência, um produto por vez e período a período, sem NumPy."""
+    n = len(serie)
+    demandas = [valor for valor in serie if valor > 0]
+    if not demandas:
+        return 0.0, 1.25 * sum(abs(valor) for valor in serie) / n, False
+    adi = n / len(demandas)
+    intermitente = adi >= LIMITE_INTERMITENTE
+    nivel, tamanho, intervalo, desde_ultima, erro = sum(serie) / n, sum(demandas) / len(demandas), adi, 0, 0.0
+    for valor in serie:
+        erro += abs(valor - (tamanho / intervalo if intermitente else nivel))
+        nivel = alfa * valor + (1 - alfa) * nivel
+        desde_ultima += 1
+        if valor > 0:
+            tamanho = alfa * valor + (1 - alfa) * tamanho
+            intervalo = alfa * desde_ultima + (1 - alfa) * intervalo
+            desde_ultima = 0
+    demanda = (1 - alfa / 2) * tamanho / intervalo if intermitente else nivel
+    return demanda, 1.25 * erro / n, intermitente
+
+
+def test_serie_constante():
+    demanda, desvio, intermitente = prever_demanda(np.full((1, 52), 5.0))
+
+    assert demanda[0] == pytest.approx(5.0)
+    assert desvio[0] == pytest.approx(0.0)
+    assert not intermitente[0]
+
+
+def test_serie_intermitente_usa_croston_sba():
+    # Uma saída de 6 a cada 3 semanas: tamanho 6 e intervalo 3 estáveis, SBA = (1 - 0,2 / 2) × 6 / 3
+    demanda, desvio, intermitente = prever_demanda(np.array([[0, 0, 6] * 10], dtype=float))
+
+    assert intermitente[0]
+    assert demanda[0] == pytest.approx(0.9 * 6 / 3)
+    assert desvio[0] > 0
+
+
+def test_linha_toda_zerada():
+    matriz = np.zeros((3, 52))
+    matriz[1] = 4.0
+
+    demanda, desvio, intermitente = prever_demanda(matriz)
+
+    assert demanda.tolist() == pytest.approx([0.0, 4.0, 0.0])
+    assert desvio[[0, 2]].tolist() == [0.0, 0.0]
+    assert not intermitente.any()
+    assert np.isfinite(demanda).all() and np.isfinite(desvio).all()
+
+
+def test_vetorizado_igual_a_versao_por_produto():
+    rng = np.random.default_rng(7)
+    regulares = rng.poisson(8, size=(20, 52))
+    intermitentes = rng.poisson(5, size=(20, 52)) * (rng.random((20, 52)) < 0.25)
+    matriz = np.vstack([regulares, intermitentes, np.zeros((2, 52))]).astype(float)
+
+    demanda, desvio, intermitente = prever_demanda(matriz)
+
+    esperado = [_prever_serie(list(linha)) for linha in matriz]
+    assert intermitente.tolist() == [flag for _, _, flag in esperado]
+    assert 0 < intermitente.sum() < len(matriz)
+    assert demanda.tolist() == pytest.approx([valor for valor, _, _ in esperado])
+    assert desvio.tolist() == pytest.approx([valor for _, valor, _ in esperado])
+
+
+def _sugestoes(conn):
+    for cd_produto in (1, 2):
+        inserir_produto(conn, cd_produto, vr_estoque_atual=1)
+    conn.execute('''INSERT INTO Resumo_Movimentos_Diarios (dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos)
+                    SELECT DATE('now', '-' || (7 * semana) || ' days'), 1, 'Saida', 10, 1
+                    FROM (WITH RECURSIVE s(semana) AS (SELECT 0 UNION ALL SELECT semana + 1 FROM s WHERE semana < 51)
+                          SELECT semana FROM s)''')
+    conn.commit()
+    return calcular_sugestoes(conn)
+
+
+def test_gravar_sugestoes_invalida_so_a_chave_propria(conn):
+    df = _sugestoes(conn)
+    cache = CacheConsultas()
+    cache.ler(conn, "SELECT * FROM Produtos")
+    cache.ler(conn, CONSULTA_REPOSICAO, chaves=("sugestoes",))
+    dados, sugestoes = versao_dados(conn), versao_dados(conn, "sugestoes")
+
+    gravar_sugestoes(conn, df)
+
+    assert (versao_dados(conn), versao_dados(conn, "sugestoes")) == (dados, sugestoes + 1)
+    cache.ler(conn, "SELECT * FROM Produtos")
+    assert cache.acertos == 1
+    assert cache.ler(conn, CONSULTA_REPOSICAO, chaves=("sugestoes",))["Código"].tolist() == [1]
+    assert cache.acertos == 1
+
+
+def test_aplicar_como_estoque_minimo_espera_o_banco_ser_liberado(caminho_db, monkeypatch):
+    conn = conectar(caminho_db, timeout=0)
+    gravar_sugestoes(conn, _sugestoes(conn))
+    ponto_pedido = conn.execute("SELECT qt_ponto_pedido FROM Sugestoes_Reposicao WHERE cd_produto = 1").fetchone()[0]
+    tentativas = []
+    original = previsao._com_retentativa
+
+    def contar(operacao):
+        def operacao_contada():
+            tentativas.append(None)
+            return operacao()
+        return original(operacao_contada)
+
+    monkeypatch.setattr(previsao, "_com_retentativa", contar)
+    outra = sqlite3.connect(caminho_db, check_same_thread=False)
+    outra.execute("BEGIN IMMEDIATE")
+    liberar = threading.Timer(0.1, outra.commit)
+    liberar.start()
+    try:
+        assert aplicar_como_estoque_minimo(conn) == 1
+    finally:
+        liberar.join()
+        outra.close()
+
+    assert len(tentativas) > 1
+    assert not conn.in_transaction
+    # O produto 2, sem saídas, mantém o estoque mínimo digitado
+    assert conn.execute("SELECT cd_produto, vr_estoque_minimo FROM Produtos ORDER BY cd_produto").fetchall() == [
+        (1, ponto_pedido), (2, 0)]
+    assert aplicar_como_estoque_minimo(conn) == 0
+    conn.close()
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+from sistema_de_Inventario.conciliacao import CONSULTA_VALORACAO_LEDGER, registrar_snapshot
+from sistema_de_Inventario.relatorios import (CONSULTA_CATEGORIAS, CONSULTA_MOVIMENTOS_POR_PRODUTO, CONSULTA_PRODUTOS,
+                                              relatorios_movimentacoes, relatorios_produtos)
+
+from .conftest import inserir_movimentacao, inserir_produto
+
+
+_SELECT_PRODUTOS = '''SELECT cd_produto AS 'Código', nm_produto AS 'Produto', ds_produto AS 'Descrição',
+                             categoria_id AS 'Categoria', vr_custo AS 'Custo', vr_venda AS 'Valor de Venda',
+                             vr_estoque_atual AS 'Estoque', vr_estoque_minimo AS 'Estoque Mínimo' FROM Produtos'''
+
+# Consultas como estavam nas páginas Consultar e Movimentações, uma por relatório (as mesmas de
+# benchmarks/bench_relatorios.py)
+ANTIGAS_PRODUTOS = {
+    "produtos": _SELECT_PRODUTOS,
+    "abaixo_minimo": _SELECT_PRODUTOS + " WHERE vr_estoque_atual < vr_estoque_minimo",
+    "excesso": _SELECT_PRODUTOS + " WHERE vr_estoque_atual > (vr_estoque_minimo * 3)",
+    "por_categoria": '''SELECT c.nm_categoria AS 'Categoria', COUNT(p.cd_produto) AS 'Quantidade de Produtos'
+                        FROM Categorias c LEFT JOIN Produtos p ON c.cd_categoria = p.categoria_id
+                        GROUP BY c.nm_categoria''',
+}
+ANTIGAS_MOVIMENTACOES = {
+    "giro": '''SELECT p.nm_produto AS 'Produto', COUNT(m.id) AS 'Qtd Movimentos de Venda',
+                      SUM(m.qt_movimento) AS 'Total de Itens Saidos'
+               FROM Produtos p JOIN Movimentacoes m ON p.cd_produto = m.produto_id WHERE m.tp_movimento = 'Saida'
+               GROUP BY p.cd_produto ORDER BY 3 DESC''',
+    "perdas": '''SELECT p.nm_produto AS 'Produto', SUM(m.qt_movimento) AS 'Qtd Perdida',
+                        SUM(m.qt_movimento * COALESCE(m.vr_custo_unitario, p.vr_custo)) / SUM(m.qt_movimento) AS 'Custo Unitário',
+                        SUM(m.qt_movimento * COALESCE(m.vr_custo_unitario, p.vr_custo)) AS 'Prejuizo Total'
+                 FROM Movimentacoes m JOIN Produtos p ON m.produto_id = p.cd_produto
+                 WHERE m.nm_motivo = 'Perda' GROUP BY p.cd_produto''',
+    "valoracao": '''SELECT p.nm_produto, p.vr_estoque_atual AS 'Estoque No Cadastro',
+                           SUM(CASE WHEN m.tp_movimento = 'Entrada' THEN m.qt_movimento ELSE 0 END)
+                           - SUM(CASE WHEN m.tp_movimento = 'Saida' THEN m.qt_movimento ELSE 0 END) AS 'Estoque Calculado Histórico'
+                    FROM Produtos p LEFT JOIN Movimentacoes m ON p.cd_produto = m.produto_id
+                    GROUP BY p.cd_produto''',
+}
+
+
+def _catalogo(conn):
+    # (código, categoria, estoque mínimo): abaixo do mínimo, em excesso, sem movimentações e categoria vazia.
+    # Os totais de saída (vendas mais perdas) não empatam: o giro antigo não desempata o ORDER BY
+    for cd_produto, categoria, minimo in [(1, 1, 5), (2, 1, 50), (3, 3, 1), (4, 4, 0), (5, 3, 2)]:
+        inserir_produto(conn, cd_produto, vr_custo=4.0 * cd_produto)
+        conn.execute("UPDATE Produtos SET categoria_id = ?, vr_estoque_minimo = ? WHERE cd_produto = ?",
+                     (categoria, minimo, cd_produto))
+        conn.commit()
+    for cd_produto, compras, vendas, perdas in [(1, [20, 10], [3, 4], [2]), (2, [30], [10], []),
+                                                (3, [8], [1], [1, 2]), (4, [5], [], [])]:
+        for dia, qt in enumerate(compras, 1):
+            inserir_movimentacao(conn, cd_produto, "Entrada", qt, f"2024-02-{dia:02d} 08:00:00", "Compra",
+                                 vr_custo_unitario=3.0 * cd_produto + dia)
+        for dia, qt in enumerate(vendas, 5):
+            inserir_movimentacao(conn, cd_produto, "Saida", qt, f"2024-02-{dia:02d} 14:00:00")
+        for dia, qt in enumerate(perdas, 10):
+            inserir_movimentacao(conn, cd_produto, "Saida", qt, f"2024-02-{dia:02d} 18:00:00", "Perda")
+    # Perda sem custo gravado: as duas versões usam o custo atual do produto
+    conn.execute("UPDATE Movimentacoes SET vr_custo_unitario = NULL WHERE produto_id = 3 AND nm_motivo = 'Perda' "
+                 "AND qt_movimento = 2")
+    conn.commit()
+
+
+def _conferir(antigos, novos):
+    assert antigos.keys() <= novos.keys()
+    for relatorio, df in antigos.items():
+        pd.testing.assert_frame_equal(novos[relatorio], df, check_dtype=False, obj=relatorio)
+
+
+def test_relatorios_de_produtos_iguais_as_consultas_antigas(conn):
+    _catalogo(conn)
+
+    novos = relatorios_produtos(pd.read_sql_query(CONSULTA_PRODUTOS, conn), pd.read_sql_query(CONSULTA_CATEGORIAS, conn))
+
+    _conferir({nome: pd.read_sql_query(query, conn) for nome, query in ANTIGAS_PRODUTOS.items()}, novos)
+    assert not novos["abaixo_minimo"].empty and not novos["excesso"].empty
+    assert 0 in novos["por_categoria"]["Quantidade de Produtos"].tolist()
+
+
+@pytest.mark.parametrize("snapshot", ["sem_snapshot", "snapshot_no_fim", "snapshot_no_meio"])
+def test_relatorios_de_movimentacoes_iguais_as_consultas_antigas(conn, snapshot):
+    _catalogo(conn)
+    if snapshot != "sem_snapshot":
+        registrar_snapshot(conn)
+    if snapshot == "snapshot_no_meio":
+        # Movimentações depois do snapshot entram pela faixa de ids posterior
+        inserir_movimentacao(conn, 2, "Saida", 6, "2024-03-01 10:00:00")
+        inserir_movimentacao(conn, 5, "Entrada", 3, "2024-03-01 11:00:00", "Compra", vr_custo_unitario=18.0)
+        inserir_movimentacao(conn, 5, "Saida", 1, "2024-03-02 11:00:00", "Perda")
+
+    novos = relatorios_movimentacoes(pd.read_sql_query(CONSULTA_MOVIMENTOS_POR_PRODUTO, conn))
+    novos["valoracao"] = pd.read_sql_query(CONSULTA_VALORACAO_LEDGER, conn)
+
+    _conferir({nome: pd.read_sql_query(query, conn) for nome, query in ANTIGAS_MOVIMENTACOES.items()}, novos)
+    assert len(novos["perdas"]) >= 2
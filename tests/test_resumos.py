@@ -0,0 +1,98 @@
+import pytest
+
+from .conftest import inserir_movimentacao, inserir_produto
+
+
+# Os resumos pela base: Resumo_Estoque_Categoria por Produtos; os de movimentos por Movimentacoes mais as linhas
+# apagadas (exclusões não são descontadas, ver migração 3)
+ESTOQUE_CATEGORIA = '''SELECT categoria_id, COALESCE(SUM(vr_estoque_atual * vr_custo), 0), COUNT(*),
+                              SUM(CASE WHEN vr_estoque_atual < vr_estoque_minimo THEN 1 ELSE 0 END)
+                       FROM Produtos GROUP BY categoria_id ORDER BY categoria_id'''
+MOVIMENTOS_DIARIOS = '''SELECT SUBSTR(data_hora, 1, 10), produto_id, tp_movimento, SUM(qt_movimento), COUNT(*)
+                        FROM {tabela} GROUP BY 1, 2, 3 ORDER BY 1, 2, 3'''
+SAIDAS_PRODUTO = '''SELECT produto_id, SUM(qt_movimento), COUNT(*) FROM {tabela}
+                    WHERE tp_movimento = 'Saida' GROUP BY produto_id ORDER BY produto_id'''
+
+
+def _resumos(conn):
+    return {
+        "estoque_categoria": conn.execute('''SELECT categoria_id, vr_estoque, qt_produtos, qt_itens_criticos
+                                             FROM Resumo_Estoque_Categoria WHERE qt_produtos > 0
+                                             ORDER BY categoria_id''').fetchall(),
+        "movimentos_diarios": conn.execute('''SELECT dt_dia, produto_id, tp_movimento, qt_total, qt_movimentos
+                                              FROM Resumo_Movimentos_Diarios ORDER BY 1, 2, 3''').fetchall(),
+        "saidas_produto": conn.execute('''SELECT produto_id, qt_total, qt_movimentos FROM Resumo_Saidas_Produto
+                                          WHERE qt_movimentos > 0 ORDER BY produto_id''').fetchall(),
+    }
+
+
+def _pela_base(conn, tabela="Movimentacoes"):
+    return {
+        "estoque_categoria": conn.execute(ESTOQUE_CATEGORIA).fetchall(),
+        "movimentos_diarios": conn.execute(MOVIMENTOS_DIARIOS.format(tabela=tabela)).fetchall(),
+        "saidas_produto": conn.execute(SAIDAS_PRODUTO.format(tabela=tabela)).fetchall(),
+    }
+
+
+def _conferir(conn, tabela="Movimentacoes"):
+    resumos, base = _resumos(conn), _pela_base(conn, tabela)
+    # vr_estoque é REAL, somado e subtraído a cada escrita
+    assert resumos.pop("estoque_categoria") == pytest.approx(base.pop("estoque_categoria"))
+    assert resumos == base
+
+
+def _historico(conn):
+    for cd_produto, categoria in [(1, 1), (2, 1), (3, 3)]:
+        inserir_produto(conn, cd_produto, vr_custo=5.0 * cd_produto)
+        conn.execute("UPDATE Produtos SET categoria_id = ?, vr_estoque_minimo = 5 WHERE cd_produto = ?", (categoria, cd_produto))
+        conn.commit()
+    for dia in range(1, 6):
+        for cd_produto in (1, 2, 3):
+            inserir_movimentacao(conn, cd_produto, "Entrada", 10, f"2024-03-{dia:02d} 08:00:00", "Compra")
+            inserir_movimentacao(conn, cd_produto, "Saida", cd_produto + dia % 2, f"2024-03-{dia:02d} 15:00:00")
+            inserir_movimentacao(conn, cd_produto, "Saida", 1, f"2024-03-{dia:02d} 15:30:00")
+
+
+def test_resumos_iguais_a_base_depois_de_insert_update_e_delete(conn):
+    _historico(conn)
+    _conferir(conn)
+
+    # Correções de movimentações: quantidade, tipo, produto e dia
+    conn.execute("UPDATE Movimentacoes SET qt_movimento = 7 WHERE id = 2")
+    conn.execute("UPDATE Movimentacoes SET tp_movimento = 'Entrada' WHERE id = 3")
+    conn.execute("UPDATE Movimentacoes SET tp_movimento = 'Saida' WHERE id = 4")
+    conn.execute("UPDATE Movimentacoes SET produto_id = 3 WHERE id = 5")
+    conn.execute("UPDATE Movimentacoes SET data_hora = '2024-03-09 10:00:00' WHERE id = 6")
+    # Só o custo muda (como faz a reconstrução PEPS): os resumos de quantidade ficam iguais
+    conn.execute("UPDATE Movimentacoes SET vr_custo_unitario = 1 WHERE id = 8")
+    # Produtos: estoque, custo, mínimo, categoria e exclusão
+    conn.execute("UPDATE Produtos SET vr_estoque_atual = 2, vr_custo = 7 WHERE cd_produto = 1")
+    conn.execute("UPDATE Produtos SET categoria_id = 4 WHERE cd_produto = 2")
+    conn.execute("UPDATE Produtos SET vr_estoque_minimo = 100 WHERE cd_produto = 3")
+    inserir_produto(conn, 4)
+    conn.execute("DELETE FROM Produtos WHERE cd_produto = 4")
+    conn.commit()
+    _conferir(conn)
+
+    # Exclusões: comparadas com a base mais as linhas apagadas
+    conn.execute("CREATE TEMP TABLE Historico AS SELECT * FROM Movimentacoes")
+    conn.execute("DELETE FROM Movimentacoes WHERE id IN (1, 9, 10)")
+    conn.commit()
+    _conferir(conn, "temp.Historico")
+    inserir_movimentacao(conn, 2, "Saida", 3, "2024-03-10 09:00:00")
+    conn.execute("INSERT INTO temp.Historico SELECT * FROM Movimentacoes WHERE id = (SELECT MAX(id) FROM Movimentacoes)")
+    _conferir(conn, "temp.Historico")
+
+
+def test_exclusao_de_movimentacao_nao_e_descontada(conn):
+    _historico(conn)
+    antes = _resumos(conn)
+
+    conn.execute("DELETE FROM Movimentacoes WHERE produto_id = 2")
+    conn.commit()
+
+    # Os resumos guardam o histórico consolidado: a linha apagada continua contada
+    depois = _resumos(conn)
+    assert depois["movimentos_diarios"] == antes["movimentos_diarios"]
+    assert depois["saidas_produto"] == antes["saidas_produto"]
+    assert _pela_base(conn)["saidas_produto"] != depois["saidas_produto"]
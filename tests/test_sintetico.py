@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+from sistema_de_Inventario import sintetico
+
+
+def _triggers_peps(caminho):
+    conn = sqlite3.connect(caminho)
+    try:
+        return {nome for (nome,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_movimentacoes_peps_%'")}
+    finally:
+        conn.close()
+
+
+def test_gerar_banco_mantem_os_triggers_peps(tmp_path):
+    caminho = tmp_path / "sintetico.db"
+    resultado = sintetico.gerar_banco(caminho, 20, 500, tamanho_lote=100)
+
+    assert resultado.movimentacoes == 520
+    assert _triggers_peps(caminho) == {"trg_movimentacoes_peps_entrada", "trg_movimentacoes_peps_saida"}
+
+
+def test_carga_com_erro_restaura_os_triggers_peps(tmp_path, monkeypatch):
+    def falhar(conn):
+        raise RuntimeError("falha na reconstrução")
+
+    monkeypatch.setattr(sintetico, "reconstruir_camadas", falhar)
+    caminho = tmp_path / "sintetico.db"
+
+    with pytest.raises(RuntimeError, match="reconstrução"):
+        sintetico.gerar_banco(caminho, 20, 500, tamanho_lote=100)
+
+    assert _triggers_peps(caminho) == {"trg_movimentacoes_peps_entrada", "trg_movimentacoes_peps_saida"}